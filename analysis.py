@@ -0,0 +1,210 @@
+"""
+A batch analysis of every position in a game log.
+
+Each position of each recorded game is annotated with its value for the
+player to move and the best move there: exact, from the solved table of
+SubtractSquare, from a Stonehenge tablebase, or from a search that solved
+the position; otherwise estimated by an iterative deepening search with a
+time budget. Comparing the move played with the best move, and the values
+before and after it, finds the blunders in a game.
+
+Positions are read from the log one game at a time and analysed on a pool
+of worker processes. A position seen before, in any game, is looked up in a
+result cache instead of being analysed again, so the positions every game
+shares near the start are only analysed once.
+
+The annotations are written to a JSON lines file, one line per game in the
+order of the log:
+    {"game": <index in the log>, "positions": [
+        {"ply": <moves made before>, "to_move": "p1" or "p2",
+         "played": <move>, "value": <value>, "best": <move>,
+         "exact": <whether the value is exact>}, ...]}
+Every line is flushed as soon as its game is done, so if the analysis is
+interrupted, running it again on the same files picks up after the last game
+written.
+
+Run from the command line, for example:
+    python analysis.py games.log annotations.jsonl --budget 0.2 --workers 4
+"""
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Deque, Iterator, List, Tuple
+from game_interface import GameRecord, playable_games
+from game_log import read_games
+from stonehenge_tablebase import open_tablebase, tablebase_move
+from strategy import _deepen, _DeepeningSearch, winning_move_now
+from subtract_square_solver import winning_moves
+from transposition_table import TranspositionTable
+
+DEFAULT_BUDGET = 0.1
+
+# The key in playable_games of each game, by the name of its class, as in
+# the records of a game log.
+_GAME_KEYS = {cls.__name__: key for key, cls in playable_games.items()}
+
+
+def positions(record: GameRecord) -> Iterator[Tuple[int, 'GameState', Any]]:
+    """Yield the number of moves made, the state and the move played at each
+    position of the game in record at which a move was played.
+
+    >>> record = GameRecord('SubtractSquareGame', 5, True, 'a', 'b',
+    ...                     (4, 1), (0.5, 0.25), 'p2')
+    >>> [(ply, state.current_total, move)
+    ...  for ply, state, move in positions(record)]
+    [(0, 5, 4), (1, 1, 1)]
+    """
+    game = playable_games[_GAME_KEYS[record.game]](record.p1_starts,
+                                                    record.size)
+    state = game.current_state
+    for ply, move in enumerate(record.moves):
+        yield ply, state, move
+        state = state.make_move(move)
+
+
+def analyse(game_key: str, state: 'GameState',
+            budget: float = DEFAULT_BUDGET) -> Tuple[Any, Any, bool]:
+    """Return the value of state, a position in the game of game_key, for
+    the player to move, the best move there, and whether the value is exact
+    rather than estimated by a search of budget seconds.
+
+    As in the minimax strategies, the best move is the largest of the moves
+    with the best value.
+
+    >>> from subtract_square_state import SubtractSquareState
+    >>> analyse('s', SubtractSquareState(True, 18))
+    (1, 16, True)
+    """
+    move = winning_move_now(state)
+    if move is not None:
+        return state.WIN, move, True
+    if game_key == 's':
+        moves = winning_moves(state.current_total)
+        if moves:
+            return state.WIN, moves[-1], True
+        return state.LOSE, state.get_possible_moves()[-1], True
+    if game_key == 'h':
+        tablebase = open_tablebase(state.sidelength)
+        won = None if tablebase is None else tablebase.is_win(state)
+        if won is not None:
+            return (state.WIN if won else state.LOSE,
+                    tablebase_move(tablebase, state), True)
+    move, score, _, solved = _deepen(state, _DeepeningSearch(None), budget,
+                                     None)
+    return score, move, solved
+
+
+def completed_games(path: str) -> int:
+    """Return the number of games whose annotations are in the file at path,
+    first cutting off a line left half written by an interrupted analysis.
+    """
+    if not os.path.exists(path):
+        return 0
+    games, end = 0, 0
+    with open(path, 'rb') as file:
+        for line in file:
+            if not line.endswith(b'\n'):
+                break
+            games += 1
+            end += len(line)
+    if end < os.path.getsize(path):
+        os.truncate(path, end)
+    return games
+
+
+def _annotation(ply: int, state: 'GameState', move: Any,
+                result: Tuple[Any, Any, bool]) -> dict:
+    """Return the annotation of the position state, at which move was played
+    after ply moves, from the result of its analysis.
+    """
+    value, best, exact = result
+    return {'ply': ply, 'to_move': state.get_current_player_name(),
+            'played': move, 'value': value, 'best': best, 'exact': exact}
+
+
+def analyse_log(log_path: str, output_path: str,
+                budget: float = DEFAULT_BUDGET, workers: int = None,
+                cache_size: int = 1 << 20, window: int = 64,
+                report: Callable[[str], None] = None) -> TranspositionTable:
+    """Annotate every position of the games in the log at log_path, append
+    the annotations to output_path, and return the result cache.
+
+    Games already annotated in output_path are skipped. Positions are
+    analysed for budget seconds each on workers processes (one per CPU if
+    None), with the results of the last cache_size distinct positions kept
+    in the cache. At most window games are read ahead of the last one
+    written. If report is given, it is called with a line of progress after
+    every game written.
+    """
+    done = completed_games(output_path)
+    cache = TranspositionTable(cache_size)
+    pending = deque()
+    with ProcessPoolExecutor(workers) as pool, \
+            open(output_path, 'a') as output:
+        for index, record in enumerate(read_games(log_path)):
+            if index < done:
+                continue
+            game_key = _GAME_KEYS[record.game]
+            entries = []
+            for ply, state, move in positions(record):
+                key = (game_key, state.state_key())
+                future = cache.lookup(key)
+                if future is None:
+                    future = pool.submit(analyse, game_key, state, budget)
+                    cache.store(key, future)
+                entries.append((ply, state, move, future))
+            pending.append((index, entries))
+            while pending and (len(pending) >= window or all(
+                    entry[3].done() for entry in pending[0][1])):
+                _write_game(pending, output, cache, report)
+        while pending:
+            _write_game(pending, output, cache, report)
+    return cache
+
+
+def _write_game(pending: Deque[Tuple[int, List[Tuple[Any, ...]]]],
+                output: Any, cache: TranspositionTable,
+                report: Callable[[str], None]) -> None:
+    """Wait for the analysis of the first game in pending, and write its
+    annotations to output.
+    """
+    index, entries = pending.popleft()
+    annotations = [_annotation(ply, state, move, future.result())
+                   for ply, state, move, future in entries]
+    output.write(json.dumps({'game': index, 'positions': annotations}) +
+                 '\n')
+    output.flush()
+    if report is not None:
+        report("game {}: {} positions, cache hit rate {:.1%}".format(
+            index, len(annotations), cache.hit_rate()))
+
+
+def read_annotations(path: str) -> Iterator[dict]:
+    """Yield the annotations of each game in the file at path, in order."""
+    with open(path) as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def main(argv: List[str] = None) -> None:
+    """Annotate a game log from the command line."""
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Annotate every position in a game log.")
+    parser.add_argument('log', help="the game log to analyse")
+    parser.add_argument('output', help="the annotations file to append to")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help="seconds of search per unsolved position")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="the number of worker processes")
+    parser.add_argument('--cache-size', type=int, default=1 << 20,
+                        help="the number of positions to remember")
+    args = parser.parse_args(argv)
+    cache = analyse_log(args.log, args.output, args.budget, args.workers,
+                        args.cache_size, report=print)
+    print(cache)
+
+
+if __name__ == "__main__":
+    main()
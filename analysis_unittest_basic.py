@@ -0,0 +1,86 @@
+"""
+A subset of unittests for the game log analysis pipeline.
+
+These unittests annotate small game logs on a process pool and check the
+annotations, the result cache and resuming an interrupted analysis.
+"""
+import os
+import tempfile
+import unittest
+
+from analysis import analyse, analyse_log, completed_games, read_annotations
+from game_interface import play_game
+from game_log import GameLogWriter
+from stonehenge_state import StonehengeState
+
+
+class AnalysisUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.directory.name, 'games.log')
+        self.output = os.path.join(self.directory.name, 'annotations.jsonl')
+        self.records = [play_game('s', 'st', 'ro', 30),
+                        play_game('s', 'st', 'ro', 30),
+                        play_game('h', 'ro', 'ro', 1),
+                        play_game('s', 'ro', 'st', 12, p1_starts=False)]
+        with GameLogWriter(self.log) as log:
+            for record in self.records:
+                log.write(record)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_annotates_every_position(self):
+        """
+        Test that each move of each game is annotated in order, that repeated
+        positions come from the cache, and that a solved game is exact.
+        """
+        cache = analyse_log(self.log, self.output, budget=0.05, workers=2)
+        games = list(read_annotations(self.output))
+        self.assertEqual([game['game'] for game in games], [0, 1, 2, 3])
+        for game, record in zip(games, self.records):
+            self.assertEqual([entry['played'] for entry in game['positions']],
+                             list(record.moves))
+            self.assertEqual([entry['ply'] for entry in game['positions']],
+                             list(range(len(record.moves))))
+        self.assertEqual(games[0]['positions'], games[1]['positions'])
+        self.assertGreaterEqual(cache.hits, len(self.records[1].moves))
+        first = games[0]['positions'][0]
+        # 30 - 25 = 5 leaves the opponent a losing total.
+        self.assertEqual((first['value'], first['best'], first['exact']),
+                         (1, 25, True))
+        self.assertTrue(all(entry['exact'] for game in games
+                            for entry in game['positions']))
+
+    def test_resumes_after_interruption(self):
+        """
+        Test that an analysis cut off in the middle of a line starts again
+        after the last whole game, and that a finished one adds nothing.
+        """
+        analyse_log(self.log, self.output, budget=0.05, workers=1)
+        with open(self.output, 'rb') as file:
+            lines = file.readlines()
+        with open(self.output, 'wb') as file:
+            file.writelines(lines[:2])
+            file.write(lines[2][:10])
+        self.assertEqual(completed_games(self.output), 2)
+        analyse_log(self.log, self.output, budget=0.05, workers=1)
+        with open(self.output, 'rb') as file:
+            self.assertEqual(file.readlines(), lines)
+        analyse_log(self.log, self.output, budget=0.05, workers=1)
+        self.assertEqual(len(list(read_annotations(self.output))), 4)
+
+    def test_search_estimates_large_boards(self):
+        """
+        Test that a position too large to solve in the budget gets an
+        estimated value and a legal move.
+        """
+        state = StonehengeState(4, True)
+        value, best, exact = analyse('h', state, budget=0.05)
+        self.assertFalse(exact)
+        self.assertTrue(state.LOSE < value < state.WIN)
+        self.assertIn(best, state.get_possible_moves())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+"""
+A long-lived engine driving the strategies over a line protocol.
+
+The engine reads commands from stdin, one per line, and writes its replies to
+stdout, so another process can use the strategies without starting a new
+interpreter for every move. Everything the strategies cache, from the move
+ordering of the engine's own search to minimax_table and the tablebases,
+stays warm from one command to the next.
+
+Commands:
+    position <game> <size> [p1|p2] [moves <move> ...]
+        Set the position to the start of a game of <game>, a key of
+        playable_games, with starting total or side length <size> and the
+        given player to move first (p1 by default), after the moves given.
+        Replies "ok <player to move>".
+    go [depth <n>] [movetime <ms>] [strategy <key>]
+        Search the position in the background, at most <n> moves deep and
+        for at most <ms> milliseconds, and reply
+        "bestmove <move> score <score> depth <depth> nodes <nodes>" when
+        done, with the score for the player to move. With a strategy, a key
+        of usable_strategies, reply "bestmove <move>" with that strategy's
+        move instead, ignoring the limits. Without limits, the search runs
+        until it solves the position or is stopped. The depth must be at
+        least 1 and the movetime at least 0; a search one move deep always
+        finishes, however short the movetime. If the search fails, the
+        reply is an error instead.
+    stop
+        Stop the search, which replies with the best move it has found. A
+        strategy's search cannot be stopped, and is waited for.
+    clear
+        Forget what earlier searches learned. Replies "ok".
+    isready
+        Replies "readyok".
+    quit
+        Stop the search and exit.
+Any other command, or a command that cannot be carried out, gets a reply
+starting "error".
+"""
+import sys
+from threading import Lock, Thread
+from typing import Any, Callable, Iterable, List, Optional
+from game_interface import can_play, check_size, playable_games, \
+    usable_strategies
+from strategy import _deepen, _DeepeningSearch, winning_move_now
+
+class Engine:
+    """An engine answering protocol commands.
+
+    ========Attributes========
+    game: the game whose position is searched, or None if no position is set
+    game_key: the key in playable_games of game
+    search: the search state kept between searches
+    """
+    game: Optional['Game']
+    game_key: Optional[str]
+    search: _DeepeningSearch
+
+    def __init__(self, output: Callable[[str], None] = print) -> None:
+        """Initialize an engine with no position, writing its replies with
+        output.
+        """
+        self.game = None
+        self.game_key = None
+        self.search = _DeepeningSearch(None)
+        self._output = output
+        self._output_lock = Lock()
+        self._thread = None
+
+    def reply(self, line: str) -> None:
+        """Write the reply line, whichever thread it comes from."""
+        with self._output_lock:
+            self._output(line)
+
+    def handle(self, line: str) -> bool:
+        """Carry out the command line, and return whether to keep reading
+        commands.
+        """
+        words = line.split()
+        if not words:
+            return True
+        command, args = words[0], words[1:]
+        if command == 'quit':
+            self.stop()
+            return False
+        try:
+            if command == 'position':
+                self.set_position(args)
+            elif command == 'go':
+                self.go(args)
+            elif command == 'stop':
+                self.stop()
+            elif command == 'clear':
+                self.wait()
+                self.search = _DeepeningSearch(None)
+                self.reply('ok')
+            elif command == 'isready':
+                self.reply('readyok')
+            else:
+                raise ValueError("unknown command {!r}".format(command))
+        except (ValueError, KeyError, IndexError) as error:
+            self.reply('error {}'.format(error))
+        return True
+
+    def set_position(self, args: List[str]) -> None:
+        """Set the position from the arguments of a position command."""
+        self.wait()
+        game_key, size = args[0], int(args[1])
+        if game_key not in playable_games:
+            raise ValueError("unknown game {!r}".format(game_key))
+        check_size(game_key, size)
+        rest = args[2:]
+        p1_starts = True
+        if rest and rest[0] in ('p1', 'p2'):
+            p1_starts = rest.pop(0) == 'p1'
+        if rest and rest.pop(0) != 'moves':
+            raise ValueError("expected moves")
+        game = playable_games[game_key](p1_starts, size)
+        for string in rest:
+            move = game.str_to_move(string)
+            if not game.current_state.is_valid_move(move):
+                raise ValueError("illegal move {!r}".format(string))
+            game.current_state = game.current_state.make_move(move)
+        self.game, self.game_key = game, game_key
+        self.reply('ok {}'.format(
+            game.current_state.get_current_player_name()))
+
+    def go(self, args: List[str]) -> None:
+        """Start a search with the limits of a go command."""
+        if self._thread is not None and self._thread.is_alive():
+            raise ValueError("a search is already running")
+        if self.game is None:
+            raise ValueError("no position is set")
+        limits = dict(zip(args[::2], args[1::2]))
+        depth = int(limits.pop('depth')) if 'depth' in limits else None
+        budget = int(limits.pop('movetime')) / 1000 \
+            if 'movetime' in limits else None
+        strategy = limits.pop('strategy', None)
+        if limits or len(args) % 2:
+            raise ValueError("unknown limits {}".format(' '.join(args)))
+        if depth is not None and depth < 1:
+            raise ValueError("depth {} is too shallow to search".format(
+                depth))
+        if budget is not None and budget < 0:
+            raise ValueError("movetime cannot be negative")
+        if strategy is not None and (
+                strategy not in usable_strategies or strategy == 'i'
+                or not can_play(strategy, self.game_key)):
+            raise ValueError("{!r} cannot play this game".format(strategy))
+        if self.game.is_over(self.game.current_state):
+            self.reply('bestmove none')
+            return
+        self.search.stopped = False
+        self._thread = Thread(target=self._search,
+                              args=(depth, budget, strategy), daemon=True)
+        self._thread.start()
+
+    def _search(self, depth: Any, budget: Any, strategy: Any) -> None:
+        """Search the position, and reply with the best move, or with an
+        error if the search fails, so that a caller waiting for a reply
+        always gets one.
+        """
+        try:
+            self._best_move(depth, budget, strategy)
+        except Exception as error:
+            self.reply('error search failed: {!r}'.format(error))
+
+    def _best_move(self, depth: Any, budget: Any, strategy: Any) -> None:
+        """Search the position, and reply with the best move."""
+        if strategy is not None:
+            self.reply('bestmove {}'.format(
+                usable_strategies[strategy](self.game)))
+            return
+        state = self.game.current_state
+        self.search.nodes = 0
+        move = winning_move_now(state)
+        if move is not None:
+            score, depth = state.WIN, 1
+        else:
+            move, score, depth, _ = _deepen(state, self.search, budget,
+                                            depth)
+        self.reply('bestmove {} score {:.4g} depth {} nodes {}'.format(
+            move, score, depth, self.search.nodes))
+
+    def stop(self) -> None:
+        """Stop the search, if one is running, and wait for its reply."""
+        self.search.stopped = True
+        self.wait()
+
+    def wait(self) -> None:
+        """Wait for the search, if one is running, to finish."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run(self, lines: Iterable[str]) -> None:
+        """Carry out the commands in lines until quit or the last line, and
+        wait for the last search to finish.
+        """
+        for line in lines:
+            if not self.handle(line):
+                return
+        self.wait()
+
+
+def _write(line: str) -> None:
+    """Write line to stdout at once, for the process reading it."""
+    sys.stdout.write(line + '\n')
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    Engine(_write).run(sys.stdin)
@@ -0,0 +1,105 @@
+"""
+A subset of unittests for the engine protocol.
+
+These unittests send commands to an engine, both directly and through a
+child process over stdin and stdout, and check its replies.
+"""
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from engine import Engine
+
+
+class EngineUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.replies = []
+        self.engine = Engine(self.replies.append)
+
+    def test_position_and_search(self):
+        """
+        Test that a solved position reports the winning move and score, and
+        that a depth limit is kept.
+        """
+        self.engine.run(['position s 20 p2 moves 1',
+                         'go',
+                         'position h 2',
+                         'go depth 2'])
+        self.assertEqual(self.replies[0], 'ok p1')
+        # 19 - 9 = 10 leaves the opponent a losing total.
+        self.assertTrue(self.replies[1].startswith('bestmove 9 score 1 '))
+        self.assertEqual(self.replies[2], 'ok p1')
+        self.assertIn(' depth 2 ', self.replies[3])
+
+    def test_errors_keep_engine_running(self):
+        """
+        Test that bad commands get an error reply and the engine carries on.
+        """
+        self.engine.run(['go',
+                         'position s 5 moves 2',
+                         'position s 5 moves 4 1',
+                         'go',
+                         'position h 1',
+                         'go strategy st',
+                         'frobnicate',
+                         'isready'])
+        self.assertEqual([reply.split()[0] for reply in self.replies],
+                         ['error', 'error', 'ok', 'bestmove', 'ok', 'error',
+                          'error', 'readyok'])
+        self.assertEqual(self.replies[3], 'bestmove none')
+
+    def test_bad_sizes_and_failed_searches_reply(self):
+        """
+        Test that sizes no game can start from and limits no search can
+        keep to are refused, and that a search that fails still replies,
+        with an error.
+        """
+        self.engine.run(['position s -5', 'position h 0', 'go'])
+        self.assertEqual([reply.split()[0] for reply in self.replies],
+                         ['error', 'error', 'error'])
+        self.engine.handle('position s 8')
+        self.engine.run(['go depth 0', 'go depth -3', 'go movetime -1'])
+        self.assertEqual([reply.split()[0] for reply in self.replies[-3:]],
+                         ['error', 'error', 'error'])
+        with patch('engine._deepen', side_effect=RuntimeError('boom')):
+            self.engine.run(['go'])
+        self.assertTrue(self.replies[-1].startswith('error '))
+        self.assertIn('boom', self.replies[-1])
+
+    def test_stop_interrupts_search(self):
+        """
+        Test that stop ends an unlimited search with a move.
+        """
+        self.engine.handle('position h 3')
+        self.engine.handle('go')
+        self.assertTrue(self.engine.handle('stop'))
+        self.assertTrue(self.replies[-1].startswith('bestmove '))
+
+    def test_strategy_and_warm_search(self):
+        """
+        Test that a named strategy is played, and that the move ordering
+        learned by a search is kept for the next one.
+        """
+        self.engine.run(['position s 13', 'go strategy mr', 'go depth 3'])
+        self.assertEqual(self.replies[1], 'bestmove 1')
+        self.assertGreater(len(self.engine.search.best_moves), 0)
+        self.engine.run(['clear'])
+        self.assertEqual(len(self.engine.search.best_moves), 0)
+
+    def test_protocol_over_stdin(self):
+        """
+        Test the engine as a child process speaking over stdin and stdout.
+        """
+        result = subprocess.run(
+            [sys.executable, 'engine.py'],
+            input='position s 8\ngo movetime 200\n',
+            capture_output=True, text=True, timeout=60)
+        lines = result.stdout.splitlines()
+        self.assertEqual(lines[0], 'ok p1')
+        # 8 - 1 = 7 leaves the opponent a losing total.
+        self.assertTrue(lines[1].startswith('bestmove 1 score 1 '))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,9 +10,11 @@ class Game:
     Abstract class for a game to be played with two players.
     """
 
-    def __init__(self, p1_starts: bool) -> None:
+    def __init__(self, p1_starts: bool, size: Any = None) -> None:
         """
-        Initialize this Game, using p1_starts to find who the first player is.
+        Initialize this Game, using p1_starts to find who the first player is,
+        and size to set up the starting state, or asking the user for it if
+        size is None.
         """
         raise NotImplementedError
 
@@ -10,9 +10,16 @@ your own curiousity!)
 """
 # TODO: import the modules needed to make game_interface run.
 from strategy import *
-from typing import Any, Callable
+from functools import partial
+from time import perf_counter
+from typing import Any, Callable, NamedTuple, Optional, Tuple
 from subtract_square_game import SubtractSquareGame
 from stonehenge_game import StonehengeGame
+from subtract_square_solver import solved_table_strategy
+from mcts import mcts_strategy
+from parallel_strategy import parallel_alphabeta_minimax, lazy_smp_minimax
+from pn_search import pn_strategy
+from stonehenge_tablebase import tablebase_strategy
 
 # TODO: Replace None with the corresponding class name for your games.
 # 'h' should map to Stonehenge.
@@ -25,7 +32,108 @@ playable_games = {'s': SubtractSquareGame,
 usable_strategies = {'i': interactive_strategy,
                      'ro': rough_outcome_strategy,
                      'mr': recursive_minimax,
-                     'mi': iterative_minimax}
+                     'mi': iterative_minimax,
+                     'tr': memoized_minimax,
+                     'ti': iterative_memoized_minimax,
+                     'ar': alphabeta_minimax,
+                     'ai': iterative_alphabeta_minimax,
+                     'id': iterative_deepening_minimax,
+                     'dl': depth_limited_minimax,
+                     'mc': mcts_strategy,
+                     'pa': parallel_alphabeta_minimax,
+                     'ls': lazy_smp_minimax,
+                     'pn': pn_strategy,
+                     'tb': tablebase_strategy,
+                     'st': solved_table_strategy}
+
+# The games that strategies written for one game can play, by strategy key.
+# Strategies not listed here can play every game.
+strategy_games = {'st': ('s',),
+                  'tb': ('h',)}
+
+# The smallest starting total or side length of each game in playable_games.
+min_sizes = {'s': 0, 'h': 1}
+
+
+def check_size(game: str, size: Any) -> None:
+    """
+    Raise ValueError unless size is a starting total or side length that the
+    game with key game can be played with, so that the game never has to ask
+    for one.
+
+    >>> check_size('h', 2)
+    >>> check_size('h', 0)
+    Traceback (most recent call last):
+    ...
+    ValueError: Size 0 is too small for this game
+    """
+    if not isinstance(size, int) or isinstance(size, bool):
+        raise ValueError("Size {!r} is not a whole number".format(size))
+    if size < min_sizes.get(game, 0):
+        raise ValueError("Size {} is too small for this game".format(size))
+
+
+def strategy_name(strategy: Callable) -> str:
+    """
+    Return the name of strategy, for game records and messages. A strategy
+    configured with functools.partial is named after its function and the
+    arguments given to it.
+
+    >>> strategy_name(rough_outcome_strategy)
+    'rough_outcome_strategy'
+    >>> strategy_name(partial(mcts_strategy, playouts=50, budget=None))
+    'mcts_strategy(playouts=50, budget=None)'
+    """
+    if isinstance(strategy, partial):
+        args = [repr(arg) for arg in strategy.args] + [
+            '{}={!r}'.format(key, value)
+            for key, value in strategy.keywords.items()]
+        return '{}({})'.format(strategy_name(strategy.func), ', '.join(args))
+    return getattr(strategy, '__name__', repr(strategy))
+
+
+def can_play(strategy: Any, game: Any) -> bool:
+    """
+    Return whether strategy, a key of usable_strategies or a strategy, can
+    play game, a key of playable_games or a game class, as listed in
+    strategy_games.
+
+    >>> can_play('st', 's'), can_play('st', StonehengeGame)
+    (True, False)
+    >>> can_play(rough_outcome_strategy, 'h')
+    True
+    """
+    game_key = game if game in playable_games else next(
+        (key for key, cls in playable_games.items() if cls is game), None)
+    # A strategy configured with functools.partial plays as its function.
+    function = getattr(strategy, 'func', strategy)
+    strategy_keys = [key for key, value in usable_strategies.items()
+                     if key == strategy or value is function]
+    return game_key is None or all(
+        game_key in strategy_games.get(key, (game_key,))
+        for key in strategy_keys)
+
+
+class GameRecord(NamedTuple):
+    """The record of one game played through a GameInterface.
+
+    game: the name of the class of the game played
+    size: the starting total or side length of the game
+    p1_starts: whether Player 1 made the first move
+    p1_strategy: the name of Player 1's strategy
+    p2_strategy: the name of Player 2's strategy
+    moves: the moves made, in order
+    move_times: the number of seconds each move took to choose
+    winner: 'p1' or 'p2', or None if the game was a tie
+    """
+    game: str
+    size: Any
+    p1_starts: bool
+    p1_strategy: str
+    p2_strategy: str
+    moves: Tuple[Any, ...]
+    move_times: Tuple[float, ...]
+    winner: Optional[str]
 
 
 class GameInterface:
@@ -35,7 +143,8 @@ class GameInterface:
     """
 
     def __init__(self, game: Any, p1_strategy: Callable,
-                 p2_strategy: Callable[[Any], Any]) -> None:
+                 p2_strategy: Callable[[Any], Any], p1_starts: bool = None,
+                 size: Any = None) -> None:
         """
         Initialize this GameInterface, setting its active game to game, and
         using the strategies p1_strategy for Player 1 and p2_strategy for
@@ -47,41 +156,67 @@ class GameInterface:
         :type p1_strategy:
         :param p2_strategy: The strategy for Play 2.
         :type p2_strategy:
+        :param p1_starts: Whether Player 1 makes the first move, or None to
+                          ask the user.
+        :type p1_starts: bool
+        :param size: The starting total or side length of the game, or None
+                     to ask the user.
+        :type size: Any
+        :raises ValueError: If either strategy cannot play game.
         """
-        first_player = input("Type y if player 1 is to make the first move: ")
-        is_p1_turn = False
-        if first_player.lower() == 'y':
-            is_p1_turn = True
+        for strategy in (p1_strategy, p2_strategy):
+            if not can_play(strategy, game):
+                raise ValueError("{} cannot play {}".format(
+                    strategy_name(strategy), game.__name__))
+        if p1_starts is None:
+            first_player = input(
+                "Type y if player 1 is to make the first move: ")
+            p1_starts = first_player.lower() == 'y'
 
-        self.game = game(is_p1_turn)
+        self.game = game(p1_starts, size)
+        self.p1_starts = p1_starts
+        self.size = size
         self.p1_strategy = p1_strategy
         self.p2_strategy = p2_strategy
 
-    def play(self) -> None:
+    def play(self, quiet: bool = False) -> GameRecord:
         """
-        Play the game.
+        Play the game, and return its record. Unless quiet is True, print the
+        moves and boards as the game goes.
+
+        A quiet game has nobody to correct an illegal move, so an illegal
+        move raises ValueError instead of asking the strategy again.
         """
         current_state = self.game.current_state
+        moves, move_times = [], []
 
-        print(self.game.get_instructions())
-        print(current_state)
+        if not quiet:
+            print(self.game.get_instructions())
+            print(current_state)
 
         # Pick moves until the game is over
         while not self.game.is_over(current_state):
             move_to_make = None
 
             # Print out all of the valid moves
-            possible_moves = current_state.get_possible_moves()
-            print("The current available moves are:")
-            for move in possible_moves:
-                print(move)
+            if not quiet:
+                possible_moves = current_state.get_possible_moves()
+                print("The current available moves are:")
+                for move in possible_moves:
+                    print(move)
 
             # Pick a (legal) move.
+            current_strategy = self.p2_strategy
+            if current_state.get_current_player_name() == 'p1':
+                current_strategy = self.p1_strategy
+            start = perf_counter()
             while not current_state.is_valid_move(move_to_make):
-                current_strategy = self.p2_strategy
-                if current_state.get_current_player_name() == 'p1':
-                    current_strategy = self.p1_strategy
                 move_to_make = current_strategy(self.game)
+                if quiet and not current_state.is_valid_move(move_to_make):
+                    raise ValueError("{} chose the illegal move {!r}".format(
+                        strategy_name(current_strategy), move_to_make))
+            move_times.append(perf_counter() - start)
+            moves.append(move_to_make)
 
             # Apply the move
             current_player_name = current_state.get_current_player_name()
@@ -89,17 +224,61 @@ class GameInterface:
             self.game.current_state = new_game_state
             current_state = self.game.current_state
 
-            print("{} made the move {}. The game's state is now:".format(
-                current_player_name, move_to_make))
-            print(current_state)
+            if not quiet:
+                print("{} made the move {}. The game's state is now:".format(
+                    current_player_name, move_to_make))
+                print(current_state)
 
         # Print out the winner of the game
+        winner = None
         if self.game.is_winner("p1"):
-            print("Player 1 is the winner!")
+            winner = 'p1'
         elif self.game.is_winner("p2"):
-            print("Player 2 is the winner!")
-        else:
-            print("It's a tie!")
+            winner = 'p2'
+        if not quiet:
+            if winner == 'p1':
+                print("Player 1 is the winner!")
+            elif winner == 'p2':
+                print("Player 2 is the winner!")
+            else:
+                print("It's a tie!")
+        return GameRecord(type(self.game).__name__, self.size,
+                          self.p1_starts, strategy_name(self.p1_strategy),
+                          strategy_name(self.p2_strategy), tuple(moves),
+                          tuple(move_times), winner)
+
+
+def play_game(game: Any, p1_strategy: Callable, p2_strategy: Callable,
+              size: Any, p1_starts: bool = True) -> GameRecord:
+    """
+    Play a game silently, with no input from the user, and return its
+    record.
+
+    :param game: The game to be played, a key of playable_games or a game
+                 class.
+    :type game: Any
+    :param p1_strategy: The strategy for Player 1, a key of
+                        usable_strategies or a strategy.
+    :type p1_strategy: Any
+    :param p2_strategy: The strategy for Player 2, a key of
+                        usable_strategies or a strategy.
+    :type p2_strategy: Any
+    :param size: The starting total or side length of the game.
+    :type size: Any
+    :param p1_starts: Whether Player 1 makes the first move.
+    :type p1_starts: bool
+    :return: The record of the game.
+    :rtype: GameRecord
+
+    >>> record = play_game('s', 'st', 'mr', 18)
+    >>> record.moves, record.winner
+    ((16, 1, 1), 'p1')
+    """
+    game = playable_games.get(game, game)
+    p1_strategy = usable_strategies.get(p1_strategy, p1_strategy)
+    p2_strategy = usable_strategies.get(p2_strategy, p2_strategy)
+    return GameInterface(game, p1_strategy, p2_strategy, p1_starts,
+                         size).play(quiet=True)
 
 
 if __name__ == '__main__':
@@ -107,24 +286,26 @@ if __name__ == '__main__':
                        playable_games[key] is not None else
                        "'{}': None".format(key) for key in playable_games])
 
-    strategies = ", ".join(["'{}': {}".format(key,
-                                              usable_strategies[key].__name__)
-                            if usable_strategies[key] is not None else
-                            "'{}': None".format(key)
-                            for key in usable_strategies])
-
     chosen_game = ''
     while chosen_game not in playable_games.keys():
         chosen_game = input(
             "Select the game you want to play ({}): ".format(games))
 
+    # Only offer the strategies that can play the chosen game.
+    allowed = [key for key in usable_strategies
+               if usable_strategies[key] is not None
+               and can_play(key, chosen_game)]
+    strategies = ", ".join(["'{}': {}".format(key,
+                                              usable_strategies[key].__name__)
+                            for key in allowed])
+
     p1 = ''
     p2 = ''
 
-    while p1 not in usable_strategies.keys():
+    while p1 not in allowed:
         p1 = input("Select the strategy for Player 1 ({}): ".format(strategies))
 
-    while p2 not in usable_strategies.keys():
+    while p2 not in allowed:
         p2 = input("Select the strategy for Player 2 ({}): ".format(strategies))
 
     GameInterface(playable_games[chosen_game], usable_strategies[p1],
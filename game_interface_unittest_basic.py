@@ -0,0 +1,108 @@
+"""
+A subset of unittests for playing games through the GameInterface without
+a user.
+
+These unittests check that games can be set up and played entirely from
+arguments, with nothing read from input or printed, and that the record of
+each game is complete.
+"""
+import unittest
+from functools import partial
+from unittest.mock import patch
+
+from game_interface import GameInterface, play_game, playable_games, \
+    usable_strategies
+
+
+class HeadlessGameUnitTests(unittest.TestCase):
+    @patch('builtins.print')
+    @patch('builtins.input', side_effect=AssertionError("input was read"))
+    def test_headless_games_read_and_print_nothing(self, input_function,
+                                                   print_function):
+        """
+        Test that games played through play_game never read input nor print.
+        """
+        play_game('s', 'mr', 'ro', 20)
+        play_game('h', 'dl', 'ro', 2, p1_starts=False)
+        print_function.assert_not_called()
+
+    def test_record_of_subtract_square(self):
+        """
+        Test that the record of a game of SubtractSquare holds its moves in
+        order, a time for each and the winner.
+        """
+        record = play_game('s', 'st', 'mr', 18)
+        self.assertEqual(record.game, 'SubtractSquareGame')
+        self.assertEqual(record.size, 18)
+        self.assertEqual(record.moves, (16, 1, 1))
+        self.assertEqual(len(record.move_times), 3)
+        self.assertEqual(record.winner, 'p1')
+        self.assertEqual((record.p1_strategy, record.p2_strategy),
+                         ('solved_table_strategy', 'recursive_minimax'))
+
+    def test_record_replays_to_winner(self):
+        """
+        Test that replaying the moves of a game of Stonehenge from either
+        first player ends the game with the recorded winner.
+        """
+        for p1_starts in (True, False):
+            record = play_game(playable_games['h'], usable_strategies['ar'],
+                               usable_strategies['mc'], 2, p1_starts)
+            game = playable_games['h'](p1_starts, 2)
+            for move in record.moves:
+                self.assertTrue(game.current_state.is_valid_move(move))
+                game.current_state = game.current_state.make_move(move)
+            self.assertTrue(game.is_over(game.current_state))
+            self.assertTrue(game.is_winner(record.winner))
+
+    def test_illegal_move_raises_when_quiet(self):
+        """
+        Test that a quiet game stops on an illegal move instead of asking
+        the strategy again forever.
+        """
+        def illegal_strategy(game):
+            return 3
+
+        with self.assertRaises(ValueError):
+            play_game('s', illegal_strategy, 'mr', 10)
+
+    def test_partial_strategies_are_named(self):
+        """
+        Test that a strategy configured with functools.partial plays and is
+        recorded under its function and arguments.
+        """
+        strategy = partial(usable_strategies['mc'], playouts=50, budget=None)
+        record = play_game('s', strategy, 'st', 10)
+        self.assertEqual(record.p1_strategy,
+                         'mcts_strategy(playouts=50, budget=None)')
+        self.assertEqual(record.p2_strategy, 'solved_table_strategy')
+
+    @patch('builtins.input', side_effect=AssertionError("input was read"))
+    def test_strategy_for_another_game_is_refused(self, input_function):
+        """
+        Test that a strategy written for one game is refused before another
+        game starts, instead of failing in the middle of it.
+        """
+        with self.assertRaises(ValueError):
+            play_game('h', 'st', 'ro', 2)
+        with self.assertRaises(ValueError):
+            GameInterface(playable_games['s'], usable_strategies['ro'],
+                          usable_strategies['tb'])
+
+    @patch('builtins.print')
+    @patch('builtins.input', side_effect=['y', '10'])
+    def test_interactive_setup_still_asks(self, input_function,
+                                          print_function):
+        """
+        Test that a GameInterface given no starting player or size still asks
+        the user for them.
+        """
+        interface = GameInterface(playable_games['s'],
+                                  usable_strategies['st'],
+                                  usable_strategies['mr'])
+        self.assertEqual(interface.game.current_state.current_total, 10)
+        self.assertEqual(interface.play().winner, 'p2')
+
+
+if __name__ == "__main__":
+    unittest.main()
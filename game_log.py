@@ -0,0 +1,246 @@
+"""
+A compact binary log of game records.
+
+A log is a file of GameRecords, written by appending one record at a time
+and read back one at a time, so a log of any size can be written and scanned
+without holding it in memory.
+
+A log file holds the magic string, then a sequence of items, each starting
+with its length as a varint (an unsigned integer in 7-bit groups, least
+significant first, with the top bit set on every byte but the last):
+    - an item of length 0 starts a new string table. Every writer starts one
+      when it opens the log, so logs appended to by several writers read
+      back correctly.
+    - any other item is one record, holding:
+        - a flags byte: whether Player 1 started, the winner (0 for a tie, 1
+          for Player 1, 2 for Player 2) shifted left 1, and whether the moves
+          are strings rather than integers shifted left 3;
+        - the name of the game, and the strategy names of Player 1 and of
+          Player 2, each as a string reference;
+        - the size, and the number of moves, as varints;
+        - the moves, as varints or as string references;
+        - the time taken by each move, in microseconds, as varints.
+A string reference is a varint: 0 for a new string, followed by its length
+and its UTF-8 bytes, which is added to the string table; otherwise one more
+than the string's index in the table. Each name, and each Stonehenge cell
+label, is thus written out once per writer, and takes a byte or two after
+that.
+
+If a writer is interrupted in the middle of a record, the reader stops at the
+end of the last whole record.
+"""
+import os
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+from game_interface import GameRecord
+
+_MAGIC = b'GAMELOG\x02'
+_WINNERS = {None: 0, 'p1': 1, 'p2': 2}
+_WINNER_NAMES = {code: name for name, code in _WINNERS.items()}
+_P1_STARTS = 1
+_STRING_MOVES = 8
+
+
+def _put_varint(out: bytearray, number: int) -> None:
+    """Append the unsigned integer number to out as a varint."""
+    while number > 0x7f:
+        out.append(number & 0x7f | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _get_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Return the varint at pos in data, and the position after it.
+
+    >>> out = bytearray()
+    >>> _put_varint(out, 300)
+    >>> bytes(out), _get_varint(out, 0)
+    (b'\\xac\\x02', (300, 2))
+    """
+    number = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number, pos
+        shift += 7
+
+
+class GameLogWriter:
+    """A writer appending records to a log file.
+
+    ========Attributes========
+    path: the log file
+    """
+    path: str
+
+    def __init__(self, path: str) -> None:
+        """Open the log at path for appending, creating it if needed."""
+        self.path = path
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(_MAGIC)
+        self._file.write(b'\0')
+        self._strings = {}
+
+    def _put_string(self, out: bytearray, string: str) -> None:
+        """Append a reference to string to out, defining it if it is new."""
+        index = self._strings.get(string)
+        if index is not None:
+            _put_varint(out, index + 1)
+            return
+        self._strings[string] = len(self._strings)
+        encoded = string.encode('utf-8')
+        out.append(0)
+        _put_varint(out, len(encoded))
+        out += encoded
+
+    def write(self, record: GameRecord) -> None:
+        """Append record to the log.
+
+        Moves must be all non-negative integers or all strings.
+        """
+        if len(record.move_times) != len(record.moves):
+            raise ValueError("There must be one time for each move")
+        string_moves = bool(record.moves) and isinstance(record.moves[0],
+                                                         str)
+        out = bytearray()
+        out.append((_P1_STARTS if record.p1_starts else 0)
+                   | _WINNERS[record.winner] << 1
+                   | (_STRING_MOVES if string_moves else 0))
+        self._put_string(out, record.game)
+        self._put_string(out, record.p1_strategy)
+        self._put_string(out, record.p2_strategy)
+        _put_varint(out, record.size)
+        _put_varint(out, len(record.moves))
+        if string_moves:
+            for move in record.moves:
+                self._put_string(out, move)
+        else:
+            for move in record.moves:
+                _put_varint(out, move)
+        for seconds in record.move_times:
+            _put_varint(out, round(seconds * 1e6))
+        item = bytearray()
+        _put_varint(item, len(out))
+        self._file.write(item + out)
+
+    def flush(self) -> None:
+        """Write the records written so far out to the file."""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the log."""
+        self._file.close()
+
+    def __enter__(self) -> 'GameLogWriter':
+        """Return this writer, to close when the with block ends."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the log at the end of a with block."""
+        self.close()
+
+
+def _read_item_length(file: BinaryIO) -> int:
+    """Return the length of the next item in file, or -1 at the end of the
+    file.
+    """
+    number = shift = 0
+    while True:
+        byte = file.read(1)
+        if not byte:
+            return -1
+        number |= (byte[0] & 0x7f) << shift
+        if byte[0] < 0x80:
+            return number
+        shift += 7
+
+
+def _get_string(data: bytes, pos: int,
+                strings: List[str]) -> Tuple[str, int]:
+    """Return the string referred to at pos in data, and the position after
+    the reference, adding the string to strings if it is defined there.
+    """
+    reference, pos = _get_varint(data, pos)
+    if reference == 0:
+        length, pos = _get_varint(data, pos)
+        strings.append(data[pos:pos + length].decode('utf-8'))
+        pos += length
+        reference = len(strings)
+    return strings[reference - 1], pos
+
+
+def _decode(data: bytes, strings: List[str]) -> GameRecord:
+    """Return the record encoded in data, adding the strings it defines to
+    strings.
+    """
+    flags = data[0]
+    pos = 1
+    names = []
+    for _ in range(3):
+        name, pos = _get_string(data, pos, strings)
+        names.append(name)
+    size, pos = _get_varint(data, pos)
+    count, pos = _get_varint(data, pos)
+    moves = []
+    for _ in range(count):
+        if flags & _STRING_MOVES:
+            move, pos = _get_string(data, pos, strings)
+        else:
+            move, pos = _get_varint(data, pos)
+        moves.append(move)
+    moves = tuple(moves)
+    times = []
+    for _ in range(count):
+        micros, pos = _get_varint(data, pos)
+        times.append(micros / 1e6)
+    return GameRecord(names[0], size, bool(flags & _P1_STARTS), names[1],
+                      names[2], moves, tuple(times),
+                      _WINNER_NAMES[flags >> 1 & 3])
+
+
+def read_games(path: str) -> Iterator[GameRecord]:
+    """Yield the records of the log at path, in the order they were written.
+
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'example.log')
+    >>> record = GameRecord('SubtractSquareGame', 5, True, 'a', 'b',
+    ...                     (4, 1), (0.5, 0.25), 'p2')
+    >>> with GameLogWriter(path) as log:
+    ...     log.write(record)
+    >>> list(read_games(path)) == [record]
+    True
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError("{} is not a game log".format(path))
+        strings = []
+        while True:
+            length = _read_item_length(file)
+            if length < 0:
+                return
+            if length == 0:
+                strings = []
+                continue
+            data = file.read(length)
+            if len(data) < length:
+                # The writer was interrupted in the middle of this record.
+                return
+            yield _decode(data, strings)
+
+
+def log_stats(path: str) -> Dict[str, int]:
+    """Return the number of records and moves in the log at path, and its
+    size in bytes, reading one record at a time.
+    """
+    games = moves = 0
+    for record in read_games(path):
+        games += 1
+        moves += len(record.moves)
+    return {'games': games, 'moves': moves, 'bytes': os.path.getsize(path)}
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
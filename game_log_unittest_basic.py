@@ -0,0 +1,113 @@
+"""
+A subset of unittests for the binary game log.
+
+These unittests write the records of real games to a log and check that they
+read back unchanged, across writers and after an interrupted write.
+"""
+import os
+import tempfile
+import unittest
+
+from game_interface import GameRecord, play_game
+from game_log import GameLogWriter, log_stats, read_games
+from tournament import main
+
+
+class GameLogUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'games.log')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def records(self):
+        """
+        Return the records of a few games of each game, with times rounded
+        to the microseconds the log keeps.
+        """
+        records = [play_game('s', 'st', 'ro', 40),
+                   play_game('h', 'ro', 'ro', 2, p1_starts=False),
+                   GameRecord('StonehengeGame', 1, True, 'x', 'y', (),
+                              (), None)]
+        return [record._replace(move_times=tuple(
+            round(seconds * 1e6) / 1e6 for seconds in record.move_times))
+            for record in records]
+
+    def test_records_round_trip(self):
+        """
+        Test that records written by two writers in turn read back the same.
+        """
+        records = self.records()
+        with GameLogWriter(self.path) as log:
+            for record in records:
+                log.write(record)
+        with GameLogWriter(self.path) as log:
+            log.write(records[1])
+        self.assertEqual(list(read_games(self.path)),
+                         records + [records[1]])
+        stats = log_stats(self.path)
+        self.assertEqual(stats['games'], 4)
+        self.assertEqual(stats['moves'], sum(len(record.moves) for record
+                                             in records + [records[1]]))
+
+    def test_two_letter_cells_round_trip(self):
+        """
+        Test that the moves of a board with cells labelled past 'Z' read
+        back whole, along with the times that follow them.
+        """
+        record = self.records()[1]
+        big = play_game('h', 'ro', 'ro', 6)
+        big = big._replace(move_times=tuple(
+            round(seconds * 1e6) / 1e6 for seconds in big.move_times))
+        self.assertTrue(any(len(move) == 2 for move in big.moves))
+        with GameLogWriter(self.path) as log:
+            log.write(big)
+            log.write(record)
+        self.assertEqual(list(read_games(self.path)), [big, record])
+
+    def test_log_is_compact(self):
+        """
+        Test that repeated records cost a few bytes per move once the names
+        are in the string table.
+        """
+        record = self.records()[0]
+        with GameLogWriter(self.path) as log:
+            log.write(record)
+        first = os.path.getsize(self.path)
+        with GameLogWriter(self.path) as log:
+            for _ in range(100):
+                log.write(record)
+        per_record = (os.path.getsize(self.path) - first) / 100
+        self.assertLess(per_record, 10 + 5 * len(record.moves))
+
+    def test_interrupted_write(self):
+        """
+        Test that a record cut off by a crash is skipped, and that a file
+        that is not a log is refused.
+        """
+        records = self.records()
+        with GameLogWriter(self.path) as log:
+            for record in records[:2]:
+                log.write(record)
+        with open(self.path, 'rb+') as file:
+            file.truncate(os.path.getsize(self.path) - 3)
+        self.assertEqual(list(read_games(self.path)), records[:1])
+        with open(self.path, 'wb') as file:
+            file.write(b'not a log')
+        with self.assertRaises(ValueError):
+            list(read_games(self.path))
+
+    def test_tournament_log(self):
+        """
+        Test that a tournament appends every game it plays to its log.
+        """
+        main(['mr', 'ro', '--totals', '6', '--workers', '1',
+              '--log', self.path], lambda line: None)
+        records = list(read_games(self.path))
+        self.assertEqual(len(records), 2)
+        self.assertEqual({record.size for record in records}, {6})
+
+
+if __name__ == "__main__":
+    unittest.main()
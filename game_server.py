@@ -0,0 +1,325 @@
+"""
+An asyncio server hosting many games at once over a local socket.
+
+Each client connection sends requests and receives replies as JSON objects,
+one per line. A connection may open any number of game sessions, in which
+each player is either a human, whose moves the client sends, or a strategy
+from usable_strategies, whose moves the server chooses. Strategies run on a
+pool of worker processes, so a slow search in one session never holds up the
+others.
+
+Requests:
+    {"op": "new", "game": "s", "size": 20, "p1_starts": true,
+     "p1": "human", "p2": "mr"}
+    {"op": "move", "session": 1, "move": "4"}
+    {"op": "state", "session": 1}
+    {"op": "close", "session": 1}
+Every reply has "ok", and either "error" or the session number and its
+"state": the player to move, the moves so far, the legal moves, and whether
+the game is over and who won. After a human move, the server plays any
+strategy moves that follow before replying.
+
+Run from the command line to serve, or to load test a running server:
+    python game_server.py serve --port 8765 --workers 4
+    python game_server.py load --port 8765 --sessions 100 --strategy ro
+"""
+import asyncio
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from random import Random
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+from game_interface import can_play, check_size, playable_games, \
+    usable_strategies
+
+HUMAN = 'human'
+
+
+def _choose_move(game_key: str, size: Any, state: 'GameState',
+                 strategy_key: str) -> Any:
+    """Return the move the strategy strategy_key chooses from state, in a
+    game of game_key with size size. Runs in a worker process.
+    """
+    game = playable_games[game_key](state.p1_turn, size)
+    game.current_state = state
+    return usable_strategies[strategy_key](game)
+
+
+class Session:
+    """One game hosted by the server.
+
+    ========Attributes========
+    game_key: the key in playable_games of the game played
+    size: the starting total or side length of the game
+    game: the game played
+    players: the strategy key, or HUMAN, of each player by name
+    moves: the moves made so far
+    lock: held while a request is changing the session
+    """
+    game_key: str
+    size: Any
+    game: 'Game'
+    players: Dict[str, str]
+    moves: List[Any]
+    lock: asyncio.Lock
+
+    def __init__(self, game_key: str, size: Any, p1_starts: bool, p1: str,
+                 p2: str) -> None:
+        """Start a game of game_key with size size between p1 and p2."""
+        if game_key not in playable_games:
+            raise ValueError("Unknown game {!r}".format(game_key))
+        check_size(game_key, size)
+        for player in (p1, p2):
+            if player != HUMAN and (
+                    player not in usable_strategies or player == 'i'
+                    or not can_play(player, game_key)):
+                raise ValueError("{!r} cannot play this game".format(player))
+        self.game_key = game_key
+        self.size = size
+        self.game = playable_games[game_key](p1_starts, size)
+        self.players = {'p1': p1, 'p2': p2}
+        self.moves = []
+        self.lock = asyncio.Lock()
+
+    def is_over(self) -> bool:
+        """Return whether the game of this session is over."""
+        return self.game.is_over(self.game.current_state)
+
+    def to_move(self) -> str:
+        """Return the name of the player to move."""
+        return self.game.current_state.get_current_player_name()
+
+    def play(self, move: Any) -> None:
+        """Make move in this session's game, raising ValueError if it is not
+        legal.
+        """
+        state = self.game.current_state
+        if not state.is_valid_move(move):
+            raise ValueError("{!r} is not a legal move".format(move))
+        self.game.current_state = state.make_move(move)
+        self.moves.append(move)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the state of this session, to send to a client."""
+        over = self.is_over()
+        winner = None
+        if over:
+            winner = next((player for player in ('p1', 'p2')
+                           if self.game.is_winner(player)), None)
+        return {'to_move': None if over else self.to_move(),
+                'moves': self.moves,
+                'possible': [] if over else
+                self.game.current_state.get_possible_moves(),
+                'over': over, 'winner': winner}
+
+
+class GameServer:
+    """A host for many game sessions, choosing strategy moves on a process
+    pool.
+
+    ========Attributes========
+    sessions: the open sessions, by number
+    pool: the worker processes that run the strategies
+    """
+    sessions: Dict[int, Session]
+    pool: ProcessPoolExecutor
+
+    def __init__(self, workers: int = None) -> None:
+        """Initialize a server with no sessions, running strategies on
+        workers processes (one per CPU if None).
+        """
+        self.sessions = {}
+        # Workers are spawned rather than forked, since a forked worker would
+        # hold copies of the open client sockets and keep them from closing.
+        self.pool = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context('spawn'))
+        self._numbers = count(1)
+        self._clients = set()
+
+    async def start(self, host: str = '127.0.0.1',
+                    port: int = 0) -> asyncio.AbstractServer:
+        """Start listening on host and port, a free port if 0, and return the
+        asyncio server.
+        """
+        return await asyncio.start_server(self._serve_client, host, port)
+
+    async def stop(self, listener: asyncio.AbstractServer) -> None:
+        """Stop listener accepting clients, and wait for the clients already
+        connected to disconnect.
+        """
+        listener.close()
+        await listener.wait_closed()
+        await asyncio.gather(*self._clients)
+
+    def close(self) -> None:
+        """Shut down the worker processes of this server."""
+        self.pool.shutdown(cancel_futures=True)
+
+    async def _serve_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of one client until it disconnects."""
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.handle(line)
+                writer.write(json.dumps(reply).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(task)
+            writer.close()
+
+    async def handle(self, line: bytes) -> Dict[str, Any]:
+        """Return the reply to the request line."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object")
+            op = request.get('op')
+            if op == 'new':
+                session = Session(request['game'], request['size'],
+                                  request.get('p1_starts', True),
+                                  request.get('p1', HUMAN),
+                                  request.get('p2', HUMAN))
+                async with session.lock:
+                    await self._play_strategies(session)
+                number = next(self._numbers)
+                self.sessions[number] = session
+            elif op in ('move', 'state', 'close'):
+                number = request['session']
+                session = self.sessions.get(number)
+                if session is None:
+                    raise ValueError("No session {!r}".format(number))
+                if op == 'close':
+                    del self.sessions[number]
+                    return {'ok': True, 'session': number}
+                if op == 'move':
+                    async with session.lock:
+                        if session.is_over():
+                            raise ValueError("The game is over")
+                        if session.players[session.to_move()] != HUMAN:
+                            raise ValueError("It is not a human's turn")
+                        session.play(session.game.str_to_move(
+                            str(request['move'])))
+                        await self._play_strategies(session)
+            else:
+                raise ValueError("Unknown op {!r}".format(op))
+        except (ValueError, KeyError, TypeError) as error:
+            return {'ok': False, 'error': str(error)}
+        return {'ok': True, 'session': number, 'state': session.summary()}
+
+    async def _play_strategies(self, session: Session) -> None:
+        """Play the moves of session's strategies until the game is over or
+        it is a human's turn, choosing them on the process pool. Raises
+        ValueError if a strategy fails to choose a move.
+        """
+        loop = asyncio.get_running_loop()
+        while not session.is_over():
+            strategy = session.players[session.to_move()]
+            if strategy == HUMAN:
+                return
+            try:
+                move = await loop.run_in_executor(
+                    self.pool, _choose_move, session.game_key, session.size,
+                    session.game.current_state, strategy)
+            except Exception as error:
+                raise ValueError("{} failed to choose a move: {!r}".format(
+                    strategy, error)) from error
+            session.play(move)
+
+
+async def _client_game(host: str, port: int, game: str, size: Any,
+                       strategy: str, random: Random,
+                       latencies: List[float]) -> Optional[str]:
+    """Play one game as a human making random moves against strategy on the
+    server at host and port, adding the time of each request to latencies,
+    and return the winner.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        request = {'op': 'new', 'game': game, 'size': size,
+                   'p1_starts': random.random() < 0.5,
+                   'p1': HUMAN, 'p2': strategy}
+        while True:
+            start = perf_counter()
+            writer.write(json.dumps(request).encode('utf-8') + b'\n')
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            latencies.append(perf_counter() - start)
+            if not reply['ok']:
+                raise RuntimeError(reply['error'])
+            state = reply['state']
+            if state['over']:
+                return state['winner']
+            request = {'op': 'move', 'session': reply['session'],
+                       'move': random.choice(state['possible'])}
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def load_test(host: str, port: int, sessions: int, game: str = 's',
+                    size: Any = 30, strategy: str = 'ro',
+                    seed: int = 0) -> Dict[str, float]:
+    """Play sessions games at once against strategy on the server at host
+    and port, each as a client making random moves, and return the number
+    of games, games per second, and the mean and 95th percentile request
+    latency in seconds.
+    """
+    random = Random(seed)
+    latencies = []
+    start = perf_counter()
+    await asyncio.gather(*[
+        _client_game(host, port, game, size, strategy,
+                     Random(random.random()), latencies)
+        for _ in range(sessions)])
+    seconds = perf_counter() - start
+    latencies.sort()
+    return {'games': sessions,
+            'games_per_sec': sessions / seconds if seconds else 0.0,
+            'mean_latency': sum(latencies) / len(latencies),
+            'p95_latency': latencies[int(0.95 * (len(latencies) - 1))]}
+
+
+async def serve(host: str, port: int, workers: int = None) -> None:
+    """Serve games on host and port until cancelled."""
+    server = GameServer(workers)
+    listener = await server.start(host, port)
+    print("Serving games on {}:{}".format(
+        *listener.sockets[0].getsockname()[:2]))
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.stop(listener)
+        server.close()
+
+
+def main(argv: List[str] = None) -> None:
+    """Serve games, or load test a server, from the command line."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Host games over a socket.")
+    parser.add_argument('command', choices=('serve', 'load'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--game', default='s', choices=sorted(playable_games))
+    parser.add_argument('--size', type=int, default=30)
+    parser.add_argument('--strategy', default='ro')
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        asyncio.run(serve(args.host, args.port, args.workers))
+    else:
+        print(asyncio.run(load_test(args.host, args.port, args.sessions,
+                                    args.game, args.size, args.strategy)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+A subset of unittests for the asyncio game server.
+
+These unittests start a server on a free local port, play games on it over
+the socket, and check the replies and that the sessions stay independent.
+"""
+import asyncio
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from game_server import GameServer, load_test
+
+
+class GameServerUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.server = GameServer(workers=2)
+
+    def tearDown(self):
+        self.server.close()
+
+    def run_with_server(self, client):
+        """
+        Run the coroutine function client with the host and port of a running
+        server, and return its result.
+        """
+        async def run():
+            listener = await self.server.start()
+            host, port = listener.sockets[0].getsockname()[:2]
+            try:
+                return await client(host, port)
+            finally:
+                await self.server.stop(listener)
+        return asyncio.run(run())
+
+    def test_session_plays_strategy_replies(self):
+        """
+        Test that a human move is answered with the strategy's move, and
+        that illegal requests get an error without ending the session.
+        """
+        async def client(host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            replies = []
+            for request in [
+                    {'op': 'new', 'game': 's', 'size': 6, 'p1': 'human',
+                     'p2': 'mr'},
+                    {'op': 'move', 'session': 1, 'move': '3'},
+                    {'op': 'move', 'session': 1, 'move': '4'},
+                    {'op': 'move', 'session': 1, 'move': '1'},
+                    {'op': 'state', 'session': 1},
+                    {'op': 'close', 'session': 1},
+                    {'op': 'state', 'session': 1}]:
+                writer.write(json.dumps(request).encode('utf-8') + b'\n')
+                await writer.drain()
+                replies.append(json.loads(await reader.readline()))
+            writer.close()
+            await writer.wait_closed()
+            return replies
+        replies = self.run_with_server(client)
+        self.assertEqual(replies[0]['state']['possible'], [1, 4])
+        self.assertFalse(replies[1]['ok'])
+        # 6 - 4 = 2, then the strategy takes 1 and the human the last 1.
+        self.assertEqual(replies[2]['state']['moves'], [4, 1])
+        self.assertEqual(replies[3]['state'],
+                         {'to_move': None, 'moves': [4, 1, 1],
+                          'possible': [], 'over': True, 'winner': 'p1'})
+        self.assertEqual(replies[4]['state'], replies[3]['state'])
+        self.assertTrue(replies[5]['ok'])
+        self.assertFalse(replies[6]['ok'])
+
+    def test_bad_sessions_are_refused(self):
+        """
+        Test that unknown games and strategies that cannot play a game are
+        refused.
+        """
+        async def client(host, port):
+            return [await self.server.handle(json.dumps(request).encode())
+                    for request in [
+                        {'op': 'new', 'game': 'x', 'size': 3},
+                        {'op': 'new', 'game': 'h', 'size': 1, 'p2': 'st'},
+                        {'op': 'new', 'game': 'h', 'size': 1, 'p2': 'i'},
+                        {'op': 'jump'}]]
+        for reply in self.run_with_server(client):
+            self.assertFalse(reply['ok'])
+
+    def test_bad_sizes_are_refused_without_input(self):
+        """
+        Test that a missing, non-integer or too small size is refused with an
+        error instead of the game asking for one on the server.
+        """
+        async def client(host, port):
+            return [await self.server.handle(json.dumps(request).encode())
+                    for request in [
+                        {'op': 'new', 'game': 's', 'size': None},
+                        {'op': 'new', 'game': 'h', 'size': 0},
+                        {'op': 'new', 'game': 'h', 'size': '3'},
+                        {'op': 'new', 'game': 's', 'size': True}]]
+        with patch('builtins.input', side_effect=AssertionError('input')):
+            replies = self.run_with_server(client)
+        for reply in replies:
+            self.assertFalse(reply['ok'])
+            self.assertIn('size', reply['error'].lower())
+        self.assertEqual(self.server.sessions, {})
+
+    def test_malformed_requests_and_failed_strategies_reply(self):
+        """
+        Test that a request that is not a JSON object, and a strategy that
+        fails in its worker, are answered with an error.
+        """
+        # A thread pool runs the patched _choose_move in this process.
+        self.server.pool.shutdown()
+        self.server.pool = ThreadPoolExecutor(1)
+
+        async def client(host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            replies = []
+            for line in [b'[1]', b'{"op": "new", "game": "s", "size": 5, '
+                                 b'"p1": "mr"}', b'{"op": "state"}']:
+                writer.write(line + b'\n')
+                await writer.drain()
+                replies.append(json.loads(await reader.readline()))
+            writer.close()
+            await writer.wait_closed()
+            return replies
+        with patch('game_server._choose_move',
+                   side_effect=RuntimeError('boom')):
+            replies = self.run_with_server(client)
+        self.assertEqual([reply['ok'] for reply in replies],
+                         [False, False, False])
+        self.assertIn('boom', replies[1]['error'])
+        self.assertEqual(self.server.sessions, {})
+
+    def test_load_test_finishes_every_game(self):
+        """
+        Test that concurrent clients all finish their games, on both games.
+        """
+        for game, size in (('s', 20), ('h', 2)):
+            result = self.run_with_server(
+                lambda host, port: load_test(host, port, 12, game, size, 'ro'))
+            self.assertEqual(result['games'], 12)
+            self.assertGreater(result['games_per_sec'], 0)
+            self.assertLessEqual(result['mean_latency'],
+                                 result['p95_latency'] * 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ class GameState:
     DRAW - score if player is in a tied position
     p1_turn - whether it is p1's turn or not
     """
+    __slots__ = ('p1_turn',)
     WIN: int = 1
     LOSE: int = -1
     DRAW: int = 0
@@ -68,6 +69,21 @@ class GameState:
         """
         raise NotImplementedError
 
+    def is_over(self) -> bool:
+        """
+        Return whether the game is over at this state. States that can tell
+        without listing their moves should override this.
+        """
+        return not self.get_possible_moves()
+
+    def state_key(self) -> Any:
+        """
+        Return a compact, hashable key for this state. Two states share a key
+        only if the current player of each can guarantee the same outcome,
+        so the key can index caches and transposition tables.
+        """
+        raise NotImplementedError
+
     def rough_outcome(self) -> float:
         """
         Return an estimate in interval [LOSE, WIN] of best outcome the current
@@ -75,6 +91,14 @@ class GameState:
         """
         raise NotImplementedError
 
+    def evaluate(self) -> float:
+        """
+        Return a graded estimate in interval (LOSE, WIN) of the outcome for
+        the current player, for a search that stops at state self before the
+        game is over. States with no better estimate score as a DRAW.
+        """
+        return self.DRAW
+
 
 if __name__ == "__main__":
     from python_ta import check_all
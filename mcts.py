@@ -0,0 +1,206 @@
+"""
+A Monte Carlo tree search (UCT) strategy.
+
+Rather than searching every move to the end of the game, the strategy plays
+many random games (playouts) from the current position, and grows a tree of
+the positions it visits most, choosing which branch to follow by the UCT
+rule. The more playouts it has time for, the closer its choice gets to the
+minimax one.
+
+The tree is stored as flat parallel arrays indexed by node number, with the
+children of a node numbered consecutively, instead of as one object per node,
+so that millions of nodes fit in memory. Positions are not stored at all:
+each playout replays the moves from the root.
+"""
+from array import array
+from math import log, sqrt
+from random import Random
+from time import monotonic
+from typing import Any, List
+from strategy import winning_move_now
+
+# The number of playouts mcts_strategy runs for a move unless given another
+# budget, and the number of seconds it may spend on them.
+DEFAULT_PLAYOUTS = 2000
+DEFAULT_BUDGET = 1.0
+# The weight of the exploration term of the UCT rule.
+EXPLORATION = sqrt(2)
+
+
+class SearchTree:
+    """A tree of positions searched by Monte Carlo tree search.
+
+    Node 0 is the root. A node's children are the nodes numbered first_child
+    to first_child + child_count - 1, one for each move from its position.
+
+    ========Attributes========
+    moves: the move leading to each node from its parent
+    parent: the parent of each node, or -1 for the root
+    first_child: the first child of each node, or -1 if it is not expanded
+    child_count: the number of children of each node
+    visits: the number of playouts that passed through each node
+    wins: the number of those playouts won by the player who made the move
+          leading to the node
+    """
+    moves: List[Any]
+    parent: array
+    first_child: array
+    child_count: array
+    visits: array
+    wins: array
+
+    def __init__(self) -> None:
+        """Initialize a tree holding only the root.
+
+        >>> tree = SearchTree()
+        >>> len(tree), tree.is_expanded(0)
+        (1, False)
+        """
+        self.moves = [None]
+        self.parent = array('l', [-1])
+        self.first_child = array('l', [-1])
+        self.child_count = array('l', [0])
+        self.visits = array('l', [0])
+        self.wins = array('d', [0.0])
+
+    def __len__(self) -> int:
+        """Return the number of nodes in this tree."""
+        return len(self.moves)
+
+    def is_expanded(self, node: int) -> bool:
+        """Return whether the children of node have been added."""
+        return self.first_child[node] != -1
+
+    def expand(self, node: int, moves: List[Any]) -> None:
+        """Add a child of node for each of moves.
+
+        >>> tree = SearchTree()
+        >>> tree.expand(0, ['A', 'B'])
+        >>> list(tree.children(0)), tree.moves[2]
+        ([1, 2], 'B')
+        """
+        self.first_child[node] = len(self.moves)
+        self.child_count[node] = len(moves)
+        for move in moves:
+            self.moves.append(move)
+            self.parent.append(node)
+            self.first_child.append(-1)
+            self.child_count.append(0)
+            self.visits.append(0)
+            self.wins.append(0.0)
+
+    def children(self, node: int) -> range:
+        """Return the children of node."""
+        first = self.first_child[node]
+        return range(first, first + self.child_count[node])
+
+    def select_child(self, node: int, exploration: float) -> int:
+        """Return the child of node with the highest UCT score, trying every
+        unvisited child first.
+        """
+        log_visits = log(self.visits[node])
+        best, best_score = -1, -1.0
+        for child in self.children(node):
+            visits = self.visits[child]
+            if visits == 0:
+                return child
+            score = (self.wins[child] / visits
+                     + exploration * sqrt(log_visits / visits))
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def backpropagate(self, node: int, reward: float) -> None:
+        """Record a playout through node, where reward is the result for the
+        player who made the move leading to node: 1 for a win and 0 for a
+        loss.
+        """
+        while node != -1:
+            self.visits[node] += 1
+            self.wins[node] += reward
+            reward = 1 - reward
+            node = self.parent[node]
+
+
+def _playout(state: 'GameState', random: Random) -> float:
+    """Return 1 if the player who made the move leading to state wins a game
+    played on from state with random moves, and 0 otherwise.
+
+    The player left to move when the game is over has lost, as in the
+    minimax strategies.
+    """
+    p1_turn = state.p1_turn
+    while not state.is_over():
+        moves = state.get_possible_moves()
+        state = state.make_move(moves[random.randrange(len(moves))])
+    return 1.0 if state.p1_turn == p1_turn else 0.0
+
+
+def search(state: 'GameState', playouts: int = DEFAULT_PLAYOUTS,
+           budget: float = DEFAULT_BUDGET, exploration: float = EXPLORATION,
+           random: Random = None) -> SearchTree:
+    """Return the tree grown by Monte Carlo tree search from state, running
+    at most playouts playouts, and stopping early once budget seconds have
+    passed. Either limit may be None, but not both.
+
+    >>> from subtract_square_state import SubtractSquareState
+    >>> tree = search(SubtractSquareState(True, 10), 200, None,
+    ...               random=Random(0))
+    >>> tree.visits[0]
+    200
+    """
+    if playouts is None and budget is None:
+        raise ValueError("A search needs a playout budget or a time budget")
+    random = Random() if random is None else random
+    deadline = None if budget is None else monotonic() + budget
+    tree = SearchTree()
+    done = 0
+    while playouts is None or done < playouts:
+        node, current = 0, state
+        while tree.is_expanded(node) and tree.child_count[node]:
+            node = tree.select_child(node, exploration)
+            current = current.make_move(tree.moves[node])
+        if not current.is_over() and (node == 0 or tree.visits[node]):
+            tree.expand(node, current.get_possible_moves())
+            node = tree.first_child[node]
+            current = current.make_move(tree.moves[node])
+        tree.backpropagate(node, _playout(current, random))
+        done += 1
+        if deadline is not None and monotonic() > deadline:
+            break
+    return tree
+
+
+def mcts_strategy(game: 'Game', playouts: int = DEFAULT_PLAYOUTS,
+                  budget: float = DEFAULT_BUDGET,
+                  exploration: float = EXPLORATION, seed: int = None) -> Any:
+    """A Monte Carlo tree search strategy, which plays the move whose branch
+    of the search tree was visited most.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :param playouts: The most playouts to run, or None for no limit
+    :type playouts: int
+    :param budget: The most seconds to spend, or None for no limit
+    :type budget: float
+    :param exploration: The weight of the exploration term of the UCT rule
+    :type exploration: float
+    :param seed: The seed of the random playouts, or None for a random one
+    :type seed: int
+    :return: The move visited most, the largest of them on a tie, unless a
+             move wins at once
+    :rtype: Any
+    """
+    state = game.current_state
+    winning_move = winning_move_now(state)
+    if winning_move is not None:
+        return winning_move
+    tree = search(state, playouts, budget, exploration, Random(seed))
+    best = max(tree.children(0),
+               key=lambda child: (tree.visits[child], tree.moves[child]))
+    return tree.moves[best]
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
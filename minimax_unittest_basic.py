@@ -21,11 +21,25 @@ strategy with Chopsticks either, unless you handle repeated/looping states.
 import unittest
 from unittest.mock import patch
 import inspect
+import time
 
 # Import the student solution
 from game_interface import playable_games, usable_strategies
+from transposition_table import TranspositionTable, DEPTH
+from shared_table import SharedTranspositionTable, EXACT, LOWER
+from pn_search import PnSolver
+from strategy import _memoized_score
 minimax_iterative_strategy = usable_strategies['mi']
 minimax_recursive_strategy = usable_strategies['mr']
+memoized_recursive_strategy = usable_strategies['tr']
+memoized_iterative_strategy = usable_strategies['ti']
+alphabeta_recursive_strategy = usable_strategies['ar']
+alphabeta_iterative_strategy = usable_strategies['ai']
+deepening_strategy = usable_strategies['id']
+depth_limited_strategy = usable_strategies['dl']
+mcts_strategy = usable_strategies['mc']
+parallel_strategy = usable_strategies['pa']
+lazy_smp_strategy = usable_strategies['ls']
 StonehengeGame = playable_games['h']
 SubtractSquareGame = playable_games['s']
 
@@ -232,5 +246,332 @@ class MinimaxUnitTests(unittest.TestCase):
                              expected_move, move_chosen, str(new_state)
                          ))
 
+
+class IterativeMinimaxUnitTests(unittest.TestCase):
+    def test_iterative_matches_recursive(self):
+        """
+        Test that iterative minimax chooses the same moves as recursive
+        minimax, on SubtractSquare and along a game of Stonehenge.
+        """
+        for total in range(1, 30):
+            with patch('builtins.input', return_value=str(total)):
+                game = SubtractSquareGame(True)
+            self.assertEqual(minimax_iterative_strategy(game),
+                             minimax_recursive_strategy(game))
+
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+        while game.current_state.get_possible_moves():
+            self.assertEqual(minimax_iterative_strategy(game),
+                             minimax_recursive_strategy(game))
+            game.current_state = game.current_state.make_move(
+                game.current_state.get_possible_moves()[-1])
+
+
+class MemoizedMinimaxUnitTests(unittest.TestCase):
+    def test_memoized_subtract_square_18(self):
+        """
+        Test both memoizing strategies on SubtractSquare with a value of 18,
+        where the winning moves are 16 and 1.
+        """
+        with patch('builtins.input', return_value='18'):
+            game = SubtractSquareGame(True)
+
+        for strategy in (memoized_recursive_strategy,
+                         memoized_iterative_strategy):
+            table = TranspositionTable(64)
+            self.assertEqual(strategy(game, table), 16)
+            self.assertTrue(table.hits > 0,
+                            "Positions reached by different move orders " +
+                            "should be found in the transposition table.")
+
+    def test_memoized_matches_minimax_subtract_square(self):
+        """
+        Test that the memoizing strategies choose the same moves as recursive
+        minimax, even with a table too small to hold every position.
+        """
+        for total in range(1, 30):
+            with patch('builtins.input', return_value=str(total)):
+                game = SubtractSquareGame(True)
+            expected = minimax_recursive_strategy(game)
+            for table in (TranspositionTable(4),
+                          TranspositionTable(4, DEPTH)):
+                self.assertEqual(memoized_recursive_strategy(game, table),
+                                 expected)
+                self.assertEqual(memoized_iterative_strategy(game, table),
+                                 expected)
+
+    def test_memoized_stonehenge_one_winning_move_not_immediate(self):
+        """
+        Test both memoizing strategies on a game of Stonehenge where there is
+        only 1 winning move that is not immediately in sight.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+
+        for move in ['A', 'F', 'D']:
+            game.current_state = game.current_state.make_move(
+                game.str_to_move(move))
+
+        for strategy in (memoized_recursive_strategy,
+                         memoized_iterative_strategy):
+            self.assertEqual(strategy(game, TranspositionTable()), 'E')
+
+    def test_symmetric_table_matches_and_is_smaller(self):
+        """
+        Test that storing symmetric Stonehenge positions as one entry gives
+        the same moves with fewer table entries.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+
+        while game.current_state.get_possible_moves():
+            plain, symmetric = TranspositionTable(), TranspositionTable()
+            expected = memoized_iterative_strategy(game, plain)
+            self.assertEqual(
+                memoized_iterative_strategy(game, symmetric, True), expected)
+            self.assertEqual(
+                memoized_recursive_strategy(game, TranspositionTable(), True),
+                expected)
+            self.assertLessEqual(len(symmetric), len(plain))
+            game.current_state = game.current_state.make_move(expected)
+
+
+class AlphaBetaUnitTests(unittest.TestCase):
+    def test_alphabeta_matches_minimax_subtract_square(self):
+        """
+        Test that both alpha-beta strategies choose the same moves as
+        minimax on SubtractSquare.
+        """
+        for total in range(1, 40):
+            with patch('builtins.input', return_value=str(total)):
+                game = SubtractSquareGame(True)
+            expected = memoized_recursive_strategy(game)
+            self.assertEqual(alphabeta_recursive_strategy(game), expected)
+            self.assertEqual(alphabeta_iterative_strategy(game), expected)
+
+    def test_alphabeta_matches_minimax_stonehenge(self):
+        """
+        Test that both alpha-beta strategies choose the same moves as
+        minimax along a game of Stonehenge with side length 2.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+
+        while game.current_state.get_possible_moves():
+            expected = memoized_recursive_strategy(game, TranspositionTable())
+            self.assertEqual(alphabeta_recursive_strategy(game), expected)
+            self.assertEqual(alphabeta_iterative_strategy(game), expected)
+            game.current_state = game.current_state.make_move(
+                game.current_state.get_possible_moves()[0])
+
+
+class IterativeDeepeningUnitTests(unittest.TestCase):
+    def test_unbounded_deepening_matches_minimax(self):
+        """
+        Test that iterative deepening without a time budget chooses the same
+        moves as minimax, on SubtractSquare and along a game of Stonehenge.
+        """
+        for total in range(1, 40):
+            with patch('builtins.input', return_value=str(total)):
+                game = SubtractSquareGame(True)
+            self.assertEqual(deepening_strategy(game, None),
+                             memoized_recursive_strategy(game))
+
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+        while game.current_state.get_possible_moves():
+            self.assertEqual(deepening_strategy(game, None),
+                             alphabeta_recursive_strategy(game))
+            game.current_state = game.current_state.make_move(
+                game.current_state.get_possible_moves()[0])
+
+    def test_budget_bounds_move_time(self):
+        """
+        Test that iterative deepening returns a legal move within about its
+        time budget on a board too large to solve.
+        """
+        with patch('builtins.input', return_value='4'):
+            game = StonehengeGame(True)
+
+        start = time.monotonic()
+        move = deepening_strategy(game, 0.2)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertIn(move, game.current_state.get_possible_moves())
+
+    def test_max_depth_finds_near_win(self):
+        """
+        Test that a shallow search already finds the one winning move that is
+        not immediately in sight.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+
+        for move in ['A', 'F', 'D']:
+            game.current_state = game.current_state.make_move(
+                game.str_to_move(move))
+        self.assertEqual(deepening_strategy(game, None, 3), 'E')
+        self.assertEqual(depth_limited_strategy(game, 3), 'E')
+
+    def test_depth_limited_plays_large_board(self):
+        """
+        Test that a shallow depth-limited search plays a whole game on a
+        board of side length 5 with only legal moves.
+        """
+        with patch('builtins.input', return_value='5'):
+            game = StonehengeGame(True)
+
+        while not game.is_over(game.current_state):
+            move = depth_limited_strategy(game, 2)
+            self.assertTrue(game.current_state.is_valid_move(move))
+            game.current_state = game.current_state.make_move(move)
+
+
+class MonteCarloUnitTests(unittest.TestCase):
+    def test_mcts_finds_winning_moves_subtract_square(self):
+        """
+        Test that Monte Carlo tree search with enough playouts finds a
+        winning move on SubtractSquare whenever there is one.
+        """
+        from subtract_square_solver import winning_moves
+        for total in (18, 35, 50):
+            with patch('builtins.input', return_value=str(total)):
+                game = SubtractSquareGame(True)
+            self.assertIn(mcts_strategy(game, 3000, None, seed=1),
+                          winning_moves(total))
+
+    def test_mcts_stonehenge_one_winning_move_not_immediate(self):
+        """
+        Test Monte Carlo tree search on a game of Stonehenge where there is
+        only 1 winning move that is not immediately in sight.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+
+        for move in ['A', 'F', 'D']:
+            game.current_state = game.current_state.make_move(
+                game.str_to_move(move))
+        self.assertEqual(mcts_strategy(game, 3000, None, seed=1), 'E')
+
+    def test_mcts_time_budget(self):
+        """
+        Test that Monte Carlo tree search on a large board returns a legal
+        move within about its time budget.
+        """
+        with patch('builtins.input', return_value='5'):
+            game = StonehengeGame(True)
+
+        start = time.monotonic()
+        move = mcts_strategy(game, None, 0.2)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertIn(move, game.current_state.get_possible_moves())
+
+
+class ParallelUnitTests(unittest.TestCase):
+    def test_parallel_matches_alphabeta(self):
+        """
+        Test that searching the root moves on several processes chooses the
+        same moves as alpha-beta on one, on SubtractSquare and along a game
+        of Stonehenge.
+        """
+        for total in (4, 18, 20, 35):
+            with patch('builtins.input', return_value=str(total)):
+                game = SubtractSquareGame(True)
+            self.assertEqual(parallel_strategy(game, 2),
+                             alphabeta_recursive_strategy(game))
+
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+        while game.current_state.get_possible_moves():
+            self.assertEqual(parallel_strategy(game, 3),
+                             alphabeta_recursive_strategy(game))
+            game.current_state = game.current_state.make_move(
+                game.current_state.get_possible_moves()[-1])
+
+    def test_parallel_ties_go_to_largest_win(self):
+        """
+        Test that once a smaller move is shown to win, the larger winning
+        moves still being searched are waited for, so the largest is chosen
+        whichever order the workers finish in.
+        """
+        # Every move from 21 wins, so the largest, 16, must be chosen.
+        with patch('builtins.input', return_value='21'):
+            game = SubtractSquareGame(True)
+        for workers in (2, 3, 4) * 4:
+            self.assertEqual(parallel_strategy(game, workers), 16)
+
+    def test_lazy_smp_matches_alphabeta(self):
+        """
+        Test that lazy SMP chooses the same moves as alpha-beta on one
+        process along a game of Stonehenge, even with a tiny shared table.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+        while game.current_state.get_possible_moves():
+            expected = alphabeta_recursive_strategy(game)
+            self.assertEqual(lazy_smp_strategy(game, 3), expected)
+            self.assertEqual(lazy_smp_strategy(game, 2, 4), expected)
+            game.current_state = game.current_state.make_move(
+                game.current_state.get_possible_moves()[0])
+
+    def test_shared_table_ignores_torn_entries(self):
+        """
+        Test that a slot whose two words come from different entries is
+        treated as empty.
+        """
+        table = SharedTranspositionTable(4)
+        try:
+            table.store(5, EXACT, 1, 2)
+            table.store(9, LOWER, 0, 7)
+            # Mix the first word of the entry for 9 with the second word of
+            # an entry for 5, as two processes writing at once could.
+            words = table._slots[1].copy()
+            table.store(5, EXACT, -1, 8)
+            table._slots[1, 0] = words[0]
+            self.assertIsNone(table.lookup(5))
+            self.assertIsNone(table.lookup(9))
+        finally:
+            table.release()
+
+
+class ProofNumberUnitTests(unittest.TestCase):
+    def test_pn_matches_solved_table(self):
+        """
+        Test that proof-number search labels SubtractSquare totals as the
+        solved table does, with a winning proof move, even with a table too
+        small to hold every position.
+        """
+        from subtract_square_solver import is_winning_total, winning_moves
+        for total in range(1, 100):
+            with patch('builtins.input', return_value=str(total)):
+                game = SubtractSquareGame(True)
+            result = PnSolver(16).solve(game.current_state)
+            self.assertEqual(result.win, is_winning_total(total))
+            if result.win:
+                self.assertIn(result.move, winning_moves(total))
+            else:
+                self.assertIsNone(result.move)
+
+    def test_pn_matches_minimax_stonehenge(self):
+        """
+        Test that proof-number search agrees with minimax on whether each
+        position along a game of Stonehenge is won, and that its proof
+        moves keep the win.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+        while game.current_state.get_possible_moves():
+            state = game.current_state
+            result = PnSolver().solve(state)
+            score = _memoized_score(state, TranspositionTable(), False)[0]
+            self.assertEqual(result.win, score == state.WIN)
+            if result.win:
+                game.current_state = state.make_move(result.move)
+                self.assertFalse(PnSolver().solve(game.current_state).win)
+            else:
+                game.current_state = state.make_move(
+                    state.get_possible_moves()[0])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,338 @@
+"""
+Minimax strategies that search on several processes at once.
+
+The moves from the root of a search are independent of each other, so they
+can be searched by different worker processes. The best score found so far
+is shared with the workers through a multiprocessing Value, which they read
+again as they search, so that a move only needs to be searched closely
+enough to show that it is no better than the best one found by then.
+
+Alternatively, with lazy SMP, every worker searches the whole position, in a
+different move order, sharing what it learns through a transposition table
+in shared memory. Whichever worker finishes first gives the answer.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Value
+from os import cpu_count
+from random import Random
+from time import perf_counter
+from typing import Any, List, Sequence, Tuple
+from shared_table import EXACT, LOWER, UPPER, SharedTranspositionTable
+from strategy import _best_move, winning_move_now
+
+# The best score found so far at the root of the current search, and the
+# rank of the move that scored it among the root moves, largest first,
+# shared by the main process with its workers. Only set in worker processes.
+_shared_alpha = None
+_shared_rank = None
+# The shared table and stop flag of the current lazy SMP search. Only set in
+# worker processes.
+_shared_table = None
+_stop = None
+
+
+def _init_worker(shared_alpha: Any, shared_rank: Any) -> None:
+    """Remember shared_alpha and shared_rank, the shared best root score and
+    the rank of its move, in a new worker process.
+    """
+    global _shared_alpha, _shared_rank
+    _shared_alpha, _shared_rank = shared_alpha, shared_rank
+
+
+class _RootMoveSearch:
+    """The search of one root move in a worker of
+    parallel_alphabeta_minimax.
+
+    ========Attributes========
+    rank: the rank of the move among the root moves, largest first
+    bound: the score the move must beat to matter: the best root score so
+           far if the move is smaller than the best move so far, since a tie
+           goes to the larger move, and one less otherwise
+    nodes: the number of positions searched so far
+    """
+    rank: int
+    bound: int
+    nodes: int
+
+    def __init__(self, rank: int) -> None:
+        """Initialize the search of the move of rank rank."""
+        self.rank = rank
+        self.nodes = 0
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Read the best root score and move found so far into bound."""
+        with _shared_alpha.get_lock():
+            alpha, best_rank = _shared_alpha.value, _shared_rank.value
+        self.bound = alpha if self.rank > best_rank else alpha - 1
+
+    def score(self, state: 'GameState', ply: int, alpha: int,
+              beta: int) -> int:
+        """Return the same score or bound as _alphabeta_score for state, ply
+        moves below the root, narrowing the window to bound as the other
+        workers raise it.
+        """
+        self.nodes += 1
+        if self.nodes % 1024 == 0:
+            self.refresh()
+        best = state.LOSE
+        for move in state.get_possible_moves():
+            # Nothing below the bound at the root matters, and the bound
+            # falls on beta and alpha in turn on the way down.
+            if ply % 2:
+                beta = min(beta, -self.bound)
+            else:
+                alpha = max(alpha, self.bound)
+            if alpha >= beta:
+                # The move has been shown to be no better than the bound.
+                return max(best, alpha)
+            score = -self.score(state.make_move(move), ply + 1, -beta,
+                                -alpha)
+            if score > best:
+                best = score
+                alpha = max(alpha, best)
+                if alpha >= beta:
+                    break
+        return best
+
+
+def _score_root_move(state: 'GameState', move: Any, rank: int) -> int:
+    """Return the score of move, of rank rank among the moves from state,
+    for the player making it, if it beats the bound of _RootMoveSearch.
+    Otherwise, return a score no higher than that bound.
+    """
+    search = _RootMoveSearch(rank)
+    return -search.score(state.make_move(move), 1, -state.WIN, -search.bound)
+
+
+def parallel_alphabeta_minimax(game: 'Game', workers: int = None) -> Any:
+    """A minimax strategy with alpha-beta pruning that searches the moves
+    from the current state on a pool of worker processes.
+
+    Each move is searched with a window just wide enough to tell whether it
+    beats the best move known, or ties it if it is the larger move, so that
+    the largest of the best moves is chosen exactly as alphabeta_minimax
+    chooses it. Running searches pick up better bounds found by the other
+    workers, and once a move is known to win, the smaller moves are not
+    searched.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :param workers: The number of worker processes, or None for one per CPU
+    :type workers: int
+    :return: The largest of the moves that maximize the computer's score
+    :rtype: Any
+    """
+    state = game.current_state
+    winning_move = winning_move_now(state)
+    if winning_move is not None:
+        return winning_move
+    moves = sorted(state.get_possible_moves(), reverse=True)
+    workers = min(workers or cpu_count() or 1, len(moves))
+    shared_alpha = Value('i', state.LOSE - 1)
+    shared_rank = Value('i', len(moves), lock=False)
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(shared_alpha, shared_rank)) as pool:
+        futures = {pool.submit(_score_root_move, state, move, rank): rank
+                   for rank, move in enumerate(moves)}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            rank, score = futures[future], future.result()
+            with shared_alpha.get_lock():
+                if score > shared_alpha.value or (
+                        score == shared_alpha.value
+                        and rank < shared_rank.value):
+                    shared_alpha.value, shared_rank.value = score, rank
+                alpha, best_rank = shared_alpha.value, shared_rank.value
+            if alpha >= state.WIN:
+                # No smaller move can do better, so only the larger moves
+                # still being searched can change the answer.
+                for other, other_rank in futures.items():
+                    if other_rank > best_rank:
+                        other.cancel()
+                if all(other.done() for other, other_rank in futures.items()
+                       if other_rank < best_rank):
+                    break
+    # Every search that was not cancelled has finished by now, including
+    # any that finished after the last one seen above.
+    return _best_move([(moves[rank], future.result())
+                       for future, rank in futures.items()
+                       if not future.cancelled()])
+
+
+class _SearchStopped(Exception):
+    """Raised in a lazy SMP worker once another worker has finished."""
+
+
+def _init_smp_worker(table_name: str, capacity: int, stop: Any) -> None:
+    """Attach a new worker process to the shared table in the shared memory
+    block table_name, and remember stop, the flag set when the search is
+    over.
+    """
+    global _shared_table, _stop
+    _shared_table = SharedTranspositionTable(capacity, table_name)
+    _stop = stop
+
+
+class _SmpSearch:
+    """The search of one lazy SMP worker.
+
+    ========Attributes========
+    table: the transposition table shared by all workers
+    random: the source of this worker's move order, or None for the usual
+            order
+    nodes: the number of positions this worker has searched
+    """
+    table: SharedTranspositionTable
+    random: Any
+    nodes: int
+
+    def __init__(self, table: SharedTranspositionTable,
+                 worker: int) -> None:
+        """Initialize the search of worker number worker. Worker 0 tries the
+        moves in the usual order, and the others in random orders of their
+        own, so that they tend to search different parts of the tree first.
+        """
+        self.table = table
+        self.random = Random(worker) if worker else None
+        self.nodes = 0
+
+    def score(self, state: 'GameState', alpha: int, beta: int) -> int:
+        """Return the same score or bound as _alphabeta_score, looking up and
+        storing bounds in the shared table.
+        """
+        self.nodes += 1
+        if self.nodes % 1024 == 0 and _stop is not None and _stop.value:
+            raise _SearchStopped()
+        if state.is_over():
+            return state.LOSE
+        key = state.zobrist
+        entry = self.table.lookup(key)
+        if entry is not None:
+            flag, score, _ = entry
+            if flag == EXACT:
+                return score
+            elif flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+
+        original_alpha = alpha
+        moves = state.get_possible_moves()
+        if self.random is not None:
+            self.random.shuffle(moves)
+        best = state.LOSE
+        for move in moves:
+            score = -self.score(state.make_move(move), -beta, -alpha)
+            if score > best:
+                best = score
+                alpha = max(alpha, best)
+                if alpha >= beta:
+                    break
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, flag, best, len(moves))
+        return best
+
+
+def _smp_worker(state: 'GameState', worker: int) -> Tuple[Any, int]:
+    """Return the move chosen by worker number worker of a lazy SMP search
+    of state, and the number of positions it searched, or None if another
+    worker finished first.
+    """
+    search = _SmpSearch(_shared_table, worker)
+    moves = sorted(state.get_possible_moves(), reverse=True)
+    if search.random is not None:
+        search.random.shuffle(moves)
+    scores, alpha = [], state.LOSE - 1
+    try:
+        for move in moves:
+            score = -search.score(state.make_move(move), -state.WIN,
+                                  -(alpha - 1))
+            scores.append((move, score))
+            alpha = max(alpha, score)
+    except _SearchStopped:
+        return None
+    _stop.value = 1
+    return _best_move(scores), search.nodes
+
+
+def lazy_smp_minimax(game: 'Game', workers: int = None,
+                     capacity: int = 1 << 20) -> Any:
+    """A minimax strategy with alpha-beta pruning in which several worker
+    processes search the whole position at once, sharing a transposition
+    table, and the first to finish gives the move.
+
+    Like the root-parallel strategy, every root move is searched closely
+    enough to tell whether it ties the best so far, so each worker's answer
+    is the one alphabeta_minimax gives. The states must have a zobrist hash.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :param workers: The number of worker processes, or None for one per CPU
+    :type workers: int
+    :param capacity: The number of slots in the shared table
+    :type capacity: int
+    :return: The largest of the moves that maximize the computer's score
+    :rtype: Any
+    """
+    return _lazy_smp_search(game.current_state, workers, capacity)[0]
+
+
+def _lazy_smp_search(state: 'GameState', workers: int,
+                     capacity: int) -> Tuple[Any, int]:
+    """Return the move lazy_smp_minimax chooses from state, and the number of
+    positions searched by the worker that found it.
+    """
+    winning_move = winning_move_now(state)
+    if winning_move is not None:
+        return winning_move, 0
+    workers = workers or cpu_count() or 1
+    table = SharedTranspositionTable(capacity)
+    stop = Value('b', 0, lock=False)
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_smp_worker,
+                                 initargs=(table.name, capacity,
+                                           stop)) as pool:
+            futures = [pool.submit(_smp_worker, state, worker)
+                       for worker in range(workers)]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is not None:
+                    stop.value = 1
+                    return result
+    finally:
+        table.release()
+    raise RuntimeError("Every lazy SMP worker stopped without an answer")
+
+
+def speedup_report(state: 'GameState',
+                   worker_counts: Sequence[int] = (1, 2, 4),
+                   capacity: int = 1 << 20) -> List[Tuple[int, float, float]]:
+    """Return, for each number of workers in worker_counts, the time in
+    seconds lazy SMP takes to choose a move from state, and its speedup over
+    the first number of workers.
+
+    The times include starting the worker processes, so small searches show
+    little speedup.
+    """
+    report = []
+    for workers in worker_counts:
+        start = perf_counter()
+        _lazy_smp_search(state, workers, capacity)
+        seconds = perf_counter() - start
+        base = report[0][1] if report else seconds
+        report.append((workers, seconds, base / seconds))
+    return report
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
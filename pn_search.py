@@ -0,0 +1,160 @@
+"""
+A depth-first proof-number (df-pn) solver.
+
+Proof-number search only asks whether the player to move can force a win,
+not by how much, and always expands the position that looks cheapest to
+settle that question: the one with the fewest positions left to prove, or to
+disprove, the win. It usually needs far fewer positions than minimax to
+label a position won or lost.
+
+The proof and disproof numbers of the positions searched are kept in a
+bounded TranspositionTable, so the solver's memory stays capped however
+large the search becomes; positions dropped from the table are simply
+searched again if they are needed.
+"""
+from typing import Any, NamedTuple, Tuple
+from strategy import winning_move_now
+from transposition_table import TranspositionTable
+
+# A proof or disproof number too large to reach, for a position that can
+# never be proven or disproven.
+INFINITY = 1 << 40
+
+
+class PnResult(NamedTuple):
+    """The result of solving a position with proof-number search.
+
+    win: whether the player to move can force a win
+    move: a move that keeps the win, the largest one whose proof is at hand,
+          or None if the position is lost
+    nodes: the number of positions expanded to find out
+    """
+    win: bool
+    move: Any
+    nodes: int
+
+
+class PnSolver:
+    """A df-pn solver that can solve several positions, sharing one table.
+
+    ========Attributes========
+    table: the proof and disproof numbers of the positions searched, from
+           the point of view of the player to move in each, keyed by state
+           key
+    nodes: the number of positions expanded so far
+    """
+    table: TranspositionTable
+    nodes: int
+
+    def __init__(self, capacity: int = 1 << 20) -> None:
+        """Initialize a solver whose table holds at most capacity positions.
+        """
+        self.table = TranspositionTable(capacity)
+        self.nodes = 0
+
+    def numbers(self, state: 'GameState') -> Tuple[int, int]:
+        """Return the proof and disproof numbers of the win for the player to
+        move in state, as far as they are known.
+        """
+        if state.is_over():
+            return INFINITY, 0
+        numbers = self.table.lookup(state.state_key())
+        return (1, 1) if numbers is None else numbers
+
+    def solve(self, state: 'GameState') -> PnResult:
+        """Return whether the player to move in state can force a win, with a
+        move that does.
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> PnSolver().solve(SubtractSquareState(True, 18))[:2]
+        (True, 16)
+        >>> PnSolver().solve(SubtractSquareState(True, 2))[:2]
+        (False, None)
+        """
+        start = self.nodes
+        proof, _ = self._search(state, INFINITY, INFINITY)
+        move = None
+        if proof == 0:
+            move = winning_move_now(state)
+            moves = sorted(state.get_possible_moves(), reverse=True)
+            if move is None:
+                move = next((candidate for candidate in moves
+                             if self.numbers(state.make_move(candidate))[1]
+                             == 0), None)
+            for candidate in moves:
+                if move is not None:
+                    break
+                # The proof was dropped from the table, so solve the
+                # children again until one is disproven.
+                child = state.make_move(candidate)
+                if self._search(child, INFINITY, INFINITY)[1] == 0:
+                    move = candidate
+        return PnResult(proof == 0, move, self.nodes - start)
+
+    def _search(self, state: 'GameState', proof_threshold: int,
+                disproof_threshold: int) -> Tuple[int, int]:
+        """Expand state until its proof number reaches proof_threshold or its
+        disproof number reaches disproof_threshold, then store and return
+        its proof and disproof numbers.
+
+        The player to move wins iff some move leaves the other player lost,
+        so the proof number of state is the smallest disproof number of its
+        children, and its disproof number is the sum of their proof numbers.
+        The children's numbers are kept here as well as in the table, so
+        that the search still makes progress when the table drops them.
+        """
+        self.nodes += 1
+        if state.is_over():
+            return INFINITY, 0
+        key = state.state_key()
+        children = [state.make_move(move)
+                    for move in state.get_possible_moves()]
+        numbers = [self.numbers(child) for child in children]
+        while True:
+            proof = min(disproof for _, disproof in numbers)
+            disproof = min(sum(proof for proof, _ in numbers), INFINITY)
+            if proof >= proof_threshold or disproof >= disproof_threshold:
+                self.table.store(key, (proof, disproof))
+                return proof, disproof
+
+            # Search the child closest to being disproven, until it is no
+            # longer the closest or the numbers of state pass a threshold.
+            best = second = INFINITY
+            best_index = 0
+            for i, (_, child_disproof) in enumerate(numbers):
+                if child_disproof < best:
+                    best, second, best_index = child_disproof, best, i
+                elif child_disproof < second:
+                    second = child_disproof
+            child_proof = numbers[best_index][0]
+            numbers[best_index] = self._search(
+                children[best_index],
+                min(disproof_threshold - disproof + child_proof, INFINITY),
+                min(proof_threshold, second + 1))
+
+
+def solve(state: 'GameState', capacity: int = 1 << 20) -> PnResult:
+    """Return whether the player to move in state can force a win, with a
+    move that does, searching with a table of at most capacity positions.
+    """
+    return PnSolver(capacity).solve(state)
+
+
+def pn_strategy(game: 'Game') -> Any:
+    """A strategy that plays a move proven to win by proof-number search, or
+    the largest move if the position is lost.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :return: A winning move if there is one, or else the largest move
+    :rtype: Any
+    """
+    result = solve(game.current_state)
+    if result.win:
+        return result.move
+    return max(game.current_state.get_possible_moves())
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,175 @@
+"""
+A binary file format for precomputed position tables, read through mmap.
+
+A table maps positions to small unsigned values, such as whether each
+position is won. It is either dense, holding one value for every index from
+0 up, or keyed, holding the values of a sorted list of 64-bit position keys.
+
+A table file holds:
+    - a header: the magic string, the format version, the width of a value
+      in bits (1, 8, 16, 32 or 64), whether the table is keyed, the number of
+      entries and the length of the metadata;
+    - the metadata, a JSON object describing the table, padded to a multiple
+      of 8 bytes;
+    - for a keyed table, the sorted keys as little-endian 64-bit integers;
+    - the values, bit-packed eight to a byte for 1-bit values, and as
+      little-endian integers of the given width otherwise.
+
+Readers map the file into memory instead of reading it, so opening a table is
+instant whatever its size, only the pages that are probed are ever loaded,
+and processes probing the same table share its pages.
+"""
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Optional, Union
+import numpy as np
+
+# The directory the strategies look in for the tables they use.
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+
+_MAGIC = b'POSTABLE'
+_VERSION = 1
+_HEADER = struct.Struct('<8sHHIQQ')
+_KEYED = 1
+_DTYPES = {8: '<u1', 16: '<u2', 32: '<u4', 64: '<u8'}
+
+
+def table_path(name: str) -> str:
+    """Return the path of the table called name in TABLE_DIR."""
+    return os.path.join(TABLE_DIR, name + '.tbl')
+
+
+def _padded(length: int) -> int:
+    """Return length rounded up to a multiple of 8."""
+    return -(-length // 8) * 8
+
+
+def write_table(path: str, values: np.ndarray, keys: np.ndarray = None,
+                bits: int = 1, metadata: Dict[str, Any] = None) -> None:
+    """Write a table of values, each bits wide, to path. If keys is given,
+    the table is keyed and values[i] is the value of keys[i]; otherwise the
+    table is dense and values[i] is the value of index i. metadata is a
+    JSON-serializable dict stored with the table.
+
+    The file is written under a temporary name first, so a reader never sees
+    it half written.
+
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'example.tbl')
+    >>> write_table(path, np.array([1, 0, 1], dtype=bool), np.array([5, 7, 9]))
+    >>> table = PositionTable(path)
+    >>> table.get(7), table.get(9), table.get(8)
+    (0, 1, None)
+    >>> table.close()
+    """
+    if bits != 1 and bits not in _DTYPES:
+        raise ValueError("A value must be 1, 8, 16, 32 or 64 bits wide")
+    values = np.asarray(values)
+    if keys is not None:
+        keys = np.asarray(keys, dtype='<u8')
+        if len(keys) != len(values):
+            raise ValueError("There must be one value for each key")
+        if len(keys) > 1 and not (keys[1:] > keys[:-1]).all():
+            raise ValueError("The keys must be sorted and distinct")
+    encoded = json.dumps(metadata or {}).encode('utf-8')
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + '.tmp', 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, bits,
+                                _KEYED if keys is not None else 0,
+                                len(values), len(encoded)))
+        file.write(encoded.ljust(_padded(len(encoded)), b'\0'))
+        if keys is not None:
+            file.write(keys.tobytes())
+        if bits == 1:
+            file.write(np.packbits(values.astype(bool),
+                                   bitorder='little').tobytes())
+        else:
+            file.write(values.astype(_DTYPES[bits]).tobytes())
+    os.replace(path + '.tmp', path)
+
+
+class PositionTable:
+    """A table file mapped into memory.
+
+    ========Attributes========
+    path: the file the table was read from
+    bits: the width of a value in bits
+    metadata: the metadata stored with the table
+    keys: the sorted keys of a keyed table, or None for a dense table
+    """
+    path: str
+    bits: int
+    metadata: Dict[str, Any]
+    keys: Optional[np.ndarray]
+
+    def __init__(self, path: str) -> None:
+        """Map the table in the file path into memory."""
+        self.path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, bits, flags, count, length = _HEADER.unpack_from(
+            self._map)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError("{} is not a position table".format(path))
+        self.bits = bits
+        self._count = count
+        offset = _HEADER.size
+        self.metadata = json.loads(
+            self._map[offset:offset + length].decode('utf-8'))
+        offset += _padded(length)
+        self.keys = None
+        if flags & _KEYED:
+            self.keys = np.frombuffer(self._map, dtype='<u8', count=count,
+                                      offset=offset)
+            offset += 8 * count
+        if bits == 1:
+            self._values = np.frombuffer(self._map, dtype=np.uint8,
+                                         count=-(-count // 8), offset=offset)
+        else:
+            self._values = np.frombuffer(self._map, dtype=_DTYPES[bits],
+                                         count=count, offset=offset)
+
+    def __len__(self) -> int:
+        """Return the number of entries in this table."""
+        return self._count
+
+    def value_at(self, indices: Union[int, np.ndarray]) -> Any:
+        """Return the value of the entry, or the array of the values of the
+        entries, at indices.
+        """
+        if self.bits == 1:
+            indices = np.asarray(indices)
+            return (self._values[indices >> 3] >> (indices & 7)) & 1
+        return self._values[indices]
+
+    def index(self, key: int) -> Optional[int]:
+        """Return the index of the entry for key, or None if there is none.
+        """
+        if self.keys is None:
+            return key if 0 <= key < self._count else None
+        index = int(np.searchsorted(self.keys, np.uint64(key)))
+        if index < self._count and int(self.keys[index]) == key:
+            return index
+        return None
+
+    def get(self, key: int) -> Optional[int]:
+        """Return the value for key, the key of a keyed table or the index
+        of a dense one, or None if the table has no entry for it.
+        """
+        index = self.index(key)
+        return None if index is None else int(self.value_at(index))
+
+    def close(self) -> None:
+        """Unmap this table. It cannot be probed afterwards."""
+        self.keys = self._values = None
+        self._map.close()
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
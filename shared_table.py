@@ -0,0 +1,121 @@
+"""
+A transposition table in shared memory, for searches running on several
+processes at once.
+
+The table is a fixed-size array of slots in a multiprocessing.shared_memory
+block, each slot holding one entry packed into two 64-bit words: the entry's
+data, and its key XOR-ed with its data. Processes read and write slots with
+no locks. If two processes write a slot at the same time, its words may come
+from different entries, but then the key recovered from them no longer
+matches, so the torn entry is treated as missing rather than misread.
+"""
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import numpy as np
+
+# What a stored score says about the true score of its position.
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+_MASK = (1 << 64) - 1
+# The layout of the data word: a bit set in every stored entry, the bound
+# type, the score offset by _SCORE_OFFSET, and the depth.
+_VALID = 1
+_FLAG_SHIFT = 1
+_SCORE_SHIFT = 3
+_SCORE_OFFSET = 2
+_DEPTH_SHIFT = 8
+_MAX_DEPTH = (1 << 16) - 1
+
+
+class SharedTranspositionTable:
+    """A fixed-size transposition table in shared memory, mapping 64-bit
+    state hashes to (flag, score, depth) entries, where flag says whether
+    score is EXACT, a LOWER bound or an UPPER bound, and score is one of
+    the GameState scores LOSE, DRAW or WIN.
+
+    ========Attributes========
+    capacity: the number of slots in the table
+    name: the name of the shared memory block holding the table
+    """
+    capacity: int
+    name: str
+
+    def __init__(self, capacity: int = 1 << 20, name: str = None) -> None:
+        """Create a new empty table with capacity slots, or, if name is
+        given, attach to the existing table in the shared memory block
+        name.
+
+        >>> table = SharedTranspositionTable(8)
+        >>> table.store(12345, EXACT, 1, 3)
+        >>> table.lookup(12345)
+        (0, 1, 3)
+        >>> table.lookup(54321) is None
+        True
+        >>> table.release()
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        size = capacity * 16
+        self._owner = name is None
+        self._memory = shared_memory.SharedMemory(name, create=self._owner,
+                                                  size=size)
+        self.name = self._memory.name
+        self._slots = np.ndarray((capacity, 2), dtype=np.uint64,
+                                 buffer=self._memory.buf)
+        if self._owner:
+            self._slots.fill(0)
+
+    def __len__(self) -> int:
+        """Return the number of slots holding an entry."""
+        return int(np.count_nonzero(self._slots[:, 1]))
+
+    def lookup(self, key: int) -> Optional[Tuple[int, int, int]]:
+        """Return the (flag, score, depth) entry stored for key, or None if
+        there is none or it was torn by writes from two processes.
+        """
+        key &= _MASK
+        index = key % self.capacity
+        check, data = int(self._slots[index, 0]), int(self._slots[index, 1])
+        if not data or check ^ data != key:
+            return None
+        return ((data >> _FLAG_SHIFT) & 3,
+                ((data >> _SCORE_SHIFT) & 7) - _SCORE_OFFSET,
+                (data >> _DEPTH_SHIFT) & _MAX_DEPTH)
+
+    def store(self, key: int, flag: int, score: int, depth: int) -> None:
+        """Store the entry (flag, score, depth) for key, unless its slot
+        holds an entry for another key with a greater depth.
+
+        >>> table = SharedTranspositionTable(1)
+        >>> table.store(1, EXACT, 1, 5)
+        >>> table.store(2, LOWER, 0, 3)
+        >>> table.lookup(1), table.lookup(2)
+        ((0, 1, 5), None)
+        >>> table.release()
+        """
+        key &= _MASK
+        index = key % self.capacity
+        check, old = int(self._slots[index, 0]), int(self._slots[index, 1])
+        if (old and check ^ old != key
+                and (old >> _DEPTH_SHIFT) & _MAX_DEPTH > depth):
+            return
+        data = (_VALID | flag << _FLAG_SHIFT
+                | (score + _SCORE_OFFSET) << _SCORE_SHIFT
+                | min(depth, _MAX_DEPTH) << _DEPTH_SHIFT)
+        self._slots[index, 0] = key ^ data
+        self._slots[index, 1] = data
+
+    def release(self) -> None:
+        """Detach from the table, and free it if this table created it."""
+        del self._slots
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
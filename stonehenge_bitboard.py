@@ -0,0 +1,356 @@
+"""A bitboard representation of a state of the Stonehenge game.
+
+Every cell of the board is one bit, in the order the cells are read off the
+board from the top row down, and a state only keeps the cells and leylines
+each player has claimed as integer masks. The masks of the cells on every
+leyline are computed once per side length, from the board's topology, and
+shared by all states.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+from game_state import GameState
+from stonehenge_state import Board, BoardTopology, StonehengeState, \
+    board_topology
+
+
+class LeylineTable:
+    """The precomputed bit layout of a board with a given side length.
+    ======Attributes=======
+    LeylineTable.side: the side length of the board
+    LeylineTable.labels: the letter of every cell, indexed by its bit
+    LeylineTable.bits: the bit of every cell, keyed by its letter
+    LeylineTable.masks: the mask of the cells on every leyline, in the order
+                        of the leylines in Board.leyline_tracker
+    LeylineTable.cell_leylines: the indices of the leylines through each cell
+    LeylineTable.all_cells: the mask of every cell on the board
+    LeylineTable.all_leylines: the mask of every leyline on the board
+    LeylineTable.topology: the topology of the board
+    """
+    side: int
+    labels: List[str]
+    bits: Dict[str, int]
+    masks: List[int]
+    cell_leylines: List[Tuple[int, ...]]
+    all_cells: int
+    all_leylines: int
+    topology: BoardTopology
+
+    def __init__(self, side: int) -> None:
+        """Initializes the bit layout of a board with side length side.
+
+        @param LeylineTable self: the current table
+        @param int side: the side length of the board
+        @rtype: None
+
+        >>> t = LeylineTable(1)
+        >>> t.labels
+        ['A', 'B', 'C']
+        >>> [bin(m) for m in t.masks]
+        ['0b11', '0b100', '0b101', '0b10', '0b1', '0b110']
+        """
+        topology = board_topology(side)
+        self.topology = topology
+        self.side = side
+        self.labels = topology.labels
+        self.bits = {label: bit for bit, label in enumerate(self.labels)}
+        self.masks = [sum(1 << bit for bit in leyline)
+                      for leyline in topology.leylines]
+        self.cell_leylines = topology.cell_leylines
+        self.all_cells = (1 << len(self.labels)) - 1
+        self.all_leylines = (1 << len(self.masks)) - 1
+
+
+def _popcount(mask: int) -> int:
+    """Returns the number of bits set in mask, without int.bit_count, which
+    older versions of Python lack.
+
+    >>> _popcount(0b10110)
+    3
+    """
+    return bin(mask).count('1')
+
+
+@lru_cache(maxsize=None)
+def leyline_table(side: int) -> LeylineTable:
+    """Returns the bit layout shared by every board with side length side.
+    """
+    return LeylineTable(side)
+
+
+class StonehengeBitboardState(GameState):
+    """A state of the Stonehenge game stored as bit masks.
+    =======Attributes======
+    StonehengeBitboardState.p1_turn: True iff it is p1's turn to make a move
+    StonehengeBitboardState.sidelength: the side length of the board
+    StonehengeBitboardState.p1_cells: the mask of the cells p1 has claimed
+    StonehengeBitboardState.p2_cells: the mask of the cells p2 has claimed
+    StonehengeBitboardState.p1_leylines: the mask of the leylines p1 has
+                                         claimed
+    StonehengeBitboardState.p2_leylines: the mask of the leylines p2 has
+                                         claimed
+    StonehengeBitboardState.zobrist: the Zobrist hash of this state, the same
+                                     as that of the equivalent
+                                     StonehengeState
+    """
+    __slots__ = ('sidelength', 'p1_cells', 'p2_cells', 'p1_leylines',
+                 'p2_leylines', 'zobrist', '_table')
+    sidelength: int
+    p1_cells: int
+    p2_cells: int
+    p1_leylines: int
+    p2_leylines: int
+    zobrist: int
+
+    def __init__(self, sidelength: int, is_p1_turn: bool,
+                 p1_cells: int = 0, p2_cells: int = 0,
+                 p1_leylines: int = 0, p2_leylines: int = 0,
+                 zobrist: int = None) -> None:
+        """Initializes a state of a game of Stonehenge with the given claimed
+        cells and leylines, which default to an empty board. zobrist is the
+        hash of the state if it is already known.
+
+        @param 'StonehengeBitboardState' self: the current state
+        @param int sidelength: the side length of the board
+        @param bool is_p1_turn: True iff it is p1's turn to make a move
+        @rtype: None
+        """
+        super().__init__(is_p1_turn)
+        self.sidelength = sidelength
+        self.p1_cells = p1_cells
+        self.p2_cells = p2_cells
+        self.p1_leylines = p1_leylines
+        self.p2_leylines = p2_leylines
+        self._table = leyline_table(sidelength)
+        self.zobrist = self.mask_zobrist() if zobrist is None else zobrist
+
+    def mask_zobrist(self) -> int:
+        """Returns the Zobrist hash of this state, computed from all of its
+        masks rather than from the move that led to it.
+        """
+        topology = self._table.topology
+        zobrist = topology.empty_key
+        if self.p1_turn:
+            zobrist ^= topology.turn_key
+        for player, cells, leylines in ((1, self.p1_cells, self.p1_leylines),
+                                        (2, self.p2_cells, self.p2_leylines)):
+            for cell, keys in enumerate(topology.cell_keys):
+                if cells >> cell & 1:
+                    zobrist ^= keys[player]
+            for leyline, keys in enumerate(topology.head_keys):
+                if leylines >> leyline & 1:
+                    zobrist ^= keys[player]
+        return zobrist
+
+    @classmethod
+    def from_state(cls, state: StonehengeState) -> 'StonehengeBitboardState':
+        """Returns the bitboard state equivalent to the StonehengeState state.
+
+        >>> s = StonehengeState(2, True).make_move('A')
+        >>> b = StonehengeBitboardState.from_state(s)
+        >>> (b.p1_cells, b.p1_leylines, b.p1_turn)
+        (1, 65, False)
+        """
+        table = leyline_table(state.sidelength)
+        cells = {1: 0, 2: 0}
+        leylines = {1: 0, 2: 0, '@': 0}
+        bit = 0
+        for leyline in state.board.horizontal_leylines:
+            for cell in leyline.cell_list:
+                if cell.id in cells:
+                    cells[cell.id] |= 1 << bit
+                bit += 1
+        for i, leyline in enumerate(state.board.leyline_tracker):
+            leylines[leyline.head] |= 1 << i
+        return cls(table.side, state.p1_turn, cells[1], cells[2],
+                   leylines[1], leylines[2])
+
+    def to_state(self) -> StonehengeState:
+        """Returns the StonehengeState equivalent to this state.
+
+        >>> b = StonehengeBitboardState(2, True).make_move('G')
+        >>> b.to_state().get_possible_moves()
+        ['A', 'B', 'C', 'D', 'E', 'F']
+        """
+        board = Board(self.sidelength)
+        owners = {}
+        for bit, label in enumerate(self._table.labels):
+            if self.p1_cells >> bit & 1:
+                owners[label] = 1
+            elif self.p2_cells >> bit & 1:
+                owners[label] = 2
+        for i, leyline in enumerate(board.leyline_tracker):
+            if self.p1_leylines >> i & 1:
+                leyline.head = 1
+            elif self.p2_leylines >> i & 1:
+                leyline.head = 2
+            for cell in leyline.cell_list:
+                cell.id = owners.get(cell.id, cell.id)
+                if cell.id in leyline.counts:
+                    leyline.counts[cell.id] += 1
+        return StonehengeState(self.sidelength, self.p1_turn, board)
+
+    @property
+    def board(self) -> Board:
+        """A Board showing this state, for code written against the board of
+        a StonehengeState. Changing it does not change this state.
+        """
+        return self.to_state().board
+
+    def __str__(self) -> str:
+        """Returns a user-friendly string representation of this state.
+        """
+        return str(self.to_state())
+
+    def __repr__(self) -> str:
+        """Represents this state the same way as the equivalent
+        StonehengeState.
+        """
+        return repr(self.to_state())
+
+    def is_over(self) -> bool:
+        """Returns True iff a player has claimed at least half the leylines,
+        or every leyline has been claimed.
+
+        >>> StonehengeBitboardState(1, True).make_move('A').is_over()
+        True
+        """
+        total = len(self._table.masks)
+        return (2 * _popcount(self.p1_leylines) >= total
+                or 2 * _popcount(self.p2_leylines) >= total
+                or self.p1_leylines | self.p2_leylines ==
+                self._table.all_leylines)
+
+    def winner(self) -> Any:
+        """Returns 'p1' or 'p2' if that player has won the game, or None if
+        nobody has won yet.
+        """
+        total = len(self._table.masks)
+        claimed1 = _popcount(self.p1_leylines)
+        claimed2 = _popcount(self.p2_leylines)
+        if 2 * claimed1 >= total:
+            return 'p1'
+        elif 2 * claimed2 >= total:
+            return 'p2'
+        elif claimed1 + claimed2 == total and claimed1 != claimed2:
+            return 'p1' if claimed1 > claimed2 else 'p2'
+        return None
+
+    def get_possible_moves(self) -> List[str]:
+        """Returns the letters of the unclaimed cells, or no moves at all if
+        the game is over.
+
+        >>> StonehengeBitboardState(1, True).get_possible_moves()
+        ['A', 'B', 'C']
+        """
+        if self.is_over():
+            return []
+        empty = self._table.all_cells & ~(self.p1_cells | self.p2_cells)
+        return [label for bit, label in enumerate(self._table.labels)
+                if empty >> bit & 1]
+
+    def make_move(self, move: Any) -> 'StonehengeBitboardState':
+        """Returns the state after the current player claims the cell with
+        letter move. Only the leylines through that cell are checked for a
+        new claim.
+
+        Precondition: move is in self.get_possible_moves()
+
+        >>> s = StonehengeBitboardState(2, True).make_move('A')
+        >>> s.get_possible_moves()
+        ['B', 'C', 'D', 'E', 'F', 'G']
+        """
+        table = self._table
+        topology = table.topology
+        bit = table.bits[move]
+        p1_cells, p2_cells = self.p1_cells, self.p2_cells
+        p1_leylines, p2_leylines = self.p1_leylines, self.p2_leylines
+        claimed = p1_leylines | p2_leylines
+        zobrist = self.zobrist ^ topology.turn_key
+        if self.p1_turn:
+            p1_cells |= 1 << bit
+            zobrist ^= topology.cell_keys[bit][1]
+            for i in table.cell_leylines[bit]:
+                mask = table.masks[i]
+                if (not claimed >> i & 1 and 2 * _popcount(p1_cells & mask)
+                        >= _popcount(mask)):
+                    p1_leylines |= 1 << i
+                    zobrist ^= topology.head_keys[i][1]
+        else:
+            p2_cells |= 1 << bit
+            zobrist ^= topology.cell_keys[bit][2]
+            for i in table.cell_leylines[bit]:
+                mask = table.masks[i]
+                if (not claimed >> i & 1 and 2 * _popcount(p2_cells & mask)
+                        >= _popcount(mask)):
+                    p2_leylines |= 1 << i
+                    zobrist ^= topology.head_keys[i][2]
+        return StonehengeBitboardState(self.sidelength, not self.p1_turn,
+                                       p1_cells, p2_cells,
+                                       p1_leylines, p2_leylines, zobrist)
+
+    def __eq__(self, other: Any) -> bool:
+        """Returns True iff other is a StonehengeBitboardState with the same
+        claimed cells and leylines and the same player to move.
+
+        >>> StonehengeBitboardState(1, True) == StonehengeBitboardState(1, True)
+        True
+        """
+        return (type(other) == type(self) and self.zobrist == other.zobrist
+                and self.state_key() == other.state_key())
+
+    def __hash__(self) -> int:
+        """Returns the Zobrist hash of this state, which is the same in every
+        process.
+        """
+        return self.zobrist
+
+    def __reduce__(self) -> tuple:
+        """Returns how to pickle this state: by its side length and masks,
+        looking up the table shared by boards of that size again when it is
+        unpickled rather than sending it along.
+
+        >>> import pickle
+        >>> s = StonehengeBitboardState(2, True).make_move('A')
+        >>> t = pickle.loads(pickle.dumps(s))
+        >>> t == s and t._table is leyline_table(2)
+        True
+        """
+        return (StonehengeBitboardState,
+                (self.sidelength, self.p1_turn, self.p1_cells, self.p2_cells,
+                 self.p1_leylines, self.p2_leylines, self.zobrist))
+
+    def state_key(self) -> tuple:
+        """Returns a compact, hashable key for this state.
+
+        >>> s = StonehengeBitboardState(1, True)
+        >>> s.state_key()
+        (1, True, 0, 0, 0, 0)
+        """
+        return (self.sidelength, self.p1_turn, self.p1_cells, self.p2_cells,
+                self.p1_leylines, self.p2_leylines)
+
+    def rough_outcome(self) -> int:
+        """Returns an estimate of the outcome for the current player: WIN if
+        some move wins immediately, LOSE if the game is lost or if every
+        move lets the other player win immediately, and DRAW otherwise.
+
+        >>> StonehengeBitboardState(1, True).rough_outcome()
+        1
+        """
+        if self.is_over():
+            return self.LOSE
+        children = [self.make_move(move)
+                    for move in self.get_possible_moves()]
+        if any(child.is_over() for child in children):
+            return self.WIN
+        if all(any(child.make_move(move).is_over()
+                   for move in child.get_possible_moves())
+               for child in children):
+            return self.LOSE
+        return self.DRAW
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,100 @@
+"""
+A subset of unittests for the bitboard representation of Stonehenge.
+
+These unittests check that a StonehengeBitboardState behaves the same as the
+StonehengeState it stands in for, and that it works with StonehengeGame and
+the minimax strategies unchanged.
+"""
+import pickle
+import random
+import unittest
+from copy import deepcopy
+from unittest.mock import patch
+
+from game_interface import playable_games, usable_strategies
+from stonehenge_bitboard import StonehengeBitboardState, leyline_table
+from stonehenge_state import StonehengeState
+
+StonehengeGame = playable_games['h']
+
+
+class StonehengeBitboardUnitTests(unittest.TestCase):
+    def test_random_games_match_stonehenge_state(self):
+        """
+        Test that random games give the same moves, boards and keys for both
+        representations, for every supported side length.
+        """
+        rng = random.Random(0)
+        for side in range(1, 6):
+            for _ in range(20):
+                state = StonehengeState(side, True)
+                bitboard = StonehengeBitboardState(side, True)
+                while True:
+                    self.assertEqual(bitboard.get_possible_moves(),
+                                     state.get_possible_moves())
+                    self.assertEqual(str(bitboard), str(state))
+                    self.assertEqual(
+                        StonehengeBitboardState.from_state(state).state_key(),
+                        bitboard.state_key())
+                    moves = state.get_possible_moves()
+                    if not moves:
+                        break
+                    move = rng.choice(moves)
+                    state = deepcopy(state).make_move(move)
+                    bitboard = bitboard.make_move(move)
+
+    def test_make_move_keeps_state(self):
+        """
+        Test that make_move() leaves the original state unchanged.
+        """
+        state = StonehengeBitboardState(2, True)
+        key = state.state_key()
+        state.make_move('A')
+        self.assertEqual(state.state_key(), key)
+
+    def test_game_with_bitboard_state(self):
+        """
+        Test StonehengeGame's is_over and is_winner on a bitboard state.
+        """
+        with patch('builtins.input', return_value='1'):
+            game = StonehengeGame(True)
+        game.current_state = StonehengeBitboardState(1, True).make_move('A')
+
+        self.assertTrue(game.is_over(game.current_state))
+        self.assertTrue(game.is_winner('p1'))
+        self.assertFalse(game.is_winner('p2'))
+
+    def test_minimax_with_bitboard_state(self):
+        """
+        Test that minimax chooses the same move on either representation.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+        for move in ['A', 'F', 'D']:
+            game.current_state = game.current_state.make_move(move)
+        expected = usable_strategies['ar'](game)
+
+        game.current_state = StonehengeBitboardState.from_state(
+            game.current_state)
+        self.assertEqual(usable_strategies['ar'](game), expected)
+        self.assertEqual(usable_strategies['ti'](game), expected)
+
+    def test_pickle_leaves_out_table(self):
+        """
+        Test that a pickled state round-trips with only its masks, and shares
+        the leyline table of its side length again.
+        """
+        state = StonehengeBitboardState(4, False)
+        for move in ['A', 'K', 'R']:
+            state = state.make_move(move)
+        data = pickle.dumps(state)
+        copy = pickle.loads(data)
+
+        self.assertEqual(copy, state)
+        self.assertEqual(copy.p1_turn, state.p1_turn)
+        self.assertIs(copy._table, leyline_table(4))
+        self.assertLess(len(data), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,16 +11,20 @@ class StonehengeGame(Game):
     from Game and implementing all its methods.
     """
 
-    def __init__(self, p1_starts):
+    def __init__(self, p1_starts, side_length=None):
         """Initializes a game of Stonehenge with side length
         side_length.
 
         @param 'StonehengeGame' self: The current game of Stonehenge
         @param bool p1_starts: boolean dictating if p1 starts.
+        @param int side_length: the side length of the board, or None to
+        ask the user for it.
         @rtype: None
         """
-        self.side_length = input("What would you like the length " +
-                                 "of your board to be?")
+        if side_length is None:
+            side_length = input("What would you like the length " +
+                                "of your board to be?")
+        self.side_length = side_length
         self.p1_starts = p1_starts
         self.current_state = StonehengeState(int(self.side_length), p1_starts)
 
@@ -45,15 +49,7 @@ class StonehengeGame(Game):
         @rtype: bool
 
         """
-        leyline_list = [d.head for d in currentstate.board.leyline_tracker]
-        total_length = 3 * (int(self.side_length) + 1)
-        if leyline_list.count(1) >= total_length / 2:
-            return True
-        elif leyline_list.count(2) >= total_length / 2:
-            return True
-        elif '@' not in leyline_list:
-            return True
-        return False
+        return currentstate.is_over()
 
     def is_winner(self, player: str):
         """Returns True if the player player is the winner of the game.
@@ -63,28 +59,7 @@ class StonehengeGame(Game):
                            he/she is the winner.
         @rtype: bool
         """
-        headlist = [c.head for c in self.current_state.board.leyline_tracker]
-        if player == 'p1':
-            if headlist.count(1) >= len(headlist)/2:
-                # checks if the number of leylines claimed by p1 is more than
-                # half the number of total leylines
-                return True
-            elif "@" not in headlist and headlist.count(1) > headlist.count(2):
-                # checks that if all leylines are claimed, then the ones claimed
-                # by p1 are more than the ones claimed by p2
-                return True
-            return False
-        elif player == 'p2':
-            if headlist.count(2) >= len(headlist)/2:
-                # checks if the number of leylines claimed by p2 is more than
-                # half the number of total leylines
-                return True
-            elif "@" not in headlist and headlist.count(2) > headlist.count(1):
-                # checks that if all leylines are claimed, then the ones claimed
-                # by p2 are more than the ones claimed by p1
-                return True
-            return False
-        return False
+        return self.current_state.winner() == player
 
     def str_to_move(self, move: str) -> Any:
         """Returns a valid move based on the inputted string. If the inputted
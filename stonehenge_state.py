@@ -1,8 +1,194 @@
 """A file defining the current_state of the Stonehenge game.
 """
-from typing import Any, List
-from copy import deepcopy
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 from game_state import GameState
+from zobrist import zobrist_key
+
+# When True, every StonehengeState remembers its state_key when it is made,
+# and checks that it is unchanged whenever a move is made from it. States
+# share leylines with the states made from them, so this catches code that
+# changes a state in place. Set the STONEHENGE_DEBUG environment variable to
+# turn it on from the start.
+DEBUG_IMMUTABLE = bool(os.environ.get('STONEHENGE_DEBUG'))
+
+# The Zobrist feature numbers for Stonehenge: the game, whose turn it is, a
+# claimed cell and a claimed leyline.
+_GAME = 2
+_TURN = 0
+_CELL = 1
+_HEAD = 2
+
+
+def cell_label(index: int) -> str:
+    """Returns the letter of the cell at position index, counting from 0 in
+    reading order. After 'Z', cells are lettered like spreadsheet columns.
+
+    >>> [cell_label(i) for i in (0, 25, 26, 27, 52)]
+    ['A', 'Z', 'AA', 'AB', 'BA']
+    """
+    label = ''
+    index += 1
+    while index:
+        index, letter = divmod(index - 1, 26)
+        label = chr(ord('A') + letter) + label
+    return label
+
+
+class BoardTopology:
+    """The cells and leylines of a board with a given side length, which are
+    the same for every state played on a board of that size.
+
+    Cells are numbered in reading order. Row r of the board has r + 2 cells
+    in columns 0 to r + 1, except for the last row, row side, whose side
+    cells sit in columns 1 to side. A cell's horizontal leyline is its row,
+    its left diagonal leyline (running down and to the right) is its column
+    minus its row, and its right diagonal leyline (running up and to the
+    right) is its column.
+    ======Attributes=======
+    topology.side: the side length of the board
+    topology.labels: the letter of every cell
+    topology.coordinates: the (row, column) of every cell
+    topology.horizontal: the cells of each horizontal leyline, top to bottom
+    topology.left_diagonal: the cells of each left diagonal leyline, from
+                            the bottom left corner of the board
+    topology.right_diagonal: the cells of each right diagonal leyline, from
+                             the top left corner of the board
+    topology.leylines: every leyline, horizontal ones first, then the left
+                       and then the right diagonal ones
+    topology.cell_leylines: the indices in leylines of the three leylines
+                            through every cell
+    topology.cell_positions: the (index in leylines, position in that
+                             leyline) of each of the three leylines through
+                             every cell
+    topology.indices: the number of every cell, keyed by its letter
+    topology.cell_keys: the Zobrist keys of every cell, indexed by the cell
+                        and then by the player (1 or 2) who claimed it
+    topology.head_keys: the Zobrist keys of every leyline, indexed by the
+                        leyline and then by the player who claimed it
+    topology.turn_key: the Zobrist key included when it is p1's turn
+    topology.empty_key: the Zobrist hash of the empty board on p2's turn
+    topology.symmetries: the rotations and reflections that map the board
+                         onto itself, each as a pair of tuples giving the
+                         cell every cell moves to and the leyline every
+                         leyline moves to, starting with the identity
+    """
+    side: int
+    labels: List[str]
+    coordinates: List[Tuple[int, int]]
+    horizontal: List[Tuple[int, ...]]
+    left_diagonal: List[Tuple[int, ...]]
+    right_diagonal: List[Tuple[int, ...]]
+    leylines: List[Tuple[int, ...]]
+    cell_leylines: List[Tuple[int, int, int]]
+    cell_positions: List[Tuple[Tuple[int, int], ...]]
+    indices: Dict[str, int]
+    cell_keys: List[Tuple[int, int, int]]
+    head_keys: List[Tuple[int, int, int]]
+    turn_key: int
+    empty_key: int
+    symmetries: List[Tuple[Tuple[int, ...], Tuple[int, ...]]]
+
+    def __init__(self, side: int) -> None:
+        """Computes the cells and leylines of a board of side length side.
+
+        @param BoardTopology self: the current topology
+        @param int side: the side length of the board
+        @rtype: None
+
+        >>> t = BoardTopology(2)
+        >>> [[t.labels[i] for i in line] for line in t.left_diagonal]
+        [['C', 'F'], ['A', 'D', 'G'], ['B', 'E']]
+        >>> t.cell_leylines[3]
+        (1, 4, 7)
+        >>> t.cell_positions[3]
+        ((1, 1), (4, 1), (7, 1))
+        """
+        self.side = side
+        self.coordinates = [(row, column) for row in range(side)
+                            for column in range(row + 2)]
+        self.coordinates.extend((side, column)
+                                for column in range(1, side + 1))
+        self.labels = [cell_label(i) for i in range(len(self.coordinates))]
+
+        index = {coordinate: i for i, coordinate
+                 in enumerate(self.coordinates)}
+        self.horizontal = [tuple(i for (r, _), i in index.items() if r == row)
+                           for row in range(side + 1)]
+        self.left_diagonal = [
+            tuple(i for (r, c), i in index.items() if c - r == offset)
+            for offset in range(1 - side, 2)]
+        self.right_diagonal = [
+            tuple(i for (_, c), i in index.items() if c == column)
+            for column in range(side + 1)]
+        self.leylines = self.horizontal + self.left_diagonal + \
+            self.right_diagonal
+        self.cell_leylines = [(r, side + 1 + c - r + side - 1,
+                               2 * (side + 1) + c)
+                              for r, c in self.coordinates]
+        self.cell_positions = [
+            tuple((leyline, self.leylines[leyline].index(cell))
+                  for leyline in self.cell_leylines[cell])
+            for cell in range(len(self.coordinates))]
+        self.indices = {label: i for i, label in enumerate(self.labels)}
+
+        self.cell_keys = [(0, zobrist_key(_GAME, side, _CELL, cell, 1),
+                           zobrist_key(_GAME, side, _CELL, cell, 2))
+                          for cell in range(len(self.labels))]
+        self.head_keys = [(0, zobrist_key(_GAME, side, _HEAD, leyline, 1),
+                           zobrist_key(_GAME, side, _HEAD, leyline, 2))
+                          for leyline in range(len(self.leylines))]
+        self.turn_key = zobrist_key(_GAME, side, _TURN)
+        self.empty_key = zobrist_key(_GAME, side)
+        self.symmetries = self.symmetry_maker()
+
+    def symmetry_maker(self) -> List[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+        """Returns the symmetries of the board, found by trying each of the
+        twelve rotations and reflections of the triangular grid the cells
+        sit on.
+
+        A cell at (row, column) has the cube coordinates (column, -row,
+        row - column), which sum to 0 and stay constant along its right
+        diagonal, horizontal and left diagonal leylines respectively. Each
+        symmetry of the grid permutes these coordinates and possibly negates
+        all three, then shifts the board back into place.
+
+        >>> [len(BoardTopology(side).symmetries) for side in range(1, 5)]
+        [6, 12, 6, 6]
+        """
+        cube = [(c, -r, r - c) for r, c in self.coordinates]
+        index = {coordinate: i for i, coordinate
+                 in enumerate(self.coordinates)}
+        leyline_index = {frozenset(leyline): i
+                         for i, leyline in enumerate(self.leylines)}
+        orders = [(0, 1, 2), (1, 2, 0), (2, 0, 1),
+                  (0, 2, 1), (2, 1, 0), (1, 0, 2)]
+        symmetries = []
+        for sign in (1, -1):
+            for order in orders:
+                moved = [(sign * u[order[0]], -sign * u[order[1]])
+                         for u in cube]
+                row_shift, column_shift = min(
+                    (r, c) for c, r in moved)
+                first_row, first_column = min(self.coordinates)
+                cells = tuple(index.get((r - row_shift + first_row,
+                                         c - column_shift + first_column))
+                              for c, r in moved)
+                if None in cells:
+                    continue
+                leylines = tuple(
+                    leyline_index[frozenset(cells[i] for i in leyline)]
+                    for leyline in self.leylines)
+                symmetries.append((cells, leylines))
+        return symmetries
+
+
+@lru_cache(maxsize=None)
+def board_topology(side: int) -> BoardTopology:
+    """Returns the topology shared by every board of side length side.
+    """
+    return BoardTopology(side)
 
 
 class Cell:
@@ -22,18 +208,58 @@ class Cell:
 
 
 class Leyline:
-    """A class defining a Leyline."""
+    """A class defining a Leyline. Leylines are never changed once made, so
+    the boards of different states can share them.
+    =====Attributes======
+    leyline.head = the player who claimed this leyline, or '@' if nobody has
+    leyline.cell_list = the cells within this leyline
+    leyline.counts = the number of cells within this leyline claimed by
+                     each player
+    """
 
-    def __init__(self, cell_list: List['Cell']) -> None:
+    def __init__(self, cell_list: List['Cell'], head: Any = '@',
+                 counts: Dict[int, int] = None) -> None:
         """Initializes an object of type 'Leyline'.
 
         @param Leyline self: the current Leyline
         @param List['Cell']: the list containing all the cells within
         that leyline
+        @param head: the player who claimed the leyline, or '@'
+        @param Dict[int, int] counts: the number of cells claimed by each
+        player, or None if no cells have been claimed
         @rtype: None
         """
-        self.head = '@'
+        self.head = head
         self.cell_list = cell_list
+        self.counts = {1: 0, 2: 0} if counts is None else counts
+
+    def claim(self, position: int, cell: 'Cell') -> 'Leyline':
+        """Returns a copy of this leyline with its cell at position replaced
+        by cell, a cell claimed by player cell.id. The copy shares its other
+        cells with this leyline, and belongs to the player if nobody has
+        claimed it yet and the player now holds at least half of its cells.
+
+        @param Leyline self: the current Leyline
+        @param int position: the position of the claimed cell in cell_list
+        @param Cell cell: the claimed cell, whose id is 1 or 2
+        @rtype: Leyline
+
+        >>> leyline = Leyline([Cell('A'), Cell('B'), Cell('C')])
+        >>> once = leyline.claim(0, Cell(2))
+        >>> twice = once.claim(2, Cell(2))
+        >>> (leyline.head, once.head, twice.head)
+        ('@', '@', 2)
+        >>> twice.cell_list[1] is leyline.cell_list[1]
+        True
+        """
+        cell_list = self.cell_list[:]
+        cell_list[position] = cell
+        counts = self.counts.copy()
+        counts[cell.id] += 1
+        head = self.head
+        if head == '@' and 2 * counts[cell.id] >= len(cell_list):
+            head = cell.id
+        return Leyline(cell_list, head, counts)
 
 
 class Board:
@@ -67,263 +293,55 @@ class Board:
         self.right_diagonal_leylines = []
         self.leyline_tracker = []
 
-        if side == 1:
-            self.maker_one()
-
-        elif side == 2:
-            self.maker_two()
+        if side < 1:
+            print("Invalid length!")
+            return
 
-        elif side == 3:
-            self.maker_three()
+        topology = board_topology(side)
+        self.horizontal_leylines = self.leyline_maker(topology,
+                                                      topology.horizontal)
+        self.left_diagonal_leylines = self.leyline_maker(
+            topology, topology.left_diagonal)
+        self.right_diagonal_leylines = self.leyline_maker(
+            topology, topology.right_diagonal)
+        self.leyline_tracker = self.horizontal_leylines + \
+            self.left_diagonal_leylines + self.right_diagonal_leylines
 
-        elif side == 4:
-            self.maker_four()
+    @staticmethod
+    def leyline_maker(topology: BoardTopology,
+                      leylines: List[Tuple[int, ...]]) -> List['Leyline']:
+        """Returns a Leyline, with a new Cell for each of its cells, for
+        every leyline in leylines.
+        """
+        return [Leyline([Cell(topology.labels[i]) for i in leyline])
+                for leyline in leylines]
 
-        elif side == 5:
-            self.maker_five()
+    def copy(self) -> 'Board':
+        """Returns a new board holding the same leylines as this one.
+        """
+        board = Board.__new__(Board)
+        board.horizontal_leylines = self.horizontal_leylines[:]
+        board.left_diagonal_leylines = self.left_diagonal_leylines[:]
+        board.right_diagonal_leylines = self.right_diagonal_leylines[:]
+        board.leyline_tracker = self.leyline_tracker[:]
+        return board
 
-        else:
-            print("Invalid length!")
+    def replace(self, index: int, leyline: 'Leyline') -> None:
+        """Puts leyline in place of the leyline at index in leyline_tracker,
+        and in whichever of the horizontal, left or right diagonal leylines
+        held it.
 
-    def maker_one(self) -> None:
-        """Creates a playing board of size 1.
+        Only use this on a board that no state holds yet, such as a new
+        copy.
         """
-        cell1 = Cell('A')
-        cell2 = Cell('B')
-        cell3 = Cell('C')
-        cell4 = Cell('A')
-        cell5 = Cell('B')
-        cell6 = Cell('C')
-        cell7 = Cell('A')
-        cell8 = Cell('B')
-        cell9 = Cell('C')
-        h_leyline1 = Leyline([cell1, cell2])
-        h_leyline2 = Leyline([cell3])
-        self.horizontal_leylines = [h_leyline1, h_leyline2]
-        l_diag_leyline = Leyline([cell4, cell6])
-        l_diag_leyline2 = Leyline([cell5])
-        self.left_diagonal_leylines = [l_diag_leyline, l_diag_leyline2]
-        r_diag_leyline = Leyline([cell8, cell9])
-        r_diag_leyline2 = Leyline([cell7])
-        self.right_diagonal_leylines = [r_diag_leyline, r_diag_leyline2]
-        self.leyline_tracker = [h_leyline1, h_leyline2,
-                                l_diag_leyline, l_diag_leyline2,
-                                r_diag_leyline2, r_diag_leyline]
-
-    def maker_two(self) -> None:
-        """Creates a playing board of size 2.
-        """
-        cell1, cell2, cell3, cell4, cell5, cell6, cell7 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), \
-            Cell('E'), Cell('F'), Cell('G')
-        cell8, cell9, cell10, cell11, cell12, cell13, cell14 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), \
-            Cell('E'), Cell('F'), Cell('G')
-        cell15, cell16, cell17, cell18, cell19, cell20, cell21 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), \
-            Cell('E'), Cell('F'), Cell('G')
-
-        h_leyline1 = Leyline([cell1, cell2])
-        h_leyline2 = Leyline([cell3, cell4, cell5])
-        h_leyline3 = Leyline([cell6, cell7])
-        self.horizontal_leylines = [h_leyline1, h_leyline2, h_leyline3]
-        l_diag_leyline = Leyline([cell10, cell13])
-        l_diag_leyline2 = Leyline([cell8, cell11, cell14])
-        l_diag_leyline3 = Leyline([cell9, cell12])
-        self.left_diagonal_leylines = [l_diag_leyline, l_diag_leyline2,
-                                       l_diag_leyline3]
-        r_diag_leyline = Leyline([cell19, cell21])
-        r_diag_leyline2 = Leyline([cell16, cell18, cell20])
-        r_diag_leyline3 = Leyline([cell15, cell17])
-        self.right_diagonal_leylines = [r_diag_leyline, r_diag_leyline2,
-                                        r_diag_leyline3]
-        self.leyline_tracker = [h_leyline1, h_leyline2,
-                                h_leyline3,
-                                l_diag_leyline, l_diag_leyline2,
-                                l_diag_leyline3, r_diag_leyline2,
-                                r_diag_leyline, r_diag_leyline3]
-
-    def maker_three(self) -> None:
-        """Creates a playing board of side size 3.
-        """
-        cell1, cell2, cell3, cell4, cell5, cell6 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), \
-            Cell('E'), Cell('F')
-        cell7, cell8, cell9, cell10, cell11, cell12 = \
-            Cell('G'), Cell('H'), Cell('I'), Cell('J'), \
-            Cell('K'), Cell('L')
-        cell13, cell14, cell15, cell16, cell17, cell18 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), \
-            Cell('E'), Cell('F')
-        cell19, cell20, cell21, cell22, cell23, cell24 = \
-            Cell('G'), Cell('H'), Cell('I'), Cell('J'), \
-            Cell('K'), Cell('L')
-        cell25, cell26, cell27, cell28, cell29, cell30 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), \
-            Cell('E'), Cell('F')
-        cell31, cell32, cell33, cell34, cell35, cell36 = \
-            Cell('G'), Cell('H'), Cell('I'), Cell('J'), \
-            Cell('K'), Cell('L')
-
-        h_leyline1 = Leyline([cell1, cell2])
-        h_leyline2 = Leyline([cell3, cell4, cell5])
-        h_leyline3 = Leyline([cell6, cell7, cell8, cell9])
-        h_leyline4 = Leyline([cell10, cell11, cell12])
-        self.horizontal_leylines = [h_leyline1, h_leyline2, h_leyline3,
-                                    h_leyline4]
-        l_diag_leyline = Leyline([cell18, cell22])
-        l_diag_leyline2 = Leyline([cell15, cell19, cell23])
-        l_diag_leyline3 = Leyline([cell13, cell16, cell20, cell24])
-        l_diag_leyline4 = Leyline([cell14, cell17, cell21])
-        self.left_diagonal_leylines = [l_diag_leyline, l_diag_leyline2,
-                                       l_diag_leyline3, l_diag_leyline4]
-        r_diag_leyline = Leyline([cell30, cell27, cell25])
-        r_diag_leyline2 = Leyline([cell34, cell31, cell28, cell26])
-        r_diag_leyline3 = Leyline([cell35, cell32, cell29])
-        r_diag_leyline4 = Leyline([cell36, cell33])
-        self.right_diagonal_leylines = [r_diag_leyline, r_diag_leyline2,
-                                        r_diag_leyline3, r_diag_leyline4]
-        self.leyline_tracker = [h_leyline1, h_leyline2,
-                                h_leyline3, h_leyline4,
-                                l_diag_leyline, l_diag_leyline2,
-                                l_diag_leyline3, l_diag_leyline4,
-                                r_diag_leyline2, r_diag_leyline,
-                                r_diag_leyline3, r_diag_leyline4]
-
-    def maker_four(self) -> None:
-        """Creates a playing board of side size 4.
-        """
-        cell1, cell2, cell3, cell4, cell5, cell6 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), Cell('E'), Cell('F')
-        cell7, cell8, cell9, cell10, cell11, cell12 = \
-            Cell('G'), Cell('H'), Cell('I'), Cell('J'), Cell('K'), Cell('L')
-        cell13, cell14, cell15, cell16, cell17, cell18 = \
-            Cell('M'), Cell('N'), Cell('O'), Cell('P'), Cell('Q'), Cell('R')
-        cell19, cell20, cell21, cell22, cell23, cell24 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), Cell('E'), Cell('F')
-        cell25, cell26, cell27, cell28, cell29, cell30 = \
-            Cell('G'), Cell('H'), Cell('I'), Cell('J'), Cell('K'), Cell('L')
-        cell31, cell32, cell33, cell34, cell35, cell36 = \
-            Cell('M'), Cell('N'), Cell('O'), Cell('P'), Cell('Q'), Cell('R')
-        cell37, cell38, cell39, cell40, cell41, cell42 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), Cell('E'), Cell('F')
-        cell43, cell44, cell45, cell46, cell47, cell48 = \
-            Cell('G'), Cell('H'), Cell('I'), Cell('J'), Cell('K'), Cell('L')
-        cell49, cell50, cell51, cell52, cell53, cell54 = \
-            Cell('M'), Cell('N'), Cell('O'), Cell('P'), Cell('Q'), Cell('R')
-
-        h_leyline = Leyline([cell1, cell2])
-        h_leyline2 = Leyline([cell3, cell4, cell5])
-        h_leyline3 = Leyline([cell6, cell7, cell8, cell9])
-        h_leyline4 = Leyline([cell10, cell11, cell12, cell13, cell14])
-        h_leyline5 = Leyline([cell15, cell16, cell17, cell18])
-        self.horizontal_leylines = [h_leyline, h_leyline2, h_leyline3,
-                                    h_leyline4, h_leyline5]
-        r_diag_leyline = Leyline([cell46, cell42, cell39, cell37])
-        r_diag_leyline2 = Leyline([cell51, cell47, cell43, cell40, cell38])
-        r_diag_leyline3 = Leyline([cell52, cell48, cell44, cell41])
-        r_diag_leyline4 = Leyline([cell53, cell49, cell45])
-        r_diag_leyline5 = Leyline([cell54, cell50])
-        self.right_diagonal_leylines = [r_diag_leyline, r_diag_leyline2,
-                                        r_diag_leyline3, r_diag_leyline4,
-                                        r_diag_leyline5]
-        l_diag_leyline = Leyline([cell28, cell33])
-        l_diag_leyline2 = Leyline([cell24, cell29, cell34])
-        l_diag_leyline3 = Leyline([cell21, cell25, cell30, cell35])
-        l_diag_leyline4 = Leyline([cell19, cell22, cell26, cell31, cell36])
-        l_diag_leyline5 = Leyline([cell20, cell23, cell27, cell32])
-        self.left_diagonal_leylines = [l_diag_leyline, l_diag_leyline2,
-                                       l_diag_leyline3, l_diag_leyline4,
-                                       l_diag_leyline5]
-        self.leyline_tracker = [h_leyline, h_leyline2,
-                                h_leyline3, h_leyline4, h_leyline5,
-                                l_diag_leyline, l_diag_leyline2,
-                                l_diag_leyline3, l_diag_leyline4,
-                                l_diag_leyline5,
-                                r_diag_leyline2, r_diag_leyline,
-                                r_diag_leyline3, r_diag_leyline4,
-                                r_diag_leyline5]
-
-    def maker_five(self) -> None:
-        """Creates a board of side size 5.
-        """
-        cell1, cell2, cell3, cell4, cell5, cell6 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), \
-            Cell('E'), Cell('F')
-        cell7, cell8, cell9, cell10, cell11, cell12 = \
-            Cell('G'), Cell('H'), Cell('I'), Cell('J'), \
-            Cell('K'), Cell('L')
-        cell13, cell14, cell15, cell16, cell17, cell18 = \
-            Cell('M'), Cell('N'), Cell('O'), Cell('P'), \
-            Cell('Q'), Cell('R')
-        cell19, cell20, cell21, cell22 = \
-            Cell('S'), Cell('T'), Cell('U'), Cell('V')
-        cell23, cell24, cell25 = \
-            Cell('W'), Cell('X'), Cell('Y')
-        cell26, cell27, cell28, cell29, cell30, cell31 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), \
-            Cell('E'), Cell('F')
-        cell32, cell33, cell34, cell35, cell36, cell37 = \
-            Cell('G'), Cell('H'), Cell('I'), Cell('J'), \
-            Cell('K'), Cell('L')
-        cell38, cell39, cell40, cell41, cell42, cell43 = \
-            Cell('M'), Cell('N'), Cell('O'), Cell('P'), \
-            Cell('Q'), Cell('R')
-        cell44, cell45, cell46, cell47 = \
-            Cell('S'), Cell('T'), Cell('U'), Cell('V')
-        cell48, cell49, cell50 = \
-            Cell('W'), Cell('X'), Cell('Y')
-        cell51, cell52, cell53, cell54, cell55, cell56 = \
-            Cell('A'), Cell('B'), Cell('C'), Cell('D'), \
-            Cell('E'), Cell('F')
-        cell57, cell58, cell59, cell60, cell61, cell62 = \
-            Cell('G'), Cell('H'), Cell('I'), Cell('J'), \
-            Cell('K'), Cell('L')
-        cell63, cell64, cell65, cell66, cell67, cell68 = \
-            Cell('M'), Cell('N'), Cell('O'), Cell('P'), \
-            Cell('Q'), Cell('R')
-        cell69, cell70, cell71, cell72 = \
-            Cell('S'), Cell('T'), Cell('U'), Cell('V')
-        cell73, cell74, cell75 = \
-            Cell('W'), Cell('X'), Cell('Y')
-
-        h_leyline = Leyline([cell1, cell2])
-        h_leyline2 = Leyline([cell3, cell4, cell5])
-        h_leyline3 = Leyline([cell6, cell7, cell8, cell9])
-        h_leyline4 = Leyline([cell10, cell11, cell12, cell13, cell14])
-        h_leyline5 = Leyline([cell15, cell16, cell17, cell18, cell19, cell20])
-        h_leyline6 = Leyline([cell21, cell22, cell23, cell24, cell25])
-        self.horizontal_leylines = [h_leyline, h_leyline2, h_leyline3,
-                                    h_leyline4, h_leyline5, h_leyline6]
-        l_diag_leyline = Leyline([cell40, cell46])
-        l_diag_leyline2 = Leyline([cell35, cell41, cell47])
-        l_diag_leyline3 = Leyline([cell31, cell36, cell42, cell48])
-        l_diag_leyline4 = Leyline([cell28, cell32, cell37, cell43, cell49])
-        l_diag_leyline5 = Leyline([cell26, cell29, cell33, cell38,
-                                   cell44, cell50])
-        l_diag_leyline6 = Leyline([cell27, cell30, cell34, cell39, cell45])
-        self.left_diagonal_leylines = [l_diag_leyline, l_diag_leyline2,
-                                       l_diag_leyline3, l_diag_leyline4,
-                                       l_diag_leyline5, l_diag_leyline6]
-        r_diag_leyline = Leyline([cell65, cell60, cell56, cell53, cell51])
-        r_diag_leyline2 = Leyline([cell71, cell66, cell61, cell57,
-                                   cell54, cell52])
-        r_diag_leyline3 = Leyline([cell72, cell67, cell62, cell58, cell55])
-        r_diag_leyline4 = Leyline([cell73, cell68, cell63, cell59])
-        r_diag_leyline5 = Leyline([cell74, cell69, cell64])
-        r_diag_leyline6 = Leyline([cell75, cell70])
-        self.right_diagonal_leylines = [r_diag_leyline, r_diag_leyline2,
-                                        r_diag_leyline3, r_diag_leyline4,
-                                        r_diag_leyline5, r_diag_leyline6]
-        self.leyline_tracker = [h_leyline, h_leyline2,
-                                h_leyline3, h_leyline4,
-                                h_leyline5, h_leyline6,
-                                l_diag_leyline, l_diag_leyline2,
-                                l_diag_leyline3, l_diag_leyline4,
-                                l_diag_leyline5, l_diag_leyline6,
-                                r_diag_leyline2, r_diag_leyline,
-                                r_diag_leyline3, r_diag_leyline4,
-                                r_diag_leyline5, r_diag_leyline6]
+        self.leyline_tracker[index] = leyline
+        family = len(self.horizontal_leylines)
+        if index < family:
+            self.horizontal_leylines[index] = leyline
+        elif index < 2 * family:
+            self.left_diagonal_leylines[index - family] = leyline
+        else:
+            self.right_diagonal_leylines[index - 2 * family] = leyline
 
 
 class StonehengeState(GameState):
@@ -335,20 +353,51 @@ class StonehengeState(GameState):
                                 being played on.
     Stonehenge.board: A board initialized to be the size stated as
                       the Stonehenge State's parameter.
+    StonehengeState.topology: The cells and leylines of boards of this
+                              size, shared by every state of this size.
+    StonehengeState.zobrist: The Zobrist hash of the current state.
+    StonehengeState.leyline_counts: The number of leylines claimed by each
+                                    player.
+    StonehengeState.empty_cells: The letters of the unclaimed cells, in
+                                 reading order.
     """
 
-    def __init__(self, sidelength: int, is_p1_turn: bool) -> None:
+    def __init__(self, sidelength: int, is_p1_turn: bool,
+                 board: 'Board' = None, zobrist: int = None,
+                 leyline_counts: Dict[int, int] = None,
+                 empty_cells: Tuple[str, ...] = None) -> None:
         """Initializes a current state of a game of Stonehenge.
 
         @param 'StonehengeState' self: The current state of the current
         game of Stonehenge
         @param int sidelength: The side length of the board of the current
         state of the current game of Stonehenge
+        @param Board board: The board of the current state, or None for a
+        new, empty board
+        @param int zobrist: The Zobrist hash of the current state, or None
+        to compute it from the board
+        @param Dict[int, int] leyline_counts: The number of leylines claimed
+        by each player, or None to count them on the board
+        @param Tuple[str, ...] empty_cells: The letters of the unclaimed
+        cells, or None to find them on the board
         @rtype: None
         """
         self.p1_turn = is_p1_turn
         self.sidelength = sidelength
-        self.board = Board(sidelength)
+        self.topology = board_topology(sidelength)
+        self.board = Board(sidelength) if board is None else board
+        self.zobrist = self.board_zobrist() if zobrist is None else zobrist
+        if leyline_counts is None:
+            heads = [leyline.head for leyline in self.board.leyline_tracker]
+            leyline_counts = {1: heads.count(1), 2: heads.count(2)}
+        self.leyline_counts = leyline_counts
+        if empty_cells is None:
+            empty_cells = tuple(
+                cell.id for leyline in self.board.horizontal_leylines
+                for cell in leyline.cell_list if cell.id not in (1, 2))
+        self.empty_cells = empty_cells
+        if DEBUG_IMMUTABLE:
+            self._snapshot = self.state_key()
 
     def __str__(self) -> str:
         """Returnes a user-friendly string representation of the current
@@ -365,14 +414,16 @@ class StonehengeState(GameState):
             return self.string_creator_4()
         elif self.sidelength == 5:
             return self.string_creator_5()
+        elif self.sidelength > 5:
+            return self.string_creator_any()
         return 'Invalid Length'
 
     def string_creator_1(self) -> str:
         """Returns the grid needed for length 1 boards."""
         a = self.board.left_diagonal_leylines[0].head
         b = self.board.left_diagonal_leylines[1].head
-        c = self.board.right_diagonal_leylines[1].head
-        d = self.board.right_diagonal_leylines[0].head
+        c = self.board.right_diagonal_leylines[0].head
+        d = self.board.right_diagonal_leylines[1].head
         e = self.board.horizontal_leylines[0].head
         f = self.board.horizontal_leylines[0].cell_list[0].id
         g = self.board.horizontal_leylines[0].cell_list[1].id
@@ -391,12 +442,12 @@ class StonehengeState(GameState):
 
     def string_creator_2(self) -> str:
         """Returns a grid needed for length 2 boards of stonehenge."""
-        a, b, c, d, e, f = self.board.right_diagonal_leylines[2].head, \
+        a, b, c, d, e, f = self.board.right_diagonal_leylines[0].head, \
                            self.board.right_diagonal_leylines[1].head, \
                            self.board.horizontal_leylines[0].head, \
                            self.board.horizontal_leylines[0].cell_list[0].id, \
                            self.board.horizontal_leylines[0].cell_list[1].id, \
-                           self.board.right_diagonal_leylines[0].head
+                           self.board.right_diagonal_leylines[2].head
         g, h, i, j, k, l = self.board.horizontal_leylines[1].head, \
                            self.board.horizontal_leylines[1].cell_list[0].id, \
                            self.board.horizontal_leylines[1].cell_list[1].id, \
@@ -585,6 +636,77 @@ class StonehengeState(GameState):
                          r, s, t, u, v, w, x, y, z, aa, ab, ac, ad,
                          ae, af, ag, ah, ai, aj, ak, al, am, an, ao, ap, aq)
 
+    def string_creator_any(self) -> str:
+        """Returns a grid for a stonehenge board of any side length, laid out
+        like the grids of the smaller boards.
+
+        Every cell or leyline head is drawn at a (row, column) position of
+        the board's topology. Leyline heads sit one step past the end of
+        their leyline: left of each row, above the top of each right
+        diagonal, and below the bottom of each left diagonal.
+        """
+        side = self.sidelength
+        topology = self.topology
+        width = max(len(label) for label in topology.labels)
+        separator = ' - ' if width == 1 else ' -- '
+        unit = width + len(separator)
+        half = unit // 2
+
+        def x(row: int, column: int) -> int:
+            """Returns the text column of the board position (row, column).
+            """
+            return unit - half + (side - row) * half + column * unit
+
+        lines = [[' '] * (x(-1, side + 2) + width)
+                 for _ in range(2 * side + 5)]
+
+        def put(row: int, column: int, token: Any) -> None:
+            """Draws token at the board position (row, column)."""
+            start = x(row, column)
+            lines[2 * row + 2][start:start + width] = \
+                str(token).ljust(width)
+
+        def link(row: int, column: int, slash: str) -> None:
+            """Draws slash below the board position (row, column)."""
+            offset = -half if slash == '/' else half
+            lines[2 * row + 3][x(row, column) +
+                               (width - 1 + offset) // 2] = slash
+
+        ids = [cell.id for leyline in self.board.horizontal_leylines
+               for cell in leyline.cell_list]
+        for (row, column), identity in zip(topology.coordinates, ids):
+            put(row, column, identity)
+            below = (row + 1, column)
+            if below in topology.coordinates:
+                link(row, column, '/')
+            if (row + 1, column + 1) in topology.coordinates:
+                link(row, column, '\\')
+
+        for row, (cells, leyline) in enumerate(
+                zip(topology.horizontal, self.board.horizontal_leylines)):
+            column = topology.coordinates[cells[0]][1] - 1
+            put(row, column, leyline.head)
+            start = x(row, column) + width
+            lines[2 * row + 2][start:start + len(separator)] = separator
+            for i in cells[:-1]:
+                start = x(*topology.coordinates[i]) + width
+                lines[2 * row + 2][start:start + len(separator)] = separator
+
+        for cells, leyline in zip(topology.right_diagonal,
+                                  self.board.right_diagonal_leylines):
+            row, column = topology.coordinates[cells[0]]
+            put(row - 1, column, leyline.head)
+            link(row - 1, column, '/')
+
+        for cells, leyline in zip(topology.left_diagonal,
+                                  self.board.left_diagonal_leylines):
+            row, column = topology.coordinates[cells[-1]]
+            put(row + 1, column + 1, leyline.head)
+            link(row, column, '\\')
+
+        return '\n'.join(''.join(line).rstrip() for line in lines
+                         if ''.join(line).strip())
+
     def get_possible_moves(self) -> List[str]:
         """Returns all the possible moves available to the player.
 
@@ -599,68 +721,132 @@ class StonehengeState(GameState):
         >>> print(s.get_possible_moves())
         []
         """
-        leyline_list = [d.head for d in self.board.leyline_tracker]
-        total_length = 3 * int((self.sidelength + 1))
-        if leyline_list.count(1) >= total_length / 2 or leyline_list.count(
-                2) >= total_length / 2 or '@' not in leyline_list:
+        if self.is_over():
             return []
-        result = []
-        for leyline in self.board.horizontal_leylines:
-            for cell in leyline.cell_list:
-                if str(cell.id).isalpha():
-                    result.append(cell.id)
-        return result
-
-    def leyline_head_changer(self, leyline: 'Leyline') -> None:
-        """Changes the head value depending on the conditions met
-        by the leyline.
+        return list(self.empty_cells)
+
+    def is_over(self) -> bool:
+        """Returns True iff the game is over: a player has claimed at least
+        half of the leylines, or every leyline has been claimed.
+
+        >>> StonehengeState(1, True).is_over()
+        False
+        >>> StonehengeState(1, True).make_move('A').is_over()
+        True
+        """
+        total = len(self.topology.leylines)
+        claimed1, claimed2 = self.leyline_counts[1], self.leyline_counts[2]
+        return (2 * claimed1 >= total or 2 * claimed2 >= total
+                or claimed1 + claimed2 == total)
+
+    def winner(self) -> Any:
+        """Returns 'p1' or 'p2' if that player has won the game, or None if
+        nobody has won yet.
+
+        A player wins by claiming at least half of the leylines, or by
+        holding more of them than the other player once all are claimed.
+
+        >>> StonehengeState(1, True).make_move('A').winner()
+        'p1'
+        """
+        total = len(self.topology.leylines)
+        claimed1, claimed2 = self.leyline_counts[1], self.leyline_counts[2]
+        if 2 * claimed1 >= total:
+            return 'p1'
+        elif 2 * claimed2 >= total:
+            return 'p2'
+        elif claimed1 + claimed2 == total and claimed1 != claimed2:
+            return 'p1' if claimed1 > claimed2 else 'p2'
+        return None
+
+    def is_valid_move(self, move: Any) -> bool:
+        """Returns True iff move is the letter of an unclaimed cell and the
+        game is not over.
+
+        >>> s = StonehengeState(2, True).make_move('A')
+        >>> s.is_valid_move('B'), s.is_valid_move('A'), s.is_valid_move('Z')
+        (True, False, False)
         """
-        cell_id_list = []
-        for cells in leyline.cell_list:
-            cell_id_list.append(cells.id)
-        numberof1s = cell_id_list.count(1)
-        numberof2s = cell_id_list.count(2)
-        if numberof1s >= (len(leyline.cell_list) / 2) and leyline.head == '@':
-            leyline.head = 1
-        elif numberof2s >= (len(leyline.cell_list) / 2) and leyline.head == '@':
-            leyline.head = 2
+        if not isinstance(move, str) or self.is_over():
+            return False
+        cell = self.topology.indices.get(move)
+        if cell is None:
+            return False
+        leyline, position = self.topology.cell_positions[cell][0]
+        return self.board.leyline_tracker[leyline].cell_list[
+            position].id == move
 
     def make_move(self, move: Any) -> 'StonehengeState':
         """Returns a new current state with the changes made from the previous
         current state after a move is made.
+
+        Only the three leylines through the claimed cell can change, so the
+        new state's board shares every other leyline with this one, and this
+        state is left unchanged.
         >>> s = StonehengeState(2, True)
         >>> t = s.make_move('A')
         >>> print(t.get_possible_moves())
         ['B', 'C', 'D', 'E', 'F', 'G']
         """
-        newcurrentstate = StonehengeState(self.sidelength, self.p1_turn)
-        newcurrentstate.board.horizontal_leylines = \
-            self.board.horizontal_leylines[:]
-        newcurrentstate.board.left_diagonal_leylines = \
-            self.board.left_diagonal_leylines[:]
-        newcurrentstate.board.right_diagonal_leylines = \
-            self.board.right_diagonal_leylines[:]
-        newcurrentstate.board.leyline_tracker = \
-            self.board.leyline_tracker[:]
-        for leyline in newcurrentstate.board.horizontal_leylines:
-            for cell in leyline.cell_list:
-                if cell.id == move:
-                    cell.id = 1 if newcurrentstate.p1_turn is True else 2
-        for l_leylines in newcurrentstate.board.left_diagonal_leylines:
-            for cells in l_leylines.cell_list:
-                if cells.id == move:
-                    cells.id = 1 if newcurrentstate.p1_turn is True else 2
-        for r_leylines in newcurrentstate.board.right_diagonal_leylines:
-            for cells_d in r_leylines.cell_list:
-                if cells_d.id == move:
-                    cells_d.id = 1 if newcurrentstate.p1_turn is True else 2
-        for leylines in newcurrentstate.board.leyline_tracker:
-            newcurrentstate.leyline_head_changer(leylines)
-        if self.p1_turn is True:
-            newcurrentstate.p1_turn = False
-        else:
-            newcurrentstate.p1_turn = True
-        return newcurrentstate
+        if DEBUG_IMMUTABLE:
+            self.check_unchanged()
+        topology = self.topology
+        board = self.board.copy()
+        zobrist = self.zobrist ^ topology.turn_key
+        leyline_counts = self.leyline_counts
+        empty_cells = self.empty_cells
+        cell = topology.indices.get(move)
+        if cell is not None:
+            positions = topology.cell_positions[cell]
+            first, position = positions[0]
+            # A claimed cell's letter has been replaced with its owner.
+            if board.leyline_tracker[first].cell_list[position].id == move:
+                player = 1 if self.p1_turn else 2
+                claimed = Cell(player)
+                zobrist ^= topology.cell_keys[cell][player]
+                empty_cells = tuple(label for label in empty_cells
+                                    if label != move)
+                for leyline, position in positions:
+                    old = board.leyline_tracker[leyline]
+                    new = old.claim(position, claimed)
+                    board.replace(leyline, new)
+                    if new.head != old.head:
+                        zobrist ^= topology.head_keys[leyline][player]
+                        leyline_counts = leyline_counts.copy()
+                        leyline_counts[player] += 1
+        return StonehengeState(self.sidelength, not self.p1_turn, board,
+                               zobrist, leyline_counts, empty_cells)
+
+    def board_zobrist(self) -> int:
+        """Returns the Zobrist hash of the current state, computed from the
+        whole board rather than from the move that led to it.
+        """
+        topology = self.topology
+        zobrist = topology.empty_key
+        if self.p1_turn:
+            zobrist ^= topology.turn_key
+        cells = [cell.id for leyline in self.board.horizontal_leylines
+                 for cell in leyline.cell_list]
+        for cell, identity in enumerate(cells):
+            if identity in (1, 2):
+                zobrist ^= topology.cell_keys[cell][identity]
+        for leyline, line in enumerate(self.board.leyline_tracker):
+            if line.head in (1, 2):
+                zobrist ^= topology.head_keys[leyline][line.head]
+        return zobrist
+
+    def check_unchanged(self) -> None:
+        """Raises a RuntimeError if this state has changed since it was made.
+
+        States only remember how they were made while DEBUG_IMMUTABLE is
+        True, so this does nothing for states made before then.
+        """
+        snapshot = getattr(self, '_snapshot', None)
+        if snapshot is not None and snapshot != self.state_key():
+            raise RuntimeError("A StonehengeState was changed after it was "
+                               "made; states share their leylines with the "
+                               "states made from them, so they must never "
+                               "be changed.")
 
     def rough_outcome(self: 'StonehengeState') -> int:
         """Returns the probability of winning from a current state.
@@ -679,8 +865,7 @@ class StonehengeState(GameState):
         masterlist = []
         for g in self.get_possible_moves():
             # check if the children are over
-            copy = deepcopy(self)
-            newstate = copy.make_move(g)
+            newstate = self.make_move(g)
             if newstate.get_possible_moves() == []:
                 if newstate.get_current_player_name() == currentplayer:
                     singlemovewinlist.append(-1)
@@ -690,8 +875,7 @@ class StonehengeState(GameState):
                 insidemovewinlist = []
                 for k in newstate.get_possible_moves():
                     # check if the grandchildren are over
-                    copycopy = deepcopy(newstate)
-                    lateststate = copycopy.make_move(k)
+                    lateststate = newstate.make_move(k)
                     if lateststate.get_possible_moves() == []:
                         if lateststate.get_current_player_name() == \
                                 currentplayer:
@@ -707,6 +891,130 @@ class StonehengeState(GameState):
             return min(newmasterlist)
         return 0
 
+    def evaluate(self) -> float:
+        """Returns an estimate strictly between LOSE and WIN of the outcome
+        for the current player, for a search that stops here.
+
+        Each claimed leyline counts as a whole point for its owner. Each
+        unclaimed leyline counts as the difference between the players'
+        shares of the cells needed to claim it, at half weight. The
+        current player's margin, relative to the number of leylines needed
+        to win, is then squashed into (-1, 1).
+
+        >>> StonehengeState(2, True).evaluate()
+        0.0
+        >>> s = StonehengeState(2, True).make_move('A')
+        >>> s.evaluate() < 0 < s.make_move('G').evaluate() + 1
+        True
+        """
+        if self.is_over():
+            return self.LOSE
+        player, other = (1, 2) if self.p1_turn else (2, 1)
+        margin = self.leyline_counts[player] - self.leyline_counts[other]
+        for leyline in self.board.leyline_tracker:
+            if leyline.head == '@':
+                needed = (len(leyline.cell_list) + 1) // 2
+                margin += (leyline.counts[player]
+                           - leyline.counts[other]) / (2 * needed)
+        margin /= (len(self.topology.leylines) + 1) // 2
+        return margin / (1 + abs(margin))
+
+    def state_key(self) -> tuple:
+        """Returns a compact, hashable key for the current state: the side
+        length, whose turn it is, the owner or letter of every cell and the
+        head of every leyline.
+
+        The heads are needed as well as the cells, since a leyline stays with
+        whoever claimed it first even if the other player later reaches the
+        same number of cells on it.
+
+        >>> s = StonehengeState(1, True)
+        >>> s.state_key() == StonehengeState(1, True).state_key()
+        True
+        >>> s.state_key() == s.make_move('A').state_key()
+        False
+        """
+        cells = tuple(cell.id for leyline in self.board.horizontal_leylines
+                      for cell in leyline.cell_list)
+        heads = tuple(leyline.head for leyline in self.board.leyline_tracker)
+        return self.sidelength, self.p1_turn, cells, heads
+
+    def canonical_key(self) -> Tuple[tuple, Dict[str, str]]:
+        """Returns the smallest key of the current state over all the
+        symmetries of the board, so that states which are rotations or
+        reflections of each other share a key. Also returns a dict mapping
+        the letter of each cell in that orientation to the letter of the same
+        cell on this board, to translate moves back.
+
+        The key holds the side length, whose turn it is, and the owner of
+        every cell and leyline (0 if unclaimed), after moving them by the
+        symmetry.
+
+        >>> s = StonehengeState(2, True)
+        >>> key, to_original = s.make_move('A').canonical_key()
+        >>> key == s.make_move('G').canonical_key()[0]
+        True
+        >>> to_original == {'A': 'A', 'B': 'B', 'C': 'C', 'D': 'D', 'E': 'E',
+        ...                 'F': 'F', 'G': 'G'}
+        False
+        """
+        labels = self.topology.labels
+        cells = [cell.id if cell.id in (1, 2) else 0
+                 for leyline in self.board.horizontal_leylines
+                 for cell in leyline.cell_list]
+        heads = [leyline.head if leyline.head in (1, 2) else 0
+                 for leyline in self.board.leyline_tracker]
+        best = None
+        for cell_map, leyline_map in self.topology.symmetries:
+            moved_cells = [0] * len(cells)
+            for cell, owner in zip(cell_map, cells):
+                moved_cells[cell] = owner
+            moved_heads = [0] * len(heads)
+            for leyline, head in zip(leyline_map, heads):
+                moved_heads[leyline] = head
+            key = (tuple(moved_cells), tuple(moved_heads))
+            if best is None or key < best[0]:
+                best = key, cell_map
+        key, cell_map = best
+        to_original = {labels[moved]: labels[cell]
+                       for cell, moved in enumerate(cell_map)}
+        return (self.sidelength, self.p1_turn) + key, to_original
+
+    def __eq__(self, other: Any) -> bool:
+        """Returns True iff other is a StonehengeState with the same board
+        and the same player to move. States whose hashes differ are told
+        apart without comparing their boards.
+
+        >>> s = StonehengeState(2, True).make_move('A').make_move('B')
+        >>> s == StonehengeState(2, False).make_move('B').make_move('A')
+        False
+        >>> s == StonehengeState(2, True).make_move('A').make_move('B')
+        True
+        """
+        return (type(other) == type(self) and self.zobrist == other.zobrist
+                and self.state_key() == other.state_key())
+
+    def __hash__(self) -> int:
+        """Returns the Zobrist hash of the current state, which is the same in
+        every process.
+        """
+        return self.zobrist
+
+    def __reduce__(self) -> tuple:
+        """Returns how to pickle the current state: by its side length and
+        board, looking up the topology shared by boards of that size again
+        when it is unpickled rather than sending it along.
+
+        >>> import pickle
+        >>> s = StonehengeState(2, True).make_move('A')
+        >>> t = pickle.loads(pickle.dumps(s))
+        >>> t == s and t.topology is board_topology(2)
+        True
+        """
+        return (StonehengeState, (self.sidelength, self.p1_turn, self.board,
+                                  self.zobrist, self.leyline_counts,
+                                  self.empty_cells))
+
     def __repr__(self):
         """Represent the current state as a string with more
         information than a str method."""
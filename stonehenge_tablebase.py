@@ -0,0 +1,277 @@
+"""
+A retrograde endgame tablebase for small Stonehenge boards.
+
+The generator enumerates every position reachable on a board, from either
+player moving first, one layer at a time: layer k holds the positions with k
+claimed cells. It then labels the positions from the last layer back to the
+first: a finished game is lost for the player to move, and any other position
+is won iff some move leads to a lost position in the next layer.
+
+Each layer is saved to a checkpoint directory as soon as it is finished, so a
+generator that is stopped picks up where it left off when it is run again.
+The finished tablebase is a keyed position table, holding the sorted keys of
+all positions and a bit per position saying whether it is won for the player
+to move.
+
+A position's key packs its claimed cells and leylines into one 64-bit
+integer, which is only wide enough for boards of side length 1 to 3. Side
+length 4 would need 67 bits and some hundreds of millions of positions,
+which is out of reach of a pure-Python generator.
+"""
+import os
+from typing import Any, Callable, List, Optional
+import numpy as np
+from position_table import TABLE_DIR, PositionTable, table_path, write_table
+from stonehenge_bitboard import StonehengeBitboardState, leyline_table
+
+MAX_SIDE = 3
+
+
+def tablebase_path(side: int) -> str:
+    """Return the default path of the tablebase for side length side."""
+    return table_path('stonehenge_{}'.format(side))
+
+
+def position_key(state: StonehengeBitboardState) -> int:
+    """Return the key of state in a tablebase: its cells and leylines
+    claimed by p1, then those claimed by p2, then whose turn it is.
+
+    >>> position_key(StonehengeBitboardState(1, False))
+    0
+    >>> bin(position_key(StonehengeBitboardState(1, True).make_move('B')))
+    '0b101001000010'
+    """
+    table = leyline_table(state.sidelength)
+    cells, leylines = len(table.labels), len(table.masks)
+    key = state.p1_cells | state.p2_cells << cells
+    key |= state.p1_leylines << 2 * cells
+    key |= state.p2_leylines << 2 * cells + leylines
+    return key | int(state.p1_turn) << 2 * (cells + leylines)
+
+
+def position_from_key(side: int, key: int) -> StonehengeBitboardState:
+    """Return the position of a board of side length side with key key.
+
+    >>> s = StonehengeBitboardState(2, False).make_move('C')
+    >>> position_from_key(2, position_key(s)) == s
+    True
+    """
+    table = leyline_table(side)
+    cells, leylines = len(table.labels), len(table.masks)
+    cell_mask, leyline_mask = (1 << cells) - 1, (1 << leylines) - 1
+    return StonehengeBitboardState(
+        side, bool(key >> 2 * (cells + leylines)), key & cell_mask,
+        key >> cells & cell_mask, key >> 2 * cells & leyline_mask,
+        key >> 2 * cells + leylines & leyline_mask)
+
+
+def _check_side(side: int) -> None:
+    """Raise ValueError if there can be no tablebase for side length side."""
+    if not 1 <= side <= MAX_SIDE:
+        raise ValueError("Tablebases only cover side lengths 1 to {}".format(
+            MAX_SIDE))
+
+
+def _save(path: str, array: np.ndarray) -> None:
+    """Save array to path, so that path is never left half written."""
+    with open(path + '.tmp', 'wb') as file:
+        np.save(file, array)
+    os.replace(path + '.tmp', path)
+
+
+def generate(side: int, path: str = None, work_dir: str = None,
+             report: Callable[[str], Any] = print) -> str:
+    """Build the tablebase for side length side, write it to path, and
+    return path.
+
+    Finished layers are kept in work_dir, which defaults to path with
+    '.partial' added, and are reused if the generator is run again; work_dir
+    is removed once the tablebase is written. Progress messages are passed
+    to report.
+    """
+    _check_side(side)
+    path = tablebase_path(side) if path is None else path
+    work_dir = path + '.partial' if work_dir is None else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+    layers = _enumerate_layers(side, work_dir, report)
+    wins = _label_layers(side, layers, work_dir, report)
+
+    keys = np.concatenate(layers)
+    won = np.concatenate(wins)
+    order = np.argsort(keys)
+    write_table(path, won[order], keys[order], 1,
+                {'game': 'stonehenge', 'side': side})
+    for name in os.listdir(work_dir):
+        os.remove(os.path.join(work_dir, name))
+    os.rmdir(work_dir)
+    report("side {}: wrote {} positions to {}".format(side, len(keys), path))
+    return path
+
+
+def _enumerate_layers(side: int, work_dir: str,
+                      report: Callable[[str], Any]) -> List[np.ndarray]:
+    """Return the sorted keys of the positions of each layer, loading the
+    layers already in work_dir and saving the others there.
+    """
+    layers = []
+    cells = len(leyline_table(side).labels)
+    for layer in range(cells + 1):
+        layer_path = os.path.join(work_dir, 'keys_{}.npy'.format(layer))
+        if os.path.exists(layer_path):
+            layers.append(np.load(layer_path))
+            continue
+        if layer == 0:
+            keys = {position_key(StonehengeBitboardState(side, turn))
+                    for turn in (True, False)}
+        else:
+            keys = set()
+            for key in layers[-1].tolist():
+                state = position_from_key(side, key)
+                if not state.is_over():
+                    keys.update(position_key(state.make_move(move))
+                                for move in state.get_possible_moves())
+        layers.append(np.array(sorted(keys), dtype=np.uint64))
+        _save(layer_path, layers[-1])
+        report("side {}: layer {} has {} positions".format(
+            side, layer, len(keys)))
+    return layers
+
+
+def _label_layers(side: int, layers: List[np.ndarray], work_dir: str,
+                  report: Callable[[str], Any]) -> List[np.ndarray]:
+    """Return, for each layer, whether each of its positions is won for the
+    player to move, loading the labels already in work_dir and saving the
+    others there.
+    """
+    wins = [None] * len(layers)
+    for layer in range(len(layers) - 1, -1, -1):
+        layer_path = os.path.join(work_dir, 'wins_{}.npy'.format(layer))
+        if os.path.exists(layer_path):
+            wins[layer] = np.load(layer_path)
+            continue
+        won = np.zeros(len(layers[layer]), dtype=bool)
+        for i, key in enumerate(layers[layer].tolist()):
+            state = position_from_key(side, key)
+            if state.is_over():
+                continue
+            children = np.array(
+                [position_key(state.make_move(move))
+                 for move in state.get_possible_moves()], dtype=np.uint64)
+            indices = np.searchsorted(layers[layer + 1], children)
+            won[i] = not wins[layer + 1][indices].all()
+        wins[layer] = won
+        _save(layer_path, won)
+        report("side {}: layer {} has {} won positions".format(
+            side, layer, int(won.sum())))
+    return wins
+
+
+class Tablebase:
+    """A tablebase mapped into memory from a position table file.
+
+    ========Attributes========
+    side: the side length of the board the tablebase covers
+    table: the position table holding the tablebase
+    """
+    side: int
+    table: PositionTable
+
+    def __init__(self, path: str) -> None:
+        """Map the tablebase in the file path into memory."""
+        self.table = PositionTable(path)
+        if self.table.metadata.get('game') != 'stonehenge':
+            self.table.close()
+            raise ValueError("{} is not a Stonehenge tablebase".format(
+                path))
+        self.side = self.table.metadata['side']
+
+    def __len__(self) -> int:
+        """Return the number of positions in this tablebase."""
+        return len(self.table)
+
+    def is_win(self, state: Any) -> Optional[bool]:
+        """Return whether the player to move in state can force a win, or
+        None if state is not in this tablebase. state is a StonehengeState
+        or a StonehengeBitboardState.
+        """
+        if not isinstance(state, StonehengeBitboardState):
+            state = StonehengeBitboardState.from_state(state)
+        if state.sidelength != self.side:
+            return None
+        won = self.table.get(position_key(state))
+        return None if won is None else bool(won)
+
+
+# The tablebases opened by tablebase_strategy, by side length. Only tables
+# that exist are kept, so that one generated later is still found.
+_open_tablebases = {}
+
+
+def open_tablebase(side: int) -> Optional[Tablebase]:
+    """Return the tablebase for side length side in TABLE_DIR, mapping it
+    the first time it is found, or None if it has not been generated yet.
+    """
+    if side not in _open_tablebases:
+        path = tablebase_path(side)
+        if not os.path.exists(path):
+            return None
+        _open_tablebases[side] = Tablebase(path)
+    return _open_tablebases[side]
+
+
+def tablebase_move(tablebase: Tablebase, state: Any) -> Any:
+    """Return the move minimax would choose from state, looking up the value
+    of every move in tablebase.
+
+    As in the minimax strategies, this is the largest move that ends the game
+    at once if there is one, and otherwise the largest of the moves leading
+    to a lost position for the other player, or the largest move if there
+    are none.
+    """
+    moves = state.get_possible_moves()
+    children = [(move, state.make_move(move)) for move in moves]
+    finishing = [move for move, child in children if child.is_over()]
+    if finishing:
+        return max(finishing)
+    winning = [move for move, child in children
+               if tablebase.is_win(child) is False]
+    return max(winning) if winning else max(moves)
+
+
+def tablebase_strategy(game: 'Game') -> Any:
+    """A strategy that plays as minimax does by looking up every move in the
+    tablebase for the board, falling back on iterative deepening if there is
+    no tablebase for it.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :return: The move minimax would choose
+    :rtype: Any
+    """
+    state = game.current_state
+    tablebase = open_tablebase(state.sidelength)
+    if tablebase is None:
+        from strategy import iterative_deepening_minimax
+        return iterative_deepening_minimax(game)
+    return tablebase_move(tablebase, state)
+
+
+def main(argv: List[str] = None) -> None:
+    """Generate the tablebases for the side lengths given on the command
+    line, or for every side length from 1 to MAX_SIDE.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Generate Stonehenge endgame tablebases.")
+    parser.add_argument('sides', nargs='*', type=int,
+                        default=list(range(1, MAX_SIDE + 1)))
+    parser.add_argument('--dir', default=TABLE_DIR,
+                        help="the directory to write the tablebases to")
+    args = parser.parse_args(argv)
+    for side in args.sides:
+        generate(side, os.path.join(args.dir,
+                                    'stonehenge_{}.tbl'.format(side)))
+
+
+if __name__ == "__main__":
+    main()
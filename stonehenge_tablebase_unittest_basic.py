@@ -0,0 +1,106 @@
+"""
+A subset of unittests for the Stonehenge endgame tablebase.
+
+These unittests build small tablebases in a temporary directory, and check
+that they agree with minimax and that an interrupted generator can pick up
+where it left off.
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import stonehenge_tablebase
+from game_interface import playable_games, usable_strategies
+from stonehenge_state import StonehengeState
+from stonehenge_tablebase import Tablebase, generate, tablebase_move
+from transposition_table import TranspositionTable
+
+StonehengeGame = playable_games['h']
+memoized_recursive_strategy = usable_strategies['tr']
+
+
+class StonehengeTablebaseUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'stonehenge_2.tbl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_tablebase_moves_match_minimax(self):
+        """
+        Test that the moves looked up in a side length 2 tablebase are the
+        moves minimax chooses, along games with either player first.
+        """
+        tablebase = Tablebase(generate(2, self.path, report=lambda _: None))
+        for first in ('y', 'n'):
+            with patch('builtins.input', return_value='2'):
+                game = StonehengeGame(first == 'y')
+            moves = 0
+            while game.current_state.get_possible_moves():
+                self.assertEqual(
+                    tablebase_move(tablebase, game.current_state),
+                    memoized_recursive_strategy(game, TranspositionTable()))
+                possible = game.current_state.get_possible_moves()
+                game.current_state = game.current_state.make_move(
+                    possible[moves % len(possible)])
+                moves += 1
+
+    def test_tablebase_covers_every_position(self):
+        """
+        Test that every position reached in a game is in the tablebase, and
+        that a position from another board is not.
+        """
+        tablebase = Tablebase(generate(2, self.path, report=lambda _: None))
+        state = StonehengeState(2, False)
+        while True:
+            self.assertIsNotNone(tablebase.is_win(state))
+            if state.is_over():
+                break
+            state = state.make_move(state.get_possible_moves()[-1])
+        self.assertIsNone(tablebase.is_win(StonehengeState(1, True)))
+
+    def test_tablebase_generated_later_is_opened(self):
+        """
+        Test that a tablebase missing when first looked for is opened once it
+        has been generated.
+        """
+        with patch('stonehenge_tablebase.tablebase_path',
+                   return_value=self.path), \
+                patch.dict(stonehenge_tablebase._open_tablebases, clear=True):
+            self.assertIsNone(stonehenge_tablebase.open_tablebase(2))
+            generate(2, self.path, report=lambda _: None)
+            tablebase = stonehenge_tablebase.open_tablebase(2)
+            self.assertIsNotNone(tablebase)
+            self.assertIs(stonehenge_tablebase.open_tablebase(2), tablebase)
+
+    def test_interrupted_generator_resumes(self):
+        """
+        Test that a generator stopped part way through reuses its finished
+        layers when run again, and writes the same tablebase as a generator
+        that was never stopped.
+        """
+        messages = []
+
+        def stop_after_five(message):
+            messages.append(message)
+            if len(messages) == 5:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            generate(2, self.path, report=stop_after_five)
+        self.assertFalse(os.path.exists(self.path))
+
+        resumed = []
+        generate(2, self.path, report=resumed.append)
+        self.assertFalse(any('layer 0 has' in message and 'won' not in message
+                             for message in resumed))
+        fresh = os.path.join(self.directory.name, 'fresh.tbl')
+        generate(2, fresh, report=lambda _: None)
+        with open(self.path, 'rb') as first, open(fresh, 'rb') as second:
+            self.assertEqual(first.read(), second.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
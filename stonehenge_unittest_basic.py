@@ -16,6 +16,7 @@ from unittest.mock import patch
 
 # Import the student solution
 from game_interface import playable_games
+import stonehenge_state
 
 StonehengeGame = playable_games['h']
 
@@ -736,5 +737,240 @@ class StonehengeUnitTests(unittest.TestCase):
                           "instead.").format(ro))
 
 
+class StonehengeLargeBoardUnitTests(unittest.TestCase):
+    extract_stonehenge_values = StonehengeUnitTests.extract_stonehenge_values
+
+    def test_generic_board_layout_matches_small_boards(self):
+        """
+        Test that the grid drawn for any side length has the same ley-lines
+        and cells, in the same places, as the hand-drawn grids of side
+        lengths 1 to 5.
+        """
+        for side in range(1, 6):
+            with patch('builtins.input', return_value=str(side)):
+                game = StonehengeGame(True)
+            state = game.current_state
+            for move in state.get_possible_moves()[::3]:
+                state = state.make_move(move)
+            self.assertEqual(
+                self.extract_stonehenge_values(
+                    board=state.string_creator_any()),
+                self.extract_stonehenge_values(state))
+
+    def test_stonehenge_side_6_to_8(self):
+        """
+        Test that boards with side lengths 6 to 8 can be created, drawn and
+        played to the end.
+        """
+        for side in range(6, 9):
+            with patch('builtins.input', return_value=str(side)):
+                game = StonehengeGame(True)
+            cells_count = (side + 1) * (side + 2) // 2 + side - 1
+            ley_lines, cells = self.extract_stonehenge_values(
+                game.current_state)
+            self.assertEqual(ley_lines, ['@'] * 3 * (side + 1))
+            self.assertEqual(len(cells), cells_count)
+            self.assertEqual(len(game.current_state.get_possible_moves()),
+                             cells_count)
+
+            while not game.is_over(game.current_state):
+                game.current_state = game.current_state.make_move(
+                    game.current_state.get_possible_moves()[-1])
+            self.assertTrue(game.is_winner('p1') != game.is_winner('p2'))
+
+
+class StonehengeImmutableUnitTests(unittest.TestCase):
+    def test_make_move_shares_unchanged_leylines(self):
+        """
+        Test that make_move() leaves the original state as it was and that the
+        new state only replaces the three leylines through the claimed cell.
+        """
+        state = stonehenge_state.StonehengeState(3, True)
+        before = state.state_key()
+        new_state = state.make_move('G')
+
+        self.assertEqual(state.state_key(), before)
+        replaced = [old is not new for old, new in
+                    zip(state.board.leyline_tracker,
+                        new_state.board.leyline_tracker)]
+        self.assertEqual(replaced.count(True), 3)
+
+    def test_debug_mode_detects_mutation(self):
+        """
+        Test that, in debug mode, making a move from a state that has been
+        changed in place raises an error.
+        """
+        with patch.object(stonehenge_state, 'DEBUG_IMMUTABLE', True):
+            state = stonehenge_state.StonehengeState(2, True)
+            child = state.make_move('A')
+            child.make_move('B')
+
+            state.board.leyline_tracker[0].head = 2
+            with self.assertRaises(RuntimeError):
+                state.make_move('C')
+
+
+class StonehengeHashUnitTests(unittest.TestCase):
+    def test_transposed_states_are_equal(self):
+        """
+        Test that states reached by different move orders are equal, hash the
+        same, and can be used as the same dict key.
+        """
+        state = stonehenge_state.StonehengeState(3, True)
+        first = state.make_move('A').make_move('L').make_move('F')
+        second = state.make_move('F').make_move('L').make_move('A')
+
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len({first: 1, second: 2}), 1)
+        self.assertNotEqual(first, state.make_move('A').make_move('F')
+                            .make_move('L'))
+
+    def test_incremental_hash_matches_board(self):
+        """
+        Test that the hash updated by make_move() matches the hash computed
+        from the whole board, along a whole game.
+        """
+        state = stonehenge_state.StonehengeState(4, False)
+        while state.get_possible_moves():
+            self.assertEqual(state.zobrist, state.board_zobrist())
+            state = state.make_move(state.get_possible_moves()[len(
+                state.get_possible_moves()) // 2])
+        self.assertEqual(state.zobrist, state.board_zobrist())
+
+    def test_hash_stable_across_processes(self):
+        """
+        Test that a state hashes the same in another process, even with a
+        different string hashing seed.
+        """
+        import os
+        import subprocess
+        import sys
+        code = ("from stonehenge_state import StonehengeState;"
+                "print(StonehengeState(2, True).make_move('D').zobrist)")
+        output = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True,
+            env=dict(os.environ, PYTHONHASHSEED='123'),
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        self.assertEqual(
+            int(output.stdout),
+            stonehenge_state.StonehengeState(2, True).make_move('D').zobrist)
+
+    def test_pickle_leaves_out_topology(self):
+        """
+        Test that a pickled state round-trips, and shares the topology of its
+        side length again rather than carrying its own copy.
+        """
+        import pickle
+        state = stonehenge_state.StonehengeState(4, True)
+        for move in ['A', 'K', 'R']:
+            state = state.make_move(move)
+        copy = pickle.loads(pickle.dumps(state))
+
+        self.assertEqual(copy, state)
+        self.assertEqual(copy.p1_turn, state.p1_turn)
+        self.assertEqual(copy.empty_cells, state.empty_cells)
+        self.assertEqual(copy.leyline_counts, state.leyline_counts)
+        self.assertIs(copy.topology, stonehenge_state.board_topology(4))
+        self.assertNotIn(b'BoardTopology', pickle.dumps(state))
+
+
+class StonehengeSymmetryUnitTests(unittest.TestCase):
+    def test_symmetric_games_share_canonical_key(self):
+        """
+        Test that playing a game and its image under every symmetry of the
+        board gives states with the same canonical key, and that the move
+        mapping translates canonical moves back to legal moves.
+        """
+        for side in range(1, 6):
+            topology = stonehenge_state.board_topology(side)
+            labels = topology.labels
+            moves = labels[::2]
+            for cell_map, _ in topology.symmetries:
+                state = stonehenge_state.StonehengeState(side, True)
+                image = stonehenge_state.StonehengeState(side, True)
+                for move in moves:
+                    if not state.get_possible_moves():
+                        break
+                    state = state.make_move(move)
+                    image = image.make_move(
+                        labels[cell_map[labels.index(move)]])
+                    key, to_original = state.canonical_key()
+                    image_key, image_to_original = image.canonical_key()
+                    self.assertEqual(image_key, key)
+                    if not state.get_possible_moves():
+                        continue
+                    # The same canonical move on either board must lead to
+                    # symmetric states again.
+                    canonical_move = next(
+                        label for label in labels
+                        if to_original[label] in state.get_possible_moves())
+                    self.assertEqual(
+                        state.make_move(
+                            to_original[canonical_move]).canonical_key()[0],
+                        image.make_move(image_to_original[
+                            canonical_move]).canonical_key()[0])
+
+
+class StonehengeClaimCountUnitTests(unittest.TestCase):
+    def test_cached_counts_match_board(self):
+        """
+        Test that the leyline counts and empty cells carried from move to
+        move match those counted on the board from scratch.
+        """
+        for side in range(1, 6):
+            state = stonehenge_state.StonehengeState(side, True)
+            while not state.is_over():
+                move = state.get_possible_moves()[len(
+                    state.get_possible_moves()) // 3]
+                state = state.make_move(move)
+                fresh = stonehenge_state.StonehengeState(
+                    side, state.p1_turn, state.board)
+                self.assertEqual(fresh.leyline_counts, state.leyline_counts)
+                self.assertEqual(fresh.empty_cells, state.empty_cells)
+            self.assertEqual([], state.get_possible_moves())
+            self.assertIn(state.winner(), ('p1', 'p2', None))
+
+    @patch('builtins.input', side_effect=['1'])
+    def test_winner_and_is_over_agree_with_game(self, input_function):
+        """
+        Test that the game reports the same end and winner as the state.
+        """
+        game = StonehengeGame(True)
+        self.assertFalse(game.is_over(game.current_state))
+        self.assertFalse(game.is_winner('p1'))
+        game.current_state = game.current_state.make_move('A')
+        self.assertTrue(game.is_over(game.current_state))
+        self.assertTrue(game.is_winner('p1'))
+        self.assertFalse(game.is_winner('p2'))
+        self.assertFalse(game.current_state.is_valid_move('B'))
+
+
+class StonehengeEvaluateUnitTests(unittest.TestCase):
+    def test_evaluate_is_graded_and_antisymmetric(self):
+        """
+        Test that evaluate stays strictly between LOSE and WIN before the
+        game ends, and scores the same position oppositely for each player.
+        """
+        state = stonehenge_state.StonehengeState(3, True)
+        for move in ['A', 'E', 'B', 'H']:
+            state = state.make_move(move)
+            score = state.evaluate()
+            self.assertTrue(state.LOSE < score < state.WIN)
+            other = stonehenge_state.StonehengeState(
+                3, not state.p1_turn, state.board)
+            self.assertAlmostEqual(other.evaluate(), -score)
+
+    def test_evaluate_favours_claimed_leylines(self):
+        """
+        Test that a player who has claimed more leylines scores higher.
+        """
+        state = stonehenge_state.StonehengeState(3, True).make_move('A')
+        self.assertLess(state.evaluate(), 0)
+        self.assertEqual(state.LOSE,
+                         stonehenge_state.StonehengeState(1, True).make_move(
+                             'A').evaluate())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -5,8 +5,17 @@ NOTE: Make sure this file adheres to python-ta.
 Adjust the type annotations as needed, and implement both a recursive
 and an iterative version of minimax.
 """
-from typing import Any
-from copy import deepcopy
+import math
+from time import monotonic
+from typing import Any, Dict, List, Tuple
+from transposition_table import TranspositionTable
+
+# The number of seconds iterative_deepening_minimax spends on a move unless
+# it is given another budget.
+DEFAULT_BUDGET = 1.0
+# The number of moves depth_limited_minimax looks ahead unless it is given
+# another depth.
+DEFAULT_DEPTH = 4
 
 
 def interactive_strategy(game: 'Game') -> Any:
@@ -17,14 +26,28 @@ def interactive_strategy(game: 'Game') -> Any:
     return game.str_to_move(move)
 
 
+def winning_move_now(state: 'GameState') -> Any:
+    """Return the largest move that ends the game at once, leaving the other
+    player with no moves, or None if there is no such move.
+
+    Every winning move scores the same under minimax, so the minimax
+    strategies take one of these first rather than a win further away.
+    """
+    finishing = [move for move in state.get_possible_moves()
+                 if state.make_move(move).is_over()]
+    return max(finishing) if finishing else None
+
+
 def recursive_minimax(newgame: 'Game') -> Any:
     """Returns a move that maximizes the chance of computer winning
     and minimizes the change of making a losing move."""
+    winning_move = winning_move_now(newgame.current_state)
+    if winning_move is not None:
+        return winning_move
     result = []
     g = {}
     for moves in newgame.current_state.get_possible_moves():
-        copy = deepcopy(newgame.current_state)
-        newtstate = copy.make_move(moves)
+        newtstate = newgame.current_state.make_move(moves)
         result.append(newtstate)
     finallist = [newfunction(a) for a in result]
     mini = min(finallist)
@@ -96,24 +119,6 @@ def rough_outcome_strategy(game: Any) -> Any:
     return best_move
 
 
-class Node:
-    """A class representing nodes, which link together to form trees.
-    ========Attributes========
-    Node.cargo = The cargo contained in the node
-    Node.children = children of the node
-    Node.score = the assigned score to the node
-    """
-
-    def __init__(self, cargo) -> None:
-        """Initializes a node."""
-        self.cargo = cargo
-        self.children = None
-        self.score = None
-
-    def __str__(self) -> str:
-        return "Cargo: {} -- Score: {} -- Children: {}".format(self.cargo, self.score, self.children)
-
-
 class Stack:
     """ Last-in, first-out (LIFO) stack.
 
@@ -166,6 +171,38 @@ class Stack:
         return len(self._contains) == 0
 
 
+def _iterative_minimax_score(state: 'GameState') -> int:
+    """Return the score the current player of state can guarantee, searching
+    with an explicit stack of frames instead of recursion.
+
+    A frame only holds a state, its moves, the index of the next move to
+    search and the best score found so far, and is dropped as soon as all of
+    its moves are searched, so the stack never holds more than one frame for
+    each move between state and the end of the game.
+    """
+    # Each frame is [state, moves, index of the next move to search, best
+    # score so far].
+    stack = Stack()
+    stack.add([state, state.get_possible_moves(), 0, state.LOSE])
+    result = None
+    while not stack.is_empty():
+        frame = stack.remove()
+        if result is not None:
+            frame[3] = max(frame[3], -result)
+            result = None
+
+        if frame[2] == len(frame[1]):
+            # A finished game, with no moves, is lost for the player to move.
+            result = frame[3]
+            continue
+
+        child = frame[0].make_move(frame[1][frame[2]])
+        frame[2] += 1
+        stack.add(frame)
+        stack.add([child, child.get_possible_moves(), 0, child.LOSE])
+    return result
+
+
 def iterative_minimax(game: 'Game') -> Any:
     """An iterative minimax strategy that returns a move that
      maximizes the computer's chance of winning.
@@ -176,57 +213,428 @@ def iterative_minimax(game: 'Game') -> Any:
     :rtype: Any
     """
     current_state = game.current_state
-    current_player = 'p1' if game.current_state.p1_turn else 'p2'
-    other = 'p2' if game.current_state.p1_turn else 'p1'
-    node = Node(current_state)
-    stack = Stack()
-    stack.add(node)
-    dictionary = {}
+    winning_move = winning_move_now(current_state)
+    if winning_move is not None:
+        return winning_move
+    return _best_move([
+        (move, -_iterative_minimax_score(current_state.make_move(move)))
+        for move in current_state.get_possible_moves()])
 
-    while not stack.is_empty():
-        popped_node = stack.remove()
-        node_cs = popped_node.cargo
-        if len(node_cs.get_possible_moves()) == 0:
-            if node_cs.get_current_player_name() == current_player:
-                popped_node.score = 1
-            elif node_cs.get_current_player_name() == other:
-                popped_node.score = 1
-            else:
-                popped_node.score = 0
+
+# The table shared by the memoizing strategies when none is given, so that
+# positions solved for one move are still known when choosing the next.
+minimax_table = TranspositionTable()
+
+
+def _best_move(scored_moves: List[Tuple[Any, int]]) -> Any:
+    """Return the largest move among the moves with the highest score in
+    scored_moves, a list of (move, score) pairs, to break ties the same way
+    as recursive_minimax and iterative_minimax once winning_move_now has
+    found nothing.
+
+    >>> _best_move([(1, -1), (4, 1), (9, -1), (16, 1)])
+    16
+    """
+    best_score = max(score for _, score in scored_moves)
+    return max(move for move, score in scored_moves if score == best_score)
+
+
+def table_key(state: 'GameState', symmetric: bool = False) -> Any:
+    """Return the key under which state is stored in a transposition table.
+
+    If symmetric is True and state has a canonical_key, return that instead
+    of its state_key, so that positions which are rotations or reflections
+    of each other share one entry.
+    """
+    if symmetric and hasattr(state, 'canonical_key'):
+        return state.canonical_key()[0]
+    return state.state_key()
+
+
+def _memoized_score(state: 'GameState', table: TranspositionTable,
+                    symmetric: bool) -> Tuple[int, int]:
+    """Return the score the current player of state can guarantee, along
+    with the number of positions searched to find it.
+
+    Each solved position is stored in table under table_key(state,
+    symmetric), with the size of its search as its depth, before returning.
+    """
+    key = table_key(state, symmetric)
+    score = table.lookup(key)
+    if score is not None:
+        return score, 1
+
+    score, searched = state.LOSE, 1
+    for move in state.get_possible_moves():
+        child_score, child_searched = _memoized_score(state.make_move(move),
+                                                      table, symmetric)
+        score = max(score, -child_score)
+        searched += child_searched
+    table.store(key, score, searched)
+    return score, searched
+
+
+def memoized_minimax(game: 'Game', table: TranspositionTable = None,
+                     symmetric: bool = False) -> Any:
+    """A recursive minimax strategy that remembers the score of every
+    position it solves in a transposition table, so a position reached by
+    different move orders is only searched once.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :param table: The transposition table to use, or None for the table
+                  shared between moves, minimax_table
+    :type table: TranspositionTable
+    :param symmetric: Whether to store symmetric positions as one entry
+    :type symmetric: bool
+    :return: The largest of the moves that maximize the computer's score
+    :rtype: Any
+    """
+    table = minimax_table if table is None else table
+    state = game.current_state
+    winning_move = winning_move_now(state)
+    if winning_move is not None:
+        return winning_move
+    return _best_move([
+        (move, -_memoized_score(state.make_move(move), table, symmetric)[0])
+        for move in state.get_possible_moves()])
+
+
+def _iterative_memoized_score(state: 'GameState', table: TranspositionTable,
+                              symmetric: bool) -> int:
+    """Return the score the current player of state can guarantee, searching
+    with an explicit stack instead of recursion, and storing every solved
+    position in table under table_key(state, symmetric) with the size of its
+    search as its depth.
+    """
+    key = table_key(state, symmetric)
+    score = table.lookup(key)
+    if score is not None:
+        return score
+
+    # Each frame is [state, key, moves, index of the next move to search,
+    # best score so far, positions searched so far].
+    stack = [[state, key, state.get_possible_moves(), 0,
+              state.LOSE, 1]]
+    result = None
+    while stack:
+        frame = stack[-1]
+        if result is not None:
+            frame[4] = max(frame[4], -result[0])
+            frame[5] += result[1]
+            result = None
+
+        if frame[3] == len(frame[2]):
+            stack.pop()
+            table.store(frame[1], frame[4], frame[5])
+            result = (frame[4], frame[5])
+            continue
+
+        child = frame[0].make_move(frame[2][frame[3]])
+        frame[3] += 1
+        key = table_key(child, symmetric)
+        score = table.lookup(key)
+        if score is not None:
+            result = (score, 1)
         else:
-            if popped_node.children is None:
-                # means we have not looked at this node yet.
-                childrenslist = []
-                for moves in popped_node.cargo.get_possible_moves():
-                    copy = deepcopy(popped_node.cargo)
-                    newstate = copy.make_move(moves)
-                    newnode = Node(newstate)
-                    childrenslist.append(newnode)
-                popped_node.children = childrenslist
-                stack.add(popped_node)
-                for c in childrenslist:
-                    stack.add(c)
+            stack.append([child, key, child.get_possible_moves(), 0,
+                          child.LOSE, 1])
+    return result[0]
 
-            else:
-                # means this node has already been looked at.
-                scorelist = []
-                for kids in popped_node.children:
-                    scorelist.append(kids.score * -1)
-                maximum = max(scorelist)
-                popped_node.score = maximum
-
-    childscores = []
-    for z in node.children:
-        childscores.append(z.score)
-    smallest = max(childscores)
-    for i in range(len(childscores)):
-        if childscores[i] == smallest:
-            if childscores[i] not in dictionary:
-                dictionary[childscores[i]] = []
-                dictionary[childscores[i]].append(node.cargo.get_possible_moves()[i])
-            else:
-                dictionary[childscores[i]].append(node.cargo.get_possible_moves()[i])
-    return max(dictionary[smallest])
+
+def iterative_memoized_minimax(game: 'Game',
+                               table: TranspositionTable = None,
+                               symmetric: bool = False) -> Any:
+    """An iterative minimax strategy that remembers the score of every
+    position it solves in a transposition table, so a position reached by
+    different move orders is only searched once.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :param table: The transposition table to use, or None for the table
+                  shared between moves, minimax_table
+    :type table: TranspositionTable
+    :param symmetric: Whether to store symmetric positions as one entry
+    :type symmetric: bool
+    :return: The largest of the moves that maximize the computer's score
+    :rtype: Any
+    """
+    table = minimax_table if table is None else table
+    state = game.current_state
+    winning_move = winning_move_now(state)
+    if winning_move is not None:
+        return winning_move
+    return _best_move([
+        (move, -_iterative_memoized_score(state.make_move(move), table,
+                                          symmetric))
+        for move in state.get_possible_moves()])
+
+
+def _alphabeta_score(state: 'GameState', alpha: int, beta: int) -> int:
+    """Return the score the current player of state can guarantee, if it
+    lies strictly between alpha and beta. Otherwise, return a bound on that
+    score: at most alpha, or at least beta.
+    """
+    moves = state.get_possible_moves()
+    best = state.LOSE
+    for move in moves:
+        score = -_alphabeta_score(state.make_move(move), -beta, -alpha)
+        if score > best:
+            best = score
+            alpha = max(alpha, best)
+            if alpha >= beta:
+                # The opponent will never allow this position, so the rest
+                # of its moves need not be searched.
+                break
+    return best
+
+
+def _alphabeta_root(state: 'GameState', score_child: Any) -> Any:
+    """Return the move from state chosen by winning_move_now, or else the
+    largest of the moves with the best score, given score_child(child,
+    alpha, beta), a function returning the alpha-beta score of a child
+    state.
+
+    The moves are tried from largest to smallest, so that a later move only
+    needs to be searched closely enough to show that it is no better than
+    the best move so far.
+    """
+    best_move = winning_move_now(state)
+    if best_move is not None:
+        return best_move
+    alpha = state.LOSE - 1
+    for move in sorted(state.get_possible_moves(), reverse=True):
+        score = -score_child(state.make_move(move), -state.WIN, -alpha)
+        if score > alpha:
+            best_move, alpha = move, score
+            if alpha >= state.WIN:
+                break
+    return best_move
+
+
+def alphabeta_minimax(game: 'Game') -> Any:
+    """A recursive minimax strategy with alpha-beta pruning, which stops
+    searching a position's moves as soon as one of them refutes it.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :return: The largest of the moves that maximize the computer's score
+    :rtype: Any
+    """
+    return _alphabeta_root(game.current_state, _alphabeta_score)
+
+
+def _iterative_alphabeta_score(state: 'GameState', alpha: int,
+                               beta: int) -> int:
+    """Return the same score or bound as _alphabeta_score, searching with an
+    explicit stack instead of recursion.
+    """
+    # Each frame is [state, moves, index of the next move to search, alpha,
+    # beta, best score so far].
+    stack = [[state, state.get_possible_moves(), 0, alpha, beta, state.LOSE]]
+    result = None
+    while stack:
+        frame = stack[-1]
+        if result is not None:
+            if -result > frame[5]:
+                frame[5] = -result
+                frame[3] = max(frame[3], frame[5])
+            result = None
+
+        if frame[3] >= frame[4] or frame[2] == len(frame[1]):
+            stack.pop()
+            result = frame[5]
+            continue
+
+        child = frame[0].make_move(frame[1][frame[2]])
+        frame[2] += 1
+        stack.append([child, child.get_possible_moves(), 0, -frame[4],
+                      -frame[3], child.LOSE])
+    return result
+
+
+def iterative_alphabeta_minimax(game: 'Game') -> Any:
+    """An iterative minimax strategy with alpha-beta pruning, which stops
+    searching a position's moves as soon as one of them refutes it.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :return: The largest of the moves that maximize the computer's score
+    :rtype: Any
+    """
+    return _alphabeta_root(game.current_state, _iterative_alphabeta_score)
+
+
+class _SearchTimeout(Exception):
+    """Raised inside a depth-limited search when its time budget runs out.
+    """
+
+
+class _DeepeningSearch:
+    """The state shared by the iterations of one iterative deepening search.
+
+    ========Attributes========
+    deadline: the time, by monotonic(), after which an iteration is abandoned,
+              or None if iterations are never abandoned
+    best_moves: the best move found at each position by the previous
+                iterations, keyed by state key, to be searched first
+    reached_horizon: whether the current iteration has stopped at its depth
+                     limit anywhere, so that its scores are only estimates
+    nodes: the number of positions searched so far
+    stopped: whether the search has been told to stop, abandoning the
+             current iteration whatever the deadline
+    """
+    deadline: Any
+    best_moves: TranspositionTable
+    reached_horizon: bool
+    nodes: int
+    stopped: bool
+
+    def __init__(self, deadline: Any) -> None:
+        """Initialize a search that is abandoned after deadline."""
+        self.deadline = deadline
+        self.best_moves = TranspositionTable()
+        self.reached_horizon = False
+        self.nodes = 0
+        self.stopped = False
+
+    def ordered_moves(self, state: 'GameState') -> List[Any]:
+        """Return the moves of state, with the best move found there by an
+        earlier iteration first.
+        """
+        moves = state.get_possible_moves()
+        best = self.best_moves.lookup(state.state_key())
+        if best is not None and best in moves:
+            moves.remove(best)
+            moves.insert(0, best)
+        return moves
+
+    def score(self, state: 'GameState', depth: int, alpha: int,
+              beta: int) -> int:
+        """Return the alpha-beta score of state searched depth moves deep,
+        scoring positions at the depth limit by their evaluate().
+        """
+        self.nodes += 1
+        if self.nodes % 64 == 0 and (
+                self.stopped or self.deadline is not None
+                and monotonic() > self.deadline):
+            raise _SearchTimeout()
+        if state.is_over():
+            return state.LOSE
+        if depth == 0:
+            self.reached_horizon = True
+            return state.evaluate()
+        best, best_move = state.LOSE - 1, None
+        for move in self.ordered_moves(state):
+            score = -self.score(state.make_move(move), depth - 1, -beta,
+                                -alpha)
+            if score > best:
+                best, best_move = score, move
+                alpha = max(alpha, best)
+                if alpha >= beta:
+                    break
+        self.best_moves.store(state.state_key(), best_move)
+        return best
+
+
+def iterative_deepening_minimax(game: 'Game',
+                                budget: float = DEFAULT_BUDGET,
+                                max_depth: int = None) -> Any:
+    """A minimax strategy that searches one move deeper at a time until it
+    runs out of time, and plays the best move of the deepest search it
+    finished.
+
+    Each search tries first the moves the one before it found best, so that
+    alpha-beta pruning cuts off more of it. A search that never reaches its
+    depth limit has solved the game, and the strategy stops there.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :param budget: The number of seconds to spend on the move, or None to
+                   search until the game is solved. The search of depth 1 is
+                   always finished, however long it takes.
+    :type budget: float
+    :param max_depth: The deepest search to try, or None for no limit
+    :type max_depth: int
+    :return: The largest of the moves with the best score in the deepest
+             finished search
+    :rtype: Any
+    """
+    state = game.current_state
+    winning_move = winning_move_now(state)
+    if winning_move is not None:
+        return winning_move
+    return _deepen(state, _DeepeningSearch(None), budget, max_depth)[0]
+
+
+def _deepen(state: 'GameState', search: _DeepeningSearch, budget: Any,
+            max_depth: Any) -> Tuple[Any, Any, int, bool]:
+    """Return the best move from state, its score, the depth of the
+    deepest iteration of search finished within budget seconds and
+    max_depth moves, as in iterative_deepening_minimax, and whether that
+    iteration solved the game, so that the score is exact. The first
+    iteration is only abandoned if search is stopped, and then the move and
+    score are the largest move and a DRAW, at depth 0.
+    """
+    start = monotonic()
+    search.deadline = None
+    scores = {move: state.DRAW for move in state.get_possible_moves()}
+    best_move, score, depth = max(scores), state.DRAW, 0
+    solved = False
+    while max_depth is None or depth < max_depth:
+        search.reached_horizon = False
+        try:
+            scores = _deepening_root(state, search, scores, depth + 1)
+        except _SearchTimeout:
+            break
+        depth += 1
+        best_move = _best_move(list(scores.items()))
+        score = scores[best_move]
+        if not search.reached_horizon:
+            solved = True
+            break
+        if budget is not None:
+            search.deadline = start + budget
+            if monotonic() > search.deadline:
+                break
+    return best_move, score, depth, solved
+
+
+def _deepening_root(state: 'GameState', search: _DeepeningSearch,
+                    scores: Dict[Any, int], depth: int) -> Dict[Any, int]:
+    """Return the score of every move from state, searched depth moves deep,
+    trying the moves in order of their scores in scores.
+
+    A move is searched just closely enough to tell whether it ties the best
+    move so far, so that _best_move still breaks ties by size. Scores at the
+    depth limit are fractions, so the window opens just below alpha, at the
+    next float down, rather than a whole point below.
+    """
+    new_scores = {}
+    alpha = state.LOSE - 1
+    for move in sorted(scores, key=lambda m: (scores[m], m), reverse=True):
+        score = -search.score(state.make_move(move), depth - 1, -state.WIN,
+                              -math.nextafter(alpha, -math.inf))
+        new_scores[move] = score
+        alpha = max(alpha, score)
+    return new_scores
+
+
+def depth_limited_minimax(game: 'Game', depth: int = DEFAULT_DEPTH) -> Any:
+    """A minimax strategy that looks at most depth moves ahead, and scores
+    the positions it stops at by their evaluate().
+
+    The search deepens one move at a time up to depth, with no time budget,
+    so the shallower searches order the moves of the deeper ones.
+
+    :param game: The game on which we are using the strategy
+    :type game: 'Game'
+    :param depth: The number of moves to look ahead
+    :type depth: int
+    :return: The largest of the moves with the best score
+    :rtype: Any
+    """
+    return iterative_deepening_minimax(game, None, depth)
 
 
 if __name__ == "__main__":
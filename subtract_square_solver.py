@@ -0,0 +1,178 @@
+"""
+A bottom-up solver for SubtractSquare.
+
+Instead of searching the game tree below a single total, the solver labels
+every total up to some limit as winning or losing for the player about to
+move, in one forward pass over a NumPy array. A strategy then answers any
+SubtractSquareState by table lookup.
+
+A solved table can be saved as a position table with save_solved_table. Once
+saved in TABLE_DIR, it is mapped into memory the first time a total is looked
+up, and totals it covers are never solved again.
+"""
+import os
+from math import isqrt
+from typing import Any, List, Optional
+import numpy as np
+from position_table import PositionTable, table_path, write_table
+
+# The width of the first window scanned for the next losing total; it doubles
+# (up to _MAX_SCAN_WINDOW) while the scan keeps finding only winning totals.
+_MIN_SCAN_WINDOW = 64
+_MAX_SCAN_WINDOW = 1 << 16
+
+# The largest table solved so far, shared by every lookup in this process.
+# A total of 0 is lost for the player about to move.
+_solved_table = np.zeros(1, dtype=bool)
+# The saved table mapped from TABLE_DIR, False until it is first looked for,
+# and None if there is no saved table.
+_saved_table = False
+
+
+def squares_up_to(limit: int) -> np.ndarray:
+    """
+    Return an array of every positive square number that is at most limit.
+
+    >>> squares_up_to(20).tolist()
+    [1, 4, 9, 16]
+    >>> squares_up_to(0).tolist()
+    []
+    """
+    return np.arange(1, isqrt(max(limit, 0)) + 1, dtype=np.int64) ** 2
+
+
+def solve_subtract_square(limit: int) -> np.ndarray:
+    """
+    Return a boolean array whose entry n is True iff a total of n is a win
+    for the player about to move, for every n from 0 to limit.
+
+    Losing totals are found in increasing order. Every total that is a
+    square away from a losing total is winning, so each losing total marks
+    all of those at once, and the next losing total is the first total that
+    is still unmarked.
+
+    >>> solve_subtract_square(10).nonzero()[0].tolist()
+    [1, 3, 4, 6, 8, 9]
+    """
+    squares = squares_up_to(limit)
+    table = np.zeros(limit + 1, dtype=bool)
+    losing = 0
+    while True:
+        reachable = squares[:np.searchsorted(squares, limit - losing,
+                                             side='right')]
+        table[losing + reachable] = True
+
+        # Scan forward for the next unmarked total in growing windows, so
+        # that neither a long run of winning totals nor a short one is
+        # expensive to skip.
+        start = losing + 1
+        window = _MIN_SCAN_WINDOW
+        while start <= limit:
+            chunk = table[start:start + window]
+            offset = int(chunk.argmin())
+            if not chunk[offset]:
+                break
+            start += window
+            window = min(window * 2, _MAX_SCAN_WINDOW)
+        else:
+            return table
+        losing = start + offset
+
+
+def solved_table(total: int) -> np.ndarray:
+    """
+    Return the shared solved table, extending it first if it does not yet
+    cover total.
+    """
+    global _solved_table
+    if total >= len(_solved_table):
+        _solved_table = solve_subtract_square(max(total,
+                                                  2 * len(_solved_table)))
+    return _solved_table
+
+
+def save_solved_table(limit: int, path: str = None) -> str:
+    """
+    Solve every total up to limit, save the result as a position table in
+    path, which defaults to the table subtract_square in TABLE_DIR, and
+    return path.
+    """
+    global _saved_table
+    path = table_path('subtract_square') if path is None else path
+    write_table(path, solve_subtract_square(limit), bits=1,
+                metadata={'game': 'subtract_square', 'limit': limit})
+    if _saved_table:
+        _saved_table.close()
+    _saved_table = False
+    return path
+
+
+def saved_table() -> Optional[PositionTable]:
+    """
+    Return the saved table in TABLE_DIR, mapping it into memory the first
+    time it is needed, or None if no table has been saved.
+    """
+    global _saved_table
+    if _saved_table is False:
+        path = table_path('subtract_square')
+        _saved_table = PositionTable(path) if os.path.exists(path) else None
+    return _saved_table
+
+
+def _is_winning(totals: Any) -> Any:
+    """
+    Return whether each of totals, an int or an array of ints, is a win for
+    the player about to move, from the saved table if it covers them all.
+    """
+    largest = int(np.max(totals))
+    table = saved_table()
+    if table is not None and largest < len(table):
+        return table.value_at(totals).astype(bool)
+    return solved_table(largest)[totals]
+
+
+def is_winning_total(total: int) -> bool:
+    """
+    Return whether the player about to move from total can force a win.
+
+    >>> is_winning_total(18)
+    True
+    >>> is_winning_total(2)
+    False
+    """
+    return bool(_is_winning(total))
+
+
+def winning_moves(total: int) -> List[int]:
+    """
+    Return every move from total that leaves the opponent in a losing
+    position, in increasing order.
+
+    >>> winning_moves(18)
+    [1, 16]
+    """
+    squares = squares_up_to(total)
+    if not len(squares):
+        return []
+    return [int(move) for move in squares[~_is_winning(total - squares)]]
+
+
+def solved_table_strategy(game: 'Game') -> Any:
+    """
+    Return a move for a game of SubtractSquare by looking up the solved
+    table.
+
+    Like the minimax strategies, this returns the largest of the best moves:
+    the largest winning move if there is one, and otherwise the largest
+    legal move.
+    """
+    total = game.current_state.current_total
+    moves = winning_moves(total)
+    if moves:
+        return moves[-1]
+    return game.current_state.get_possible_moves()[-1]
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
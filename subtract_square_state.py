@@ -5,20 +5,39 @@ NOTE: You do not have to run python-ta on this file.
 """
 from typing import Any
 from game_state import GameState
+from zobrist import zobrist_key
+
+# The Zobrist feature numbers for SubtractSquare: the game, whose turn it is,
+# and the current total.
+_GAME = 1
+_TURN = 0
+_TOTAL = 1
+_TURN_KEY = zobrist_key(_GAME, _TURN)
 
 
 class SubtractSquareState(GameState):
     """
     The state of a game at a certain point in time.
+
+    current_total - the number still to be subtracted from
+    zobrist - the Zobrist hash of this state
     """
+    current_total: int
+    zobrist: int
 
-    def __init__(self, is_p1_turn: bool, current_total: int) -> None:
+    def __init__(self, is_p1_turn: bool, current_total: int,
+                 zobrist: int = None) -> None:
         """
         Initialize this game state and set the current player based on
-        is_p1_turn.
+        is_p1_turn. zobrist is the hash of the state if it is already known.
         """
         super().__init__(is_p1_turn)
         self.current_total = current_total
+        if zobrist is None:
+            zobrist = zobrist_key(_GAME, _TOTAL, current_total)
+            if is_p1_turn:
+                zobrist ^= _TURN_KEY
+        self.zobrist = zobrist
 
     def __str__(self) -> str:
         """
@@ -37,6 +56,12 @@ class SubtractSquareState(GameState):
 
         return moves
 
+    def is_over(self) -> bool:
+        """
+        Return whether the game is over, i.e. the total has reached 0.
+        """
+        return self.current_total == 0
+
     def make_move(self, move: Any) -> "SubtractSquareState":
         """
         Return the GameState that results from applying move to this GameState.
@@ -44,10 +69,34 @@ class SubtractSquareState(GameState):
         if type(move) == str:
             move = int(move)
 
-        new_state = SubtractSquareState(not self.p1_turn,
-                                        self.current_total - move)
+        new_total = self.current_total - move
+        new_state = SubtractSquareState(
+            not self.p1_turn, new_total,
+            self.zobrist ^ _TURN_KEY
+            ^ zobrist_key(_GAME, _TOTAL, self.current_total)
+            ^ zobrist_key(_GAME, _TOTAL, new_total))
         return new_state
 
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return whether other is a SubtractSquareState with the same player to
+        move and the same total.
+
+        >>> s = SubtractSquareState(True, 9).make_move(4)
+        >>> s == SubtractSquareState(False, 5)
+        True
+        """
+        return (type(other) == type(self) and self.zobrist == other.zobrist
+                and self.p1_turn == other.p1_turn
+                and self.current_total == other.current_total)
+
+    def __hash__(self) -> int:
+        """
+        Return the Zobrist hash of this state, which is the same in every
+        process.
+        """
+        return self.zobrist
+
     def __repr__(self) -> str:
         """
         Return a representation of this state (which can be used for
@@ -56,6 +105,15 @@ class SubtractSquareState(GameState):
         return "P1's Turn: {} - Total: {}".format(self.p1_turn,
                                                   self.current_total)
 
+    def state_key(self) -> int:
+        """
+        Return a compact, hashable key for this state.
+
+        The moves available, and so the outcome for the current player, only
+        depend on the current total, so both players share one key per total.
+        """
+        return self.current_total
+
     def rough_outcome(self) -> float:
         """
         Return an estimate in interval [LOSE, WIN] of best outcome the current
@@ -0,0 +1,135 @@
+"""
+A subset of unittests for SubtractSquare and its solvers.
+
+These unittests check the solved table against a direct search of small
+totals, and that the table-lookup strategy picks winning moves.
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import subtract_square_solver
+from game_interface import playable_games, usable_strategies
+from position_table import PositionTable
+from subtract_square_solver import solve_subtract_square, winning_moves, \
+    save_solved_table
+from subtract_square_state import SubtractSquareState
+
+SubtractSquareGame = playable_games['s']
+solved_table_strategy = usable_strategies['st']
+
+
+def brute_force_table(limit):
+    """Return a list of whether each total up to limit is a win for the
+    player to move, computed directly from the rules."""
+    table = [False]
+    for total in range(1, limit + 1):
+        table.append(any(not table[total - n ** 2]
+                         for n in range(1, total + 1) if n ** 2 <= total))
+    return table
+
+
+class SubtractSquareSolverUnitTests(unittest.TestCase):
+    def test_solved_table_matches_brute_force(self):
+        """
+        Test that the solved table agrees with the rules for small totals.
+        """
+        expected = brute_force_table(2000)
+        actual = [bool(win) for win in solve_subtract_square(2000)]
+        self.assertEqual(actual, expected,
+                         "The solved table should mark exactly the totals " +
+                         "from which the player to move can force a win.")
+
+    def test_solved_table_tiny_limits(self):
+        """
+        Test the solved table for limits with no or very few squares.
+        """
+        self.assertEqual(list(solve_subtract_square(0)), [False])
+        self.assertEqual(list(solve_subtract_square(2)), [False, True, False])
+
+    def test_winning_moves_18(self):
+        """
+        Test that the winning moves from 18 are 1 and 16.
+        """
+        self.assertEqual(winning_moves(18), [1, 16])
+
+    def test_solved_table_strategy_18(self):
+        """
+        Test that the table-lookup strategy returns a winning move for 18,
+        choosing the largest one like minimax.
+        """
+        with patch('builtins.input', return_value='18'):
+            game = SubtractSquareGame(True)
+
+        self.assertEqual(solved_table_strategy(game), 16)
+
+    def test_solved_table_strategy_losing_total(self):
+        """
+        Test that the table-lookup strategy still returns a legal move from a
+        losing total.
+        """
+        with patch('builtins.input', return_value='5'):
+            game = SubtractSquareGame(True)
+
+        move = solved_table_strategy(game)
+        self.assertTrue(game.current_state.is_valid_move(move))
+
+
+class SubtractSquareSavedTableUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = save_solved_table(
+            5000, os.path.join(self.directory.name, 'subtract_square.tbl'))
+        self.table = PositionTable(self.path)
+
+    def tearDown(self):
+        self.table.close()
+        self.directory.cleanup()
+
+    def test_saved_table_matches_solved_table(self):
+        """
+        Test that a saved table maps back to the same win bits it was
+        solved with.
+        """
+        self.assertEqual(len(self.table), 5001)
+        self.assertEqual(self.table.metadata['limit'], 5000)
+        self.assertEqual(
+            [bool(win) for win in self.table.value_at(range(5001))],
+            [bool(win) for win in solve_subtract_square(5000)])
+        self.assertIsNone(self.table.get(5001))
+
+    def test_lookups_use_saved_table(self):
+        """
+        Test that the solver answers from a saved table, without solving,
+        for totals the table covers.
+        """
+        expected = {total: winning_moves(total) for total in (18, 2, 4999)}
+        with patch.object(subtract_square_solver, '_saved_table',
+                          self.table), \
+                patch.object(subtract_square_solver, 'solved_table',
+                             side_effect=AssertionError):
+            for total, moves in expected.items():
+                self.assertEqual(winning_moves(total), moves)
+            self.assertFalse(subtract_square_solver.is_winning_total(2))
+
+
+class SubtractSquareHashUnitTests(unittest.TestCase):
+    def test_transposed_states_are_equal(self):
+        """
+        Test that states reached by different move orders are equal and hash
+        the same, while the player to move still tells states apart.
+        """
+        state = SubtractSquareState(True, 30)
+        first = state.make_move(4).make_move(9)
+        second = state.make_move(9).make_move(4)
+
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(first, SubtractSquareState(True, 17))
+        self.assertEqual(first.zobrist, SubtractSquareState(True, 17).zobrist)
+        self.assertNotEqual(first, SubtractSquareState(False, 17))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+A round-robin tournament between the strategies in usable_strategies.
+
+Every strategy entered plays every other, once as Player 1 and once as
+Player 2, in a game of SubtractSquare from each starting total and a game of
+Stonehenge on each board size given. The games are spread over a pool of
+worker processes, and their records are passed on as soon as each finishes.
+
+Run from the command line, for example:
+    python tournament.py st mr ro --totals 10 20 30 --sides 1 2 --workers 4
+
+and add --log games.log to append the record of every game to a game log.
+
+A strategy written for one game, as listed in strategy_games, only plays the
+games of that game.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+from game_interface import GameRecord, can_play, play_game, \
+    usable_strategies
+from game_log import GameLogWriter
+
+
+class MatchResult(NamedTuple):
+    """The result of one tournament game.
+
+    p1: the key in usable_strategies of Player 1's strategy
+    p2: the key in usable_strategies of Player 2's strategy
+    record: the record of the game
+    """
+    p1: str
+    p2: str
+    record: GameRecord
+
+
+class StrategyStats:
+    """The results of one strategy in a tournament.
+
+    ========Attributes========
+    games: the number of games the strategy played
+    wins: the number of those games it won
+    moves: the number of moves it made
+    move_time: the total number of seconds it took to choose its moves
+    """
+    games: int
+    wins: int
+    moves: int
+    move_time: float
+
+    def __init__(self) -> None:
+        """Initialize the results of a strategy that has not played yet."""
+        self.games = self.wins = self.moves = 0
+        self.move_time = 0.0
+
+    def win_rate(self) -> float:
+        """Return the fraction of its games the strategy won."""
+        return self.wins / self.games if self.games else 0.0
+
+    def mean_latency(self) -> float:
+        """Return the mean number of seconds the strategy took per move."""
+        return self.move_time / self.moves if self.moves else 0.0
+
+
+def schedule(strategies: Sequence[str], totals: Sequence[int] = (),
+             sides: Sequence[int] = ()) -> List[Tuple[str, int, str, str]]:
+    """Return the (game, size, p1, p2) of every game of a round robin between
+    strategies, keys of usable_strategies, on SubtractSquare from each of
+    totals and on Stonehenge with each of sides.
+
+    >>> schedule(['st', 'ro'], totals=[5], sides=[2])
+    [('s', 5, 'st', 'ro'), ('s', 5, 'ro', 'st')]
+    """
+    for key in strategies:
+        if key not in usable_strategies:
+            raise ValueError("Unknown strategy {!r}".format(key))
+        if key == 'i':
+            raise ValueError("A tournament cannot wait for a user to move")
+    games = [('s', total) for total in totals] + \
+        [('h', side) for side in sides]
+    return [(game, size, p1, p2) for game, size in games
+            for p1 in strategies for p2 in strategies
+            if p1 != p2 and can_play(p1, game) and can_play(p2, game)]
+
+
+def _play_match(game: str, size: int, p1: str, p2: str) -> MatchResult:
+    """Play one tournament game in a worker process."""
+    return MatchResult(p1, p2, play_game(game, p1, p2, size))
+
+
+def run_tournament(strategies: Sequence[str], totals: Sequence[int] = (),
+                   sides: Sequence[int] = (),
+                   workers: int = None) -> Iterator[MatchResult]:
+    """Play a round robin between strategies, keys of usable_strategies, on
+    SubtractSquare from each of totals and on Stonehenge with each of sides,
+    on workers processes (one per CPU if None), and yield the result of
+    each game as soon as it finishes.
+    """
+    matches = schedule(strategies, totals, sides)
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(_play_match, *match) for match in matches]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize(results: Sequence[MatchResult]) -> Dict[str, StrategyStats]:
+    """Return the results of each strategy in results, by key.
+
+    >>> record = GameRecord('SubtractSquareGame', 2, True, 'a', 'b',
+    ...                     (1, 1), (0.5, 0.25), 'p2')
+    >>> stats = summarize([MatchResult('a', 'b', record)])
+    >>> stats['b'].win_rate(), stats['a'].mean_latency()
+    (1.0, 0.5)
+    """
+    stats = {}
+    for result in results:
+        record = result.record
+        p1_moves_first = record.p1_starts
+        for player, key in (('p1', result.p1), ('p2', result.p2)):
+            entry = stats.setdefault(key, StrategyStats())
+            entry.games += 1
+            entry.wins += record.winner == player
+            # The players alternate, starting with the first player.
+            first = 0 if (player == 'p1') == p1_moves_first else 1
+            entry.moves += len(record.move_times[first::2])
+            entry.move_time += sum(record.move_times[first::2])
+    return stats
+
+
+def report(stats: Dict[str, StrategyStats], games: int,
+           seconds: float) -> str:
+    """Return a table of the win rate and mean move latency of each strategy
+    in stats, best first, with the throughput of games games played in
+    seconds seconds.
+    """
+    lines = ["{:<10}{:>8}{:>8}{:>10}{:>14}".format(
+        'strategy', 'games', 'wins', 'win rate', 'ms per move')]
+    for key, entry in sorted(stats.items(),
+                             key=lambda item: -item[1].win_rate()):
+        lines.append("{:<10}{:>8}{:>8}{:>10.1%}{:>14.2f}".format(
+            key, entry.games, entry.wins, entry.win_rate(),
+            1000 * entry.mean_latency()))
+    lines.append("{} games in {:.2f} s ({:.1f} games/sec)".format(
+        games, seconds, games / seconds if seconds else 0.0))
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None,
+         output: Callable[[str], None] = print) -> None:
+    """Run a tournament from the command line arguments argv, printing each
+    game as it finishes and a report at the end.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Play a round-robin tournament between strategies.")
+    parser.add_argument('strategies', nargs='+',
+                        help="keys of usable_strategies")
+    parser.add_argument('--totals', nargs='*', type=int, default=[],
+                        help="starting totals of SubtractSquare games")
+    parser.add_argument('--sides', nargs='*', type=int, default=[],
+                        help="side lengths of Stonehenge games")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="the number of worker processes")
+    parser.add_argument('--log', default=None,
+                        help="a game log to append the games to")
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    results = []
+    log = GameLogWriter(args.log) if args.log else None
+    for result in run_tournament(args.strategies, args.totals, args.sides,
+                                 args.workers):
+        results.append(result)
+        record = result.record
+        if log is not None:
+            log.write(record)
+        output("{} {}: {} v {}, winner {} in {} moves".format(
+            record.game, record.size, result.p1, result.p2,
+            record.winner, len(record.moves)))
+    if log is not None:
+        log.close()
+    output(report(summarize(results), len(results),
+                  perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+A subset of unittests for the strategy tournament runner.
+
+These unittests run small tournaments on a process pool and check that every
+scheduled game is played once and that the report adds up.
+"""
+import unittest
+
+from tournament import main, run_tournament, schedule, summarize
+
+
+class TournamentUnitTests(unittest.TestCase):
+    def test_schedule_is_round_robin(self):
+        """
+        Test that each pair of strategies meets in both seats on every game,
+        and that strategies for one game skip the other.
+        """
+        matches = schedule(['st', 'mr', 'ro'], totals=[5, 9], sides=[1])
+        self.assertEqual(len(matches), 2 * 6 + 2)
+        self.assertIn(('h', 1, 'mr', 'ro'), matches)
+        self.assertIn(('h', 1, 'ro', 'mr'), matches)
+        self.assertFalse(any(game == 'h' and 'st' in (p1, p2)
+                             for game, _, p1, p2 in matches))
+        with self.assertRaises(ValueError):
+            schedule(['i', 'mr'], totals=[5])
+
+    def test_tournament_plays_every_game(self):
+        """
+        Test that a tournament on a process pool plays each scheduled game
+        exactly once and that its summary adds up.
+        """
+        results = list(run_tournament(['st', 'mr', 'ro'], totals=[5, 18],
+                                      sides=[], workers=2))
+        self.assertEqual(
+            sorted((r.record.size, r.p1, r.p2) for r in results),
+            sorted((size, p1, p2) for _, size, p1, p2
+                   in schedule(['st', 'mr', 'ro'], totals=[5, 18])))
+        stats = summarize(results)
+        self.assertEqual(sum(entry.games for entry in stats.values()),
+                         2 * len(results))
+        self.assertEqual(sum(entry.wins for entry in stats.values()),
+                         len(results))
+        self.assertEqual(sum(entry.moves for entry in stats.values()),
+                         sum(len(r.record.moves) for r in results))
+
+    def test_main_reports(self):
+        """
+        Test that the command line runner prints a line for every game and a
+        report with the throughput.
+        """
+        lines = []
+        main(['mr', 'ro', '--totals', '4', '--sides', '1', '--workers', '2'],
+             lines.append)
+        self.assertEqual(len(lines), 5)
+        self.assertIn('games/sec', lines[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
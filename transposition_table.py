@@ -0,0 +1,150 @@
+"""
+A bounded transposition table for game-tree searches.
+
+A transposition table remembers the result of searching a position, keyed by
+the position's state key, so that a position reached through different move
+orders is only searched once.
+"""
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+LRU = 'lru'
+DEPTH = 'depth'
+
+
+class TranspositionTable:
+    """A table mapping state keys to search results, holding at most
+    capacity entries.
+
+    ========Attributes========
+    capacity: the maximum number of entries kept in the table
+    replacement: LRU to evict the least recently used entry when the table
+                 is full, or DEPTH to keep one entry per slot and replace it
+                 only with an entry of at least the same depth
+    hits: the number of lookups that found an entry
+    misses: the number of lookups that found nothing
+    evictions: the number of entries dropped to make room for others
+    rejections: the number of entries not stored under DEPTH replacement,
+                because their slot held a deeper entry
+    """
+    capacity: int
+    replacement: str
+    hits: int
+    misses: int
+    evictions: int
+    rejections: int
+
+    def __init__(self, capacity: int = 1 << 20,
+                 replacement: str = LRU) -> None:
+        """Initialize an empty table holding at most capacity entries.
+
+        >>> table = TranspositionTable(2)
+        >>> table.store('a', 1)
+        >>> table.lookup('a')
+        1
+        >>> table.lookup('b') is None
+        True
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if replacement not in (LRU, DEPTH):
+            raise ValueError("Unknown replacement scheme {!r}".format(
+                replacement))
+        self.capacity = capacity
+        self.replacement = replacement
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self._entries = OrderedDict()
+        self._slots = [None] * capacity if replacement == DEPTH else None
+
+    def __len__(self) -> int:
+        """Return the number of entries in this table."""
+        if self._slots is None:
+            return len(self._entries)
+        return sum(1 for slot in self._slots if slot is not None)
+
+    def __str__(self) -> str:
+        """Return a summary of the size and hit rate of this table."""
+        return "TranspositionTable: {}/{} entries, {} hits, {} misses " \
+               "({:.1%} hit rate), {} evictions, {} rejections".format(
+                   len(self), self.capacity, self.hits, self.misses,
+                   self.hit_rate(), self.evictions, self.rejections)
+
+    def lookup(self, key: Hashable) -> Optional[Any]:
+        """Return the value stored for key, or None if there is none.
+
+        >>> table = TranspositionTable(2)
+        >>> table.store('a', 1)
+        >>> table.store('b', 2)
+        >>> table.lookup('a')
+        1
+        >>> table.store('c', 3)
+        >>> table.lookup('b') is None
+        True
+        >>> (table.hits, table.misses, table.evictions)
+        (1, 1, 1)
+        """
+        if self._slots is None:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        else:
+            slot = self._slots[hash(key) % self.capacity]
+            value = slot[1] if slot is not None and slot[0] == key else None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def store(self, key: Hashable, value: Any, depth: int = 0) -> None:
+        """Store value as the result for key. depth measures how much search
+        produced value, and decides which entries survive under DEPTH
+        replacement.
+
+        >>> table = TranspositionTable(1, DEPTH)
+        >>> table.store('a', 1, depth=5)
+        >>> table.store('b', 2, depth=3)
+        >>> table.lookup('a'), table.lookup('b')
+        (1, None)
+        >>> table.evictions, table.rejections
+        (0, 1)
+        """
+        if self._slots is None:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            elif len(self._entries) >= self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._entries[key] = value
+            return
+
+        index = hash(key) % self.capacity
+        slot = self._slots[index]
+        if slot is None or slot[0] == key:
+            self._slots[index] = (key, value, depth)
+        elif depth >= slot[2]:
+            self._slots[index] = (key, value, depth)
+            self.evictions += 1
+        else:
+            self.rejections += 1
+
+    def hit_rate(self) -> float:
+        """Return the fraction of lookups so far that found an entry."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters of this table."""
+        self.hits = self.misses = self.evictions = self.rejections = 0
+        self._entries.clear()
+        if self._slots is not None:
+            self._slots = [None] * self.capacity
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
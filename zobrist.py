@@ -0,0 +1,48 @@
+"""
+Zobrist keys for hashing game states.
+
+A state's Zobrist hash is the XOR of one random 64-bit key per feature of the
+state (a claimed cell, a claimed leyline, whose turn it is...). A move only
+changes a few features, so the hash of the next state is found by XOR-ing
+their keys in or out.
+
+The keys are derived from the feature itself with a fixed seed, rather than
+drawn from a random generator, so the same state hashes the same way in
+every process and every run, and tables of hashes can be saved and shared.
+"""
+
+ZOBRIST_SEED = 0x2545F4914F6CDD1D
+_MASK = (1 << 64) - 1
+
+
+def _splitmix64(value: int) -> int:
+    """
+    Return the SplitMix64 scrambling of value, a well-mixed 64-bit integer.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def zobrist_key(*feature: int) -> int:
+    """
+    Return the 64-bit key of feature, a sequence of non-negative integers
+    naming a feature of a state.
+
+    >>> zobrist_key(1, 2) == zobrist_key(1, 2)
+    True
+    >>> zobrist_key(1, 2) == zobrist_key(2, 1)
+    False
+    >>> 0 <= zobrist_key(7) < 2 ** 64
+    True
+    """
+    value = ZOBRIST_SEED
+    for part in feature:
+        value = _splitmix64(value ^ part)
+    return value
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")